@@ -0,0 +1,119 @@
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Response
+from typing import Optional
+import hmac
+import logging
+import os
+from app.services.model_service import model_registry
+from app.services.model_watcher import model_watcher
+from app.services.profiling import profile_store
+from app.services.risk_grid import GridTooLargeError, check_grid_size, grid_shape
+from app.services.risk_tiles import WeatherGrid, tile_cache, weather_layer
+from app.schemas.prediction import WeatherLayerRequest
+
+logger = logging.getLogger(__name__)
+
+# Shared secret for the admin routes; they are disabled when it is unset
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN") or ""
+
+def is_admin_token(token: Optional[str]):
+    """
+    True if admin routes are enabled and token matches ADMIN_TOKEN
+    """
+    return bool(ADMIN_TOKEN) and bool(token) and hmac.compare_digest(token, ADMIN_TOKEN)
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """
+    Reject requests without the admin token in the X-Admin-Token header
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+@router.get("/model")
+def get_model_status():
+    """
+    Report the serving model version and the file watcher state
+    """
+    return {"model": model_registry.info(), "watcher": model_watcher.stats()}
+
+@router.post("/model/reload")
+def reload_model(
+    backend: Optional[str] = Query(None, description="Switch to another inference backend")
+):
+    """
+    Load and warm up the current model files, then swap them in without downtime
+    """
+    logger.info(f"Admin model reload requested (backend: {backend or model_registry.backend})")
+    try:
+        swapped = model_registry.reload(backend)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not swapped:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Replacement model failed to load or warm up; still serving {model_registry.version}"
+        )
+    return {"swapped": True, "model": model_registry.info()}
+
+@router.get("/profiles")
+def list_profiles():
+    """
+    List the most recent request profiles, newest first
+    """
+    return {"profiles": profile_store.list()}
+
+@router.get("/profiles/{profile_id}")
+def get_profile(
+    profile_id: str,
+    format: str = Query("text", pattern="^(text|pstats)$", description="text summary or binary pstats file"),
+    sort: str = Query("cumulative", description="pstats sort key for the text summary"),
+    limit: int = Query(40, ge=1, le=500, description="Functions listed in the text summary")
+):
+    """
+    Download a request profile as a text summary or as a pstats file
+    (for snakeviz, flameprof or pstats.Stats)
+    """
+    session = profile_store.get(profile_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"No profile with id {profile_id}")
+    if format == "pstats":
+        return Response(
+            content=session.pstats_bytes(),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.pstats"'}
+        )
+    try:
+        summary = session.summary(limit=limit, sort=sort)
+    except KeyError:
+        raise HTTPException(status_code=400, detail=f"Unknown sort key '{sort}'")
+    return Response(content=summary, media_type="text/plain")
+
+@router.get("/weather-layer")
+def get_weather_layer():
+    """
+    Describe the weather layer the map tiles are scored from
+    """
+    return weather_layer.current().info()
+
+@router.put("/weather-layer")
+def set_weather_layer(request: WeatherLayerRequest):
+    """
+    Replace the weather layer. Tiles of the previous layer stop being served
+    at once, since the layer fingerprint is part of every tile cache key.
+    """
+    try:
+        if request.bbox is not None:
+            check_grid_size(grid_shape(request.bbox, request.resolution))
+        grid = WeatherGrid(request.weather(), request.bbox, request.resolution)
+    except GridTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    weather_layer.set(grid)
+    # Entries of the old layer can no longer be hit
+    tile_cache.clear_memory()
+    tile_cache.prune()
+    return grid.info()
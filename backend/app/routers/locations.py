@@ -0,0 +1,45 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+import logging
+from app.services.spatial_index import risk_index
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Largest number of locations a top-risk query may return
+MAX_TOP_K = 1000
+
+@router.get("/locations/top-risk")
+async def get_top_risk_locations(
+    latitude: Optional[float] = Query(None, ge=-90, le=90, description="Center of a radius query"),
+    longitude: Optional[float] = Query(None, ge=-180, le=180, description="Center of a radius query"),
+    radius_km: Optional[float] = Query(None, gt=0, description="Search radius around latitude/longitude"),
+    bbox: Optional[str] = Query(None, description="west,south,east,north instead of a radius"),
+    k: int = Query(20, ge=1, le=MAX_TOP_K, description="Number of locations to return"),
+    min_score: Optional[float] = Query(None, ge=0, le=1, description="Ignore locations scored below this"),
+    max_age_seconds: Optional[float] = Query(None, gt=0, description="Ignore locations not rescored recently")
+):
+    """
+    The k highest-risk locations already scored by this API within a radius
+    or a bounding box, answered from the spatial index without re-predicting
+    """
+    if bbox is not None:
+        try:
+            west, south, east, north = (float(edge) for edge in bbox.split(","))
+        except ValueError:
+            raise HTTPException(status_code=422, detail="bbox must be west,south,east,north")
+        if not (-180 <= west < east <= 180 and -90 <= south < north <= 90):
+            raise HTTPException(status_code=422, detail=f"Invalid bbox {bbox}")
+        locations = risk_index.top_within_bbox([west, south, east, north], k, min_score, max_age_seconds)
+    elif None not in (latitude, longitude, radius_km):
+        locations = risk_index.top_within_radius(latitude, longitude, radius_km, k, min_score, max_age_seconds)
+    else:
+        raise HTTPException(status_code=422, detail="Pass either latitude, longitude and radius_km, or bbox")
+    return {"count": len(locations), "indexed": len(risk_index), "locations": locations}
+
+@router.get("/locations/stats")
+async def get_location_index_stats():
+    """
+    Size and rebuild counters of the spatial risk index
+    """
+    return risk_index.stats()
@@ -1,46 +1,114 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Union, Literal
+import asyncio
 import logging
-import joblib
 import os
+import time
 import numpy as np
-from app.services.model_service import predict_risk
-from app.schemas.prediction import PredictionRequest, PredictionResponse
+from app.services.model_service import STAGE_SECONDS, predict_risk, predict_risk_batch, resolve_model_mode
+from app.services.inference_executor import inference_executor, ExecutorSaturatedError
+from app.services.batcher import micro_batcher, predict_risk_batched
+from app.services.drift_monitor import drift_monitor
+from app.services.prediction_cache import echo_inputs, prediction_cache, select_rows
+from app.services.single_flight import prediction_flights
+from app.services.risk_grid import GridTooLargeError, predict_grid
+from app.services.spatial_index import risk_index
+from app.services.weather_service import WeatherProviderError, fetch_weather, forecast_inputs, forecast_risk
+from app.schemas.prediction import (
+    PredictionRequest,
+    PredictionResponse,
+    ColumnarPredictionRequest,
+    BatchPredictionResponse,
+    ForecastRiskResponse,
+    GridPredictionRequest
+)
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-class PredictionRequest(BaseModel):
-    latitude: float
-    longitude: float
-    temperature: float
-    humidity: float
-    wind_speed: float
-    precipitation: float
-    vegetation_density: Optional[float] = None
-    elevation: Optional[float] = None
-    drought_index: Optional[float] = None
-
-class PredictionResponse(BaseModel):
-    risk_level: str
-    risk_score: float
-    confidence: float
-    factors: Dict[str, Any]
-    recommendations: List[str]
-    model_details: Optional[Dict[str, Any]] = None
+# Upper bound on the number of locations accepted by a single batch request
+MAX_BATCH_PREDICTIONS = int(os.getenv("MAX_BATCH_PREDICTIONS") or 10000)
+
+ModelMode = Literal["full", "adjusted", "deferred"]
+
+def _request_model_mode(detail: bool, model_mode: Optional[str]):
+    # detail=false is shorthand for skipping the CNN comparison
+    if model_mode is None and not detail:
+        return "adjusted"
+    return resolve_model_mode(model_mode)
+
+async def _compute_prediction(prediction_args, mode, cache_key):
+    """
+    Score a single request with the configured execution path and cache the result
+    """
+    if mode != "full":
+        # Without the CNN the scoring is cheap enough to run inline
+        result = predict_risk(**prediction_args, model_mode=mode)
+        if mode == "deferred":
+            drift_monitor.submit(
+                {name: [value] for name, value in prediction_args.items()},
+                [result["risk_score"]]
+            )
+    elif micro_batcher.enabled:
+        # Coalesce concurrent requests into a single CNN call
+        result = await predict_risk_batched(**prediction_args)
+    else:
+        # Process the request and call the ML model service on the inference
+        # executor so the event loop stays free while the model runs
+        result = await inference_executor.run(predict_risk, **prediction_args)
+
+    if cache_key is not None:
+        prediction_cache.put(cache_key, result)
+
+    return result
+
+def _store_and_index_batch(columns, keys, predictions, missing, scored):
+    prediction_cache.store_batch(keys, predictions, missing, scored)
+    risk_index.update(
+        columns["latitude"], columns["longitude"],
+        [prediction["risk_score"] for prediction in predictions],
+        [prediction["risk_level"] for prediction in predictions]
+    )
+    return predictions
+
+async def _predict_and_index_batch(columns, mode):
+    """
+    Score a columnar batch, sending only the cache misses to the inference
+    executor, and record the scores in the spatial index.
+
+    The cache and the index stay in the serving process even when the
+    executor is a process pool; their per-row loops run in a thread so
+    large batches do not block the event loop.
+    """
+    keys, predictions, missing = await asyncio.to_thread(prediction_cache.lookup_batch, columns, mode)
+    scored = []
+    if missing:
+        scored = await inference_executor.run(predict_risk_batch, **select_rows(columns, missing), model_mode=mode)
+    return await asyncio.to_thread(_store_and_index_batch, columns, keys, predictions, missing, scored)
+
+def _prediction_response(result):
+    """
+    Validate and serialize a prediction ourselves so the time spent doing it
+    is recorded as the serialization stage
+    """
+    started = time.perf_counter()
+    body = PredictionResponse.model_validate(result).model_dump_json()
+    STAGE_SECONDS["serialization"].observe(time.perf_counter() - started)
+    return Response(content=body, media_type="application/json")
 
 @router.post("/predict", response_model=PredictionResponse)
-async def predict_wildfire_risk(request: PredictionRequest):
+async def predict_wildfire_risk(
+    request: PredictionRequest,
+    detail: bool = Query(True, description="Include the CNN score in model_details"),
+    model_mode: Optional[ModelMode] = Query(None, description="Override the deployment scoring mode")
+):
     """
     Predict wildfire risk based on weather and environmental data
     """
     try:
-        # Log the prediction request
-        logger.info(f"Prediction request received: {request}")
-        
-        # Process the request and call the ML model service
-        result = predict_risk(
+        prediction_args = dict(
             latitude=request.latitude,
             longitude=request.longitude,
             temperature=request.temperature,
@@ -52,13 +120,155 @@ async def predict_wildfire_risk(request: PredictionRequest):
             drought_index=request.drought_index
         )
         
-        return result
+        mode = _request_model_mode(detail, model_mode)
+        
+        # Serve repeated (quantized) inputs from the result cache
+        cache_key = prediction_cache.key(prediction_args, mode) if prediction_cache.enabled else None
+        result = prediction_cache.get(cache_key) if cache_key is not None else None
+        
+        if result is None:
+            # Concurrent requests that would share a cache entry, or with the
+            # cache disabled identical requests, share one in-flight computation
+            flight_key = cache_key if cache_key is not None else (mode,) + tuple(prediction_args.values())
+            result = await prediction_flights.do(
+                flight_key,
+                lambda: _compute_prediction(prediction_args, mode, cache_key)
+            )
         
+        # Index every response at the request's own coordinates, whether it
+        # came from the cache, a shared flight or a fresh computation
+        result = echo_inputs(result, prediction_args)
+        risk_index.update(
+            [prediction_args["latitude"]], [prediction_args["longitude"]], [result["risk_score"]], [result["risk_level"]]
+        )
+        
+        return _prediction_response(result)
+        
+    except ExecutorSaturatedError as e:
+        logger.warning(f"Rejecting prediction request: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         logger.error(f"Error predicting wildfire risk: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_wildfire_risk_batch(
+    request: Union[ColumnarPredictionRequest, List[PredictionRequest]],
+    detail: bool = Query(True, description="Include the CNN score in model_details"),
+    model_mode: Optional[ModelMode] = Query(None, description="Override the deployment scoring mode")
+):
+    """
+    Predict wildfire risk for many locations in one call.
+
+    Accepts either a list of prediction requests or a columnar payload with one
+    array per field; the cache misses are scored in a single vectorized pass.
+    """
+    if isinstance(request, list):
+        request = ColumnarPredictionRequest.from_requests(request)
+
+    if len(request) > MAX_BATCH_PREDICTIONS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {len(request)} locations exceeds the limit of {MAX_BATCH_PREDICTIONS}"
+        )
+
+    try:
+        columns = request.model_dump()
+        mode = _request_model_mode(detail, model_mode)
+        # Only the cache misses of the batch are scored
+        predictions = await _predict_and_index_batch(columns, mode)
+        if mode == "deferred":
+            drift_monitor.submit(columns, [prediction["risk_score"] for prediction in predictions])
+        return {"count": len(predictions), "predictions": predictions}
+
+    except ExecutorSaturatedError as e:
+        logger.warning(f"Rejecting batch prediction request: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        logger.error(f"Error predicting wildfire risk for batch: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/predict/forecast", response_model=ForecastRiskResponse)
+async def predict_forecast_risk(
+    latitude: float = Query(..., ge=-90, le=90, description="Latitude coordinate"),
+    longitude: float = Query(..., ge=-180, le=180, description="Longitude coordinate"),
+    vegetation_density: Optional[float] = Query(None, ge=0, le=1, description="Vegetation density of the location"),
+    detail: bool = Query(True, description="Include the CNN score in model_details"),
+    model_mode: Optional[ModelMode] = Query(None, description="Override the deployment scoring mode")
+):
+    """
+    Wildfire risk for each day of the location's weather forecast.
+
+    The forecast is fetched without blocking the event loop and every day is
+    scored in one batched call on the inference executor, so concurrent
+    forecast requests overlap their weather fetches and their scoring.
+    """
+    try:
+        mode = _request_model_mode(detail, model_mode)
+        weather = await fetch_weather(latitude, longitude)
+        result = await inference_executor.run(forecast_risk, latitude, longitude, weather, mode, vegetation_density)
+        if mode == "deferred" and result["days"]:
+            drift_monitor.submit(
+                forecast_inputs(latitude, longitude, weather["forecast"], vegetation_density),
+                [day["risk_score"] for day in result["days"]]
+            )
+        return result
+
+    except WeatherProviderError as e:
+        logger.error(f"Weather provider unavailable for forecast: {str(e)}")
+        raise HTTPException(status_code=502, detail=str(e))
+    except ExecutorSaturatedError as e:
+        logger.warning(f"Rejecting forecast prediction request: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        logger.error(f"Error predicting forecast wildfire risk: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/predict/grid")
+async def predict_wildfire_risk_grid(request: GridPredictionRequest):
+    """
+    Adjusted wildfire risk for every cell of a bounding box.
+
+    The whole raster is scored with NumPy array operations and returned as
+    2-D arrays (rows north to south, columns west to east) rather than one
+    prediction per cell. The CNN is not used.
+    """
+    try:
+        result = await inference_executor.run(
+            predict_grid, request.bbox, request.resolution, request.weather(),
+            request.include_contributions, request.encoding
+        )
+    except GridTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ExecutorSaturatedError as e:
+        logger.warning(f"Rejecting grid prediction request: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        logger.error(f"Error predicting wildfire risk grid: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    # Skip jsonable_encoder, which is slow on large nested lists
+    return JSONResponse(result)
+
+
+@router.get("/predict/stats")
+async def get_prediction_stats():
+    """
+    Inference executor occupancy and micro-batching histograms
+    """
+    return {
+        "executor": inference_executor.stats(),
+        "batching": micro_batcher.stats(),
+        "drift": drift_monitor.stats(),
+        "cache": prediction_cache.stats(),
+        "single_flight": prediction_flights.stats()
+    }
+
+
 @router.get("/risk-factors")
 async def get_risk_factors():
     """
@@ -0,0 +1,74 @@
+from fastapi import APIRouter, HTTPException, Header, Path, Query, Response
+from typing import Literal, Optional
+import asyncio
+import logging
+from app.services.inference_executor import inference_executor, ExecutorSaturatedError
+from app.services.risk_tiles import MAX_TILE_ZOOM, TILE_FORMATS, TILE_SIZE, render_tile, tile_cache, tile_key, weather_layer
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.get("/tiles/{z}/{x}/{y}")
+async def get_risk_tile(
+    z: int = Path(..., ge=0, le=MAX_TILE_ZOOM, description="Zoom level"),
+    x: int = Path(..., ge=0, description="Tile column"),
+    y: int = Path(..., ge=0, description="Tile row"),
+    format: Literal["png", "f16"] = Query("png", description="Colored PNG or raw little-endian float16 scores"),
+    temperature: Optional[float] = Query(None, description="Override the weather layer for the whole tile"),
+    humidity: Optional[float] = Query(None),
+    wind_speed: Optional[float] = Query(None),
+    precipitation: Optional[float] = Query(None),
+    vegetation_density: Optional[float] = Query(None),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    256x256 Web Mercator tile of the adjusted wildfire risk, scored from the
+    weather layer with one vectorized pass per tile and cached in memory and
+    on disk. Tiles are addressed like any slippy map (z/x/y, y from the north).
+
+    The URL does not change when the weather layer does, so clients may store
+    a tile but must revalidate it with its ETag. The layer load and the disk
+    cache run in a thread, off the event loop.
+    """
+    overrides = {
+        "temperature": temperature,
+        "humidity": humidity,
+        "wind_speed": wind_speed,
+        "precipitation": precipitation,
+        "vegetation_density": vegetation_density
+    }
+    grid = await asyncio.to_thread(weather_layer.current)
+    key = tile_key(z, x, y, grid, overrides, format)
+    etag = tile_cache.etag(key)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "public, no-cache",
+        "X-Weather-Layer": grid.fingerprint
+    }
+    if format == "f16":
+        headers.update({"X-Tile-Dtype": "float16", "X-Tile-Shape": f"{TILE_SIZE},{TILE_SIZE}"})
+    if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+
+    body = await asyncio.to_thread(tile_cache.get, key)
+    if body is None:
+        try:
+            body = await inference_executor.run(render_tile, z, x, y, grid, overrides, format)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        except ExecutorSaturatedError as e:
+            logger.warning(f"Rejecting tile request: {str(e)}")
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+        except Exception as e:
+            logger.error(f"Error rendering risk tile {z}/{x}/{y}: {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
+        await asyncio.to_thread(tile_cache.put, key, body)
+    return Response(content=body, media_type=TILE_FORMATS[format], headers=headers)
+
+@router.get("/tiles/stats")
+async def get_tile_stats():
+    """
+    Tile cache counters and the current weather layer
+    """
+    grid = await asyncio.to_thread(weather_layer.current)
+    return {"cache": tile_cache.stats(), "weather_layer": grid.info()}
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Dict, List, Optional, Any
+from pydantic import BaseModel, Field, model_validator
+from typing import Dict, List, Optional, Any, Literal, Union
 
 class PredictionRequest(BaseModel):
     latitude: float
@@ -18,3 +18,128 @@ class PredictionResponse(BaseModel):
     confidence: float
     factors: Dict[str, Any]
     recommendations: List[str]
+    model_details: Optional[Dict[str, Any]] = None
+
+class ColumnarPredictionRequest(BaseModel):
+    """
+    Batch of prediction inputs with one array per field
+    """
+    latitude: List[float]
+    longitude: List[float]
+    temperature: List[float]
+    humidity: List[float]
+    wind_speed: List[float]
+    precipitation: List[float]
+    vegetation_density: Optional[List[Optional[float]]] = None
+    elevation: Optional[List[Optional[float]]] = None
+    drought_index: Optional[List[Optional[float]]] = None
+
+    @model_validator(mode="after")
+    def check_column_lengths(self):
+        lengths = {name: len(values) for name, values in self if values is not None}
+        if len(set(lengths.values())) > 1:
+            raise ValueError(f"All columns must have the same length, got {lengths}")
+        return self
+
+    def __len__(self):
+        return len(self.latitude)
+
+    @classmethod
+    def from_requests(cls, requests: List[PredictionRequest]):
+        """
+        Transpose a list of row requests into columns
+        """
+        return cls(**{
+            name: [getattr(request, name) for request in requests]
+            for name in PredictionRequest.model_fields
+        })
+
+# A single value for the whole grid, or one value per cell (rows north to south)
+GridField = Union[float, List[List[Optional[float]]]]
+
+def _check_bbox(bbox):
+    if len(bbox) != 4:
+        raise ValueError("bbox must be [west, south, east, north]")
+    west, south, east, north = bbox
+    if not (-180 <= west < east <= 180 and -90 <= south < north <= 90):
+        raise ValueError(f"Invalid bbox {bbox}, expected west < east and south < north within lon/lat range")
+
+class GridPredictionRequest(BaseModel):
+    """
+    Bounding box to score as a raster of resolution-degree cells
+    """
+    bbox: List[float] = Field(description="[west, south, east, north] in degrees")
+    resolution: float = Field(gt=0, description="Cell size in degrees")
+    temperature: GridField
+    humidity: GridField
+    wind_speed: GridField
+    precipitation: GridField
+    vegetation_density: Optional[GridField] = None
+    include_contributions: bool = False
+    encoding: Literal["json", "base64"] = "json"
+
+    @model_validator(mode="after")
+    def check_bbox(self):
+        _check_bbox(self.bbox)
+        return self
+
+    def weather(self):
+        return {
+            "temperature": self.temperature,
+            "humidity": self.humidity,
+            "wind_speed": self.wind_speed,
+            "precipitation": self.precipitation,
+            "vegetation_density": self.vegetation_density
+        }
+
+class WeatherLayerRequest(BaseModel):
+    """
+    Weather the map tiles are scored from: single values for everywhere, or
+    per-cell arrays over a bbox at a resolution (as in GridPredictionRequest)
+    """
+    bbox: Optional[List[float]] = Field(None, description="[west, south, east, north] covered by array fields")
+    resolution: Optional[float] = Field(None, gt=0, description="Cell size of array fields in degrees")
+    temperature: Optional[GridField] = None
+    humidity: Optional[GridField] = None
+    wind_speed: Optional[GridField] = None
+    precipitation: Optional[GridField] = None
+    vegetation_density: Optional[GridField] = None
+
+    @model_validator(mode="after")
+    def check_bbox(self):
+        if (self.bbox is None) != (self.resolution is None):
+            raise ValueError("bbox and resolution must be given together")
+        if self.bbox is not None:
+            _check_bbox(self.bbox)
+        return self
+
+    def weather(self):
+        return {
+            "temperature": self.temperature,
+            "humidity": self.humidity,
+            "wind_speed": self.wind_speed,
+            "precipitation": self.precipitation,
+            "vegetation_density": self.vegetation_density
+        }
+
+class ForecastDayRisk(BaseModel):
+    date: Optional[str] = None
+    weather: Dict[str, Any]
+    inputs: Dict[str, float]
+    risk_score: float
+    risk_level: str
+    confidence: float
+    factors: Dict[str, Any]
+    model_details: Optional[Dict[str, Any]] = None
+
+class ForecastRiskResponse(BaseModel):
+    location: Optional[str] = None
+    latitude: float
+    longitude: float
+    days: List[ForecastDayRisk]
+    peak_date: Optional[str] = None
+    peak_risk_score: Optional[float] = None
+
+class BatchPredictionResponse(BaseModel):
+    count: int
+    predictions: List[PredictionResponse]
@@ -0,0 +1,207 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Optional
+
+import numpy as np
+
+from app.services.inference_executor import inference_executor, ExecutorSaturatedError
+from app.services.metrics import Histogram, metrics_registry
+from app.services.model_service import (
+    STAGE_SECONDS,
+    model_registry,
+    build_features,
+    build_prediction,
+    mock_prediction,
+    preprocess_features
+)
+from app.services.prediction_log import prediction_log
+
+logger = logging.getLogger(__name__)
+
+
+class ModelUnavailableError(Exception):
+    """
+    Raised when no CNN model is loaded and a mock prediction must be used
+    """
+
+
+def _predict_batch(batch):
+    # Runs on the inference executor: one model call for the whole batch
+    with model_registry.acquire() as active:
+        if active.model is None:
+            raise ModelUnavailableError("No CNN model is loaded")
+        started = time.perf_counter()
+        prediction = active.model.predict(batch, verbose=0)
+        STAGE_SECONDS["inference"].observe(time.perf_counter() - started)
+        return np.asarray(prediction, dtype=np.float64).reshape(len(batch), -1)[:, 0], active.version
+
+
+class MicroBatcher:
+    """
+    Collects concurrent single-sample predictions for a short window and runs
+    them through the CNN as one batch.
+
+    A batch is flushed when `window_ms` has passed since its first request or
+    as soon as it reaches `max_batch_size`, whichever comes first. Each caller
+    awaits its own slice of the batched model output.
+    """
+
+    def __init__(self, window_ms=0.0, max_batch_size=32, executor=None):
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self.executor = executor or inference_executor
+        self._pending = []
+        self._flush_handle = None
+        self._running = set()
+        self.batch_size_histogram = Histogram(
+            "predict_batch_size",
+            "Number of requests per CNN batch",
+            [1, 2, 4, 8, 16, 32, 64, 128]
+        )
+        self.queue_wait_histogram = Histogram(
+            "predict_batch_queue_wait_seconds",
+            "Time a request waited in the batcher before its batch ran",
+            [0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1]
+        )
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build a batcher from the PREDICT_BATCH_* environment variables
+        """
+        return cls(
+            window_ms=float(os.getenv("PREDICT_BATCH_WINDOW_MS") or 0),
+            max_batch_size=int(os.getenv("PREDICT_MAX_BATCH_SIZE") or 32)
+        )
+
+    @property
+    def enabled(self):
+        return self.window_ms > 0 and self.max_batch_size > 1
+
+    async def predict(self, tensor):
+        """
+        Queue a single preprocessed (1, H, W, C) tensor and await its model output
+
+        Returns:
+            Tuple of (score, version of the model that produced it)
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((tensor, future, time.perf_counter()))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window_ms / 1000.0, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        items, self._pending = self._pending, []
+        if items:
+            # Keep a reference so the batch task is not garbage collected mid-flight
+            task = asyncio.ensure_future(self._run_batch(items))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run_batch(self, items):
+        started = time.perf_counter()
+        self.batch_size_histogram.observe(len(items))
+        for _, _, enqueued in items:
+            self.queue_wait_histogram.observe(started - enqueued)
+
+        try:
+            batch = np.concatenate([tensor for tensor, _, _ in items], axis=0)
+            scores, model_version = await self.executor.run(_predict_batch, batch)
+        except Exception as e:
+            for _, future, _ in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        # Scatter the batched output back to the awaiting requests
+        for (_, future, _), score in zip(items, scores):
+            if not future.done():
+                future.set_result((float(score), model_version))
+
+    def stats(self):
+        """
+        Batch size and queue wait histograms for tuning the window
+        """
+        return {
+            "enabled": self.enabled,
+            "window_ms": self.window_ms,
+            "max_batch_size": self.max_batch_size,
+            "batch_size": self.batch_size_histogram.snapshot(),
+            "queue_wait_seconds": self.queue_wait_histogram.snapshot()
+        }
+
+
+# Shared batcher used by the prediction routes
+micro_batcher = MicroBatcher.from_env()
+metrics_registry.register(micro_batcher.batch_size_histogram)
+metrics_registry.register(micro_batcher.queue_wait_histogram)
+metrics_registry.gauge("predict_batch_pending", "Requests waiting for the next CNN batch",
+                       callback=lambda: len(micro_batcher._pending))
+
+
+async def predict_risk_batched(
+    latitude: float,
+    longitude: float,
+    temperature: float,
+    humidity: float,
+    wind_speed: float,
+    precipitation: float,
+    vegetation_density: Optional[float] = None,
+    elevation: Optional[float] = None,
+    drought_index: Optional[float] = None
+):
+    """
+    Async counterpart of predict_risk that sends the CNN call through the micro-batcher
+    """
+    features = build_features(temperature, humidity, wind_speed, precipitation,
+                              vegetation_density, elevation, drought_index)
+    started = time.perf_counter()
+    preprocessed_input = preprocess_features(features, (latitude, longitude))
+    STAGE_SECONDS["preprocess"].observe(time.perf_counter() - started)
+
+    model_version = None
+    try:
+        original_risk_score, model_version = await micro_batcher.predict(preprocessed_input)
+        original_risk_level_idx = min(4, max(0, int(original_risk_score * 5)))
+        model_source = "cnn_model"
+    except ExecutorSaturatedError:
+        raise
+    except ModelUnavailableError:
+        # Logged with the prediction record
+        mock_result = mock_prediction(features)
+        original_risk_score = mock_result["risk_score"]
+        original_risk_level_idx = mock_result["risk_level_idx"]
+        model_source = "mock_no_model"
+    except Exception as e:
+        logger.error(f"Error during batched prediction with CNN model, using mock prediction: {str(e)}")
+        mock_result = mock_prediction(features)
+        original_risk_score = mock_result["risk_score"]
+        original_risk_level_idx = mock_result["risk_level_idx"]
+        model_source = "mock_due_to_error"
+
+    result = build_prediction(
+        temperature=temperature,
+        humidity=humidity,
+        wind_speed=wind_speed,
+        precipitation=precipitation,
+        vegetation_density=vegetation_density,
+        original_risk_score=original_risk_score,
+        original_risk_level_idx=original_risk_level_idx,
+        model_source=model_source,
+        model_version=model_version
+    )
+    prediction_log.record(result, latitude=latitude, longitude=longitude, temperature=temperature,
+                          humidity=humidity, wind_speed=wind_speed, precipitation=precipitation,
+                          vegetation_density=vegetation_density, elevation=elevation, drought_index=drought_index)
+    return result
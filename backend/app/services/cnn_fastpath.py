@@ -0,0 +1,185 @@
+import logging
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+logger = logging.getLogger(__name__)
+
+# Activations used by the wildfire CNN architecture
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0.0),
+    "sigmoid": lambda x: 1.0 / (1.0 + np.exp(-x))
+}
+
+
+class UnsupportedLayerError(Exception):
+    """
+    Raised when a model contains a layer the NumPy code paths cannot run
+    """
+
+
+def _check(condition, layer, message):
+    if not condition:
+        raise UnsupportedLayerError(f"{layer.__class__.__name__} '{layer.name}': {message}")
+
+
+def extract_layers(model):
+    """
+    Walk a Keras model, including nested Sequential/Functional models such as
+    the one written by setup_model.convert_model, into a list of layer specs.
+
+    Each spec is a dict with a "type" of conv2d, maxpool2d, flatten or dense
+    plus the weights and settings needed to run it. Dropout is skipped since
+    it is a no-op at inference time.
+
+    Raises:
+        UnsupportedLayerError: for layers or settings outside this architecture
+    """
+    specs = []
+    for layer in model.layers:
+        if hasattr(layer, "layers"):
+            specs.extend(extract_layers(layer))
+            continue
+
+        kind = layer.__class__.__name__
+        config = layer.get_config()
+        if kind in ("InputLayer", "Dropout"):
+            continue
+        if kind == "Conv2D":
+            _check(tuple(config["strides"]) == (1, 1), layer, "only stride 1 is supported")
+            _check(tuple(config["dilation_rate"]) == (1, 1), layer, "dilation is not supported")
+            _check(config["padding"] == "valid", layer, "only valid padding is supported")
+            _check(config.get("groups", 1) == 1, layer, "grouped convolution is not supported")
+            _check(config["activation"] in ACTIVATIONS, layer, f"unsupported activation {config['activation']}")
+            weights = layer.get_weights()
+            specs.append({
+                "type": "conv2d",
+                "kernel": weights[0].astype(np.float32),
+                "bias": (weights[1] if config["use_bias"] else np.zeros(weights[0].shape[-1])).astype(np.float32),
+                "activation": config["activation"]
+            })
+        elif kind == "MaxPooling2D":
+            _check(config["padding"] == "valid", layer, "only valid padding is supported")
+            specs.append({
+                "type": "maxpool2d",
+                "pool_size": tuple(config["pool_size"]),
+                "strides": tuple(config["strides"] or config["pool_size"])
+            })
+        elif kind == "Flatten":
+            specs.append({"type": "flatten"})
+        elif kind == "Dense":
+            _check(config["activation"] in ACTIVATIONS, layer, f"unsupported activation {config['activation']}")
+            weights = layer.get_weights()
+            specs.append({
+                "type": "dense",
+                "kernel": weights[0].astype(np.float32),
+                "bias": (weights[1] if config["use_bias"] else np.zeros(weights[0].shape[-1])).astype(np.float32),
+                "activation": config["activation"]
+            })
+        else:
+            raise UnsupportedLayerError(f"{kind} '{layer.name}' is not supported")
+    return specs
+
+
+def is_row_invariant(inputs):
+    """
+    True if every image in an (N, H, W, C) batch has identical rows
+    """
+    return bool(np.array_equal(inputs, np.broadcast_to(inputs[:, :1], inputs.shape)))
+
+
+def compile_row_plan(specs, input_height):
+    """
+    Turn layer specs into a plan that runs on a single (N, W, C) row strip.
+
+    For inputs whose rows are all identical, every conv/pool feature map is
+    constant down each column as long as padding is valid:
+      - a kh x kw convolution equals a 1 x kw convolution with the kernel
+        summed over its kh rows,
+      - max pooling reduces to pooling along the width only,
+      - the first Dense after Flatten sees the same row repeated H times, so
+        its kernel can be summed over those H rows.
+    Only the feature map height is tracked to know H at the Flatten.
+    """
+    plan = []
+    height = input_height
+    flattened_height = None
+    for spec in specs:
+        if spec["type"] == "conv2d":
+            kernel = spec["kernel"].astype(np.float64)
+            kh, kw, channels, filters = kernel.shape
+            # Order the summed kernel as (C, kw) to match sliding_window_view output
+            summed = kernel.sum(axis=0).transpose(1, 0, 2).reshape(channels * kw, filters)
+            plan.append(("conv", kw, summed.astype(np.float32), spec["bias"], spec["activation"]))
+            height = height - kh + 1
+        elif spec["type"] == "maxpool2d":
+            (ph, pw), (sh, sw) = spec["pool_size"], spec["strides"]
+            plan.append(("pool", pw, sw))
+            height = (height - ph) // sh + 1
+        elif spec["type"] == "flatten":
+            flattened_height = height
+            plan.append(("flatten",))
+        elif spec["type"] == "dense":
+            kernel = spec["kernel"]
+            if flattened_height is not None:
+                # Fold the H identical rows of the flattened map into one
+                kernel = kernel.astype(np.float64).reshape(flattened_height, -1, kernel.shape[-1]).sum(axis=0)
+                kernel = kernel.astype(np.float32)
+                flattened_height = None
+            plan.append(("dense", kernel, spec["bias"], spec["activation"]))
+        if height < 1:
+            raise UnsupportedLayerError(f"Feature map height drops below 1 for input height {input_height}")
+    return plan
+
+
+def run_row_plan(plan, rows):
+    """
+    Run a compiled row plan on (N, W, C) row strips and return the model output
+    """
+    x = np.asarray(rows, dtype=np.float32)
+    for step in plan:
+        if step[0] == "conv":
+            _, kw, kernel, bias, activation = step
+            windows = sliding_window_view(x, kw, axis=1)  # (N, W - kw + 1, C, kw)
+            n, width = windows.shape[:2]
+            x = windows.reshape(n * width, -1) @ kernel
+            x = ACTIVATIONS[activation](x + bias).reshape(n, width, -1)
+        elif step[0] == "pool":
+            _, pw, sw = step
+            x = sliding_window_view(x, pw, axis=1)[:, ::sw].max(axis=-1)
+        elif step[0] == "flatten":
+            x = x.reshape(len(x), -1)
+        elif step[0] == "dense":
+            _, kernel, bias, activation = step
+            x = ACTIVATIONS[activation](x @ kernel + bias)
+    return x
+
+
+class RowInvariantModel:
+    """
+    Wraps a Keras CNN with a fast path for heatmaps whose rows are identical.
+
+    preprocess_features only ever produces such heatmaps (channel values depend
+    on the column alone), so the conv stack is evaluated on one row strip with
+    NumPy instead of the full 128x128 map. Any batch that is not row-invariant
+    goes to the wrapped model unchanged.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.input_height = model.input_shape[1]
+        self.plan = compile_row_plan(extract_layers(model), self.input_height)
+        self.fast_calls = 0
+        self.fallback_calls = 0
+
+    def predict(self, inputs, verbose=0):
+        """
+        Keras-compatible predict returning an (N, outputs) array
+        """
+        inputs = np.asarray(inputs, dtype=np.float32)
+        if inputs.shape[1] == self.input_height and is_row_invariant(inputs):
+            self.fast_calls += 1
+            return run_row_plan(self.plan, inputs[:, 0])
+        self.fallback_calls += 1
+        return self.model.predict(inputs, verbose=verbose)
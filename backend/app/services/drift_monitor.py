@@ -0,0 +1,102 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.services.metrics import Histogram, metrics_registry
+from app.services.model_service import cnn_scores, feature_matrix
+
+logger = logging.getLogger(__name__)
+
+
+class DriftMonitor:
+    """
+    Computes CNN scores in the background for predictions answered in
+    "deferred" model mode and tracks how far they are from the adjusted score.
+
+    Comparisons run on a single low-priority thread. When more than
+    `max_pending` jobs are waiting, new ones are dropped rather than competing
+    with foreground inference.
+    """
+
+    def __init__(self, max_pending=64):
+        self.max_pending = max_pending
+        self._pending = 0
+        self._dropped = 0
+        self._compared = 0
+        self._lock = threading.Lock()
+        self._executor = None
+        self.difference_histogram = Histogram(
+            "cnn_adjusted_score_difference",
+            "Absolute difference between deferred CNN scores and adjusted scores",
+            [0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5]
+        )
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="drift-monitor")
+        return self._executor
+
+    def submit(self, columns, adjusted_scores):
+        """
+        Queue a background CNN comparison
+
+        Args:
+            columns: Columnar prediction inputs as accepted by predict_risk_batch
+            adjusted_scores: Final risk scores returned for those inputs
+
+        Returns:
+            False if the comparison was dropped because the monitor is busy
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._dropped += 1
+                return False
+            self._pending += 1
+        self._get_executor().submit(self._compare, columns, adjusted_scores)
+        return True
+
+    def _compare(self, columns, adjusted_scores):
+        try:
+            scores, _, model_source, _ = cnn_scores(feature_matrix(**columns))
+            if model_source != "cnn_model":
+                return
+            differences = np.abs(scores - np.asarray(adjusted_scores, dtype=np.float64))
+            for difference in differences:
+                self.difference_histogram.observe(float(difference))
+            with self._lock:
+                self._compared += len(differences)
+            logger.info(f"Deferred CNN comparison for {len(differences)} predictions: "
+                        f"mean difference {differences.mean():.4f}, max {differences.max():.4f}")
+        except Exception as e:
+            logger.error(f"Error in deferred CNN comparison: {str(e)}")
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def stats(self):
+        """
+        Comparison counters and the score difference histogram
+        """
+        return {
+            "pending": self._pending,
+            "compared": self._compared,
+            "dropped": self._dropped,
+            "difference": self.difference_histogram.snapshot()
+        }
+
+    def shutdown(self, wait=True):
+        """
+        Stop the background thread
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+# Shared monitor for deferred-mode predictions
+drift_monitor = DriftMonitor()
+metrics_registry.register(drift_monitor.difference_histogram)
@@ -0,0 +1,72 @@
+import logging
+import threading
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _tflite_interpreter_class():
+    # Prefer the standalone runtime so serving nodes can skip full TensorFlow
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+class TFLiteModel:
+    """
+    Serves a .tflite export of the CNN through the model.predict interface.
+
+    The interpreter is resized to each batch size it sees and is not
+    thread-safe, so calls are serialized with a lock.
+    """
+
+    def __init__(self, path, num_threads=None):
+        self.path = path
+        self.interpreter = _tflite_interpreter_class()(model_path=path, num_threads=num_threads)
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self.input_shape = tuple(self._input["shape"][1:])
+        self._batch_size = None
+        self._lock = threading.Lock()
+
+    def predict(self, inputs, verbose=0):
+        """
+        Keras-compatible predict returning an (N, outputs) array
+        """
+        inputs = np.asarray(inputs, dtype=np.float32)
+        with self._lock:
+            if len(inputs) != self._batch_size:
+                self.interpreter.resize_tensor_input(self._input["index"], [len(inputs), *self.input_shape])
+                self.interpreter.allocate_tensors()
+                self._batch_size = len(inputs)
+            self.interpreter.set_tensor(self._input["index"], inputs)
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self._output["index"]).copy()
+
+
+class OnnxModel:
+    """
+    Serves an ONNX export of the CNN with onnxruntime through the
+    model.predict interface
+    """
+
+    def __init__(self, path, num_threads=None):
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.path = path
+        self.session = onnxruntime.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self._input_name = self.session.get_inputs()[0].name
+
+    def predict(self, inputs, verbose=0):
+        """
+        Keras-compatible predict returning an (N, outputs) array
+        """
+        inputs = np.asarray(inputs, dtype=np.float32)
+        return self.session.run(None, {self._input_name: inputs})[0]
@@ -0,0 +1,160 @@
+import asyncio
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from app.services.metrics import metrics_registry
+from app.services.profiling import profiled
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorSaturatedError(Exception):
+    """
+    Raised when the inference executor has no free queue slots left
+    """
+
+
+def _default_workers():
+    """
+    Size the pool to TensorFlow's intra-op thread count when it is pinned,
+    otherwise to the number of CPUs
+    """
+    intra_op_threads = int(os.getenv("TF_NUM_INTRAOP_THREADS") or 0)
+    return intra_op_threads if intra_op_threads > 0 else (os.cpu_count() or 1)
+
+
+def _init_process_worker():
+    # Each worker process keeps its own resident model and swaps it on file changes
+    from app.services.model_service import model_registry
+    from app.services.model_watcher import model_watcher
+    from app.services.prediction_log import prediction_log
+    model_registry.load()
+    model_watcher.start()
+    prediction_log.start()
+
+
+class InferenceExecutor:
+    """
+    Bounded pool that runs blocking model inference off the asyncio event loop.
+
+    At most `queue_depth` calls may be running or waiting at once; further
+    submissions fail fast with ExecutorSaturatedError instead of queueing
+    without limit, which keeps tail latency bounded under bursts.
+    """
+
+    def __init__(self, max_workers=None, queue_depth=None, kind="thread"):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers or _default_workers()
+        self.queue_depth = queue_depth or self.max_workers * 4
+        self._in_flight = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build an executor from the INFERENCE_* environment variables
+        """
+        return cls(
+            max_workers=int(os.getenv("INFERENCE_WORKERS") or 0) or None,
+            queue_depth=int(os.getenv("INFERENCE_QUEUE_DEPTH") or 0) or None,
+            kind=(os.getenv("INFERENCE_EXECUTOR") or "thread").lower()
+        )
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.kind == "process":
+                        self._executor = ProcessPoolExecutor(
+                            max_workers=self.max_workers,
+                            initializer=_init_process_worker
+                        )
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.max_workers,
+                            thread_name_prefix="inference"
+                        )
+                    logger.info(f"Started {self.kind} inference executor with {self.max_workers} workers "
+                                f"and queue depth {self.queue_depth}")
+        return self._executor
+
+    def _acquire(self):
+        with self._lock:
+            if self._in_flight >= self.queue_depth:
+                self._rejected += 1
+                return False
+            self._in_flight += 1
+            return True
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._in_flight -= 1
+
+    @property
+    def in_flight(self):
+        """
+        Number of calls currently running or waiting for a worker
+        """
+        return self._in_flight
+
+    async def run(self, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) on the pool and await its result
+
+        Raises:
+            ExecutorSaturatedError: if the queue is full
+        """
+        if not self._acquire():
+            raise ExecutorSaturatedError(
+                f"Inference queue is full ({self.queue_depth} requests in flight)"
+            )
+        call = functools.partial(fn, *args, **kwargs)
+        if self.kind == "thread":
+            # Include the call in the request's profile when it is being profiled
+            call = profiled(call)
+        try:
+            future = self._get_executor().submit(call)
+        except Exception:
+            self._release()
+            raise
+        # Release the slot when the work really finishes, even if the awaiting
+        # request is cancelled while the call is still running
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def stats(self):
+        """
+        Snapshot of executor occupancy
+        """
+        return {
+            "kind": self.kind,
+            "workers": self.max_workers,
+            "queue_depth": self.queue_depth,
+            "in_flight": self._in_flight,
+            "rejected": self._rejected
+        }
+
+    def shutdown(self, wait=True):
+        """
+        Stop the worker pool
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+# Shared executor used by the prediction routes
+inference_executor = InferenceExecutor.from_env()
+metrics_registry.gauge("inference_executor_in_flight", "Inference calls running or waiting for a worker",
+                       callback=lambda: inference_executor.in_flight)
+metrics_registry.gauge("inference_executor_queue_depth", "Inference calls admitted before requests are rejected",
+                       callback=lambda: inference_executor.queue_depth)
+metrics_registry.counter("inference_executor_rejected_total", "Requests rejected because the inference queue was full",
+                         callback=lambda: inference_executor._rejected)
@@ -0,0 +1,172 @@
+import bisect
+import threading
+
+# Buckets in seconds for per-stage timings, from a few microseconds up
+LATENCY_BUCKETS = [0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0]
+
+
+def _format_labels(labels, extra=None):
+    items = list((labels or {}).items()) + list((extra or {}).items())
+    if not items:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in items)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(items, escaped)) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram that is cheap enough to update on every request
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, description, buckets, labels=None):
+        self.name = name
+        self.description = description
+        self.labels = labels or {}
+        self.buckets = sorted(buckets)
+        # One extra slot for observations above the largest bucket (+Inf)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self):
+        """
+        Cumulative bucket counts, sum and count of all observations
+        """
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        cumulative = []
+        running = 0
+        for bound, bucket_count in zip(self.buckets + [float("inf")], counts):
+            running += bucket_count
+            cumulative.append(("+Inf" if bound == float("inf") else bound, running))
+        return {
+            "buckets": cumulative,
+            "sum": total,
+            "count": count,
+            "mean": total / count if count else 0.0
+        }
+
+    def samples(self):
+        """
+        Prometheus sample lines for this histogram
+        """
+        snapshot = self.snapshot()
+        lines = [
+            f"{self.name}_bucket{_format_labels(self.labels, {'le': _format_value(bound)})} {running}"
+            for bound, running in snapshot["buckets"]
+        ]
+        lines.append(f"{self.name}_sum{_format_labels(self.labels)} {_format_value(snapshot['sum'])}")
+        lines.append(f"{self.name}_count{_format_labels(self.labels)} {snapshot['count']}")
+        return lines
+
+
+class Counter:
+    """
+    Monotonically increasing count, e.g. predictions per model source. A
+    callback can expose a count another object already keeps.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name, description, labels=None, callback=None):
+        self.name = name
+        self.description = description
+        self.labels = labels or {}
+        self.callback = callback
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self):
+        value = self.callback() if self.callback is not None else self.value
+        return [f"{self.name}{_format_labels(self.labels)} {_format_value(value)}"]
+
+
+class Gauge:
+    """
+    Current value of something, either set explicitly or read from a callback
+    when the metrics are scraped (so hot paths pay nothing)
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name, description, labels=None, callback=None):
+        self.name = name
+        self.description = description
+        self.labels = labels or {}
+        self.callback = callback
+        self.value = 0
+
+    def set(self, value):
+        self.value = value
+
+    def samples(self):
+        value = self.callback() if self.callback is not None else self.value
+        return [f"{self.name}{_format_labels(self.labels)} {_format_value(value)}"]
+
+
+class MetricsRegistry:
+    """
+    Collects metrics from every module and renders them in the Prometheus
+    text exposition format. Metrics sharing a name (with different labels)
+    are emitted as one family.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, description, labels=None, callback=None):
+        return self.register(Counter(name, description, labels, callback))
+
+    def gauge(self, name, description, labels=None, callback=None):
+        return self.register(Gauge(name, description, labels, callback))
+
+    def histogram(self, name, description, buckets=LATENCY_BUCKETS, labels=None):
+        return self.register(Histogram(name, description, buckets, labels))
+
+    def render(self):
+        """
+        Text exposition of all registered metrics
+        """
+        with self._lock:
+            metrics = list(self._metrics)
+        families = {}
+        for metric in metrics:
+            families.setdefault(metric.name, []).append(metric)
+        lines = []
+        for name, family in families.items():
+            lines.append(f"# HELP {name} {family[0].description}")
+            lines.append(f"# TYPE {name} {family[0].kind}")
+            for metric in family:
+                lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry exported by the /metrics endpoint
+metrics_registry = MetricsRegistry()
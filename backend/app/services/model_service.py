@@ -1,12 +1,16 @@
-import joblib
+import hashlib
+import importlib
 import os
 import logging
+import threading
+import time
 import numpy as np
-import tensorflow as tf
-from PIL import Image
-from io import BytesIO
+from contextlib import contextmanager
 from typing import Dict, List, Any, Optional
 
+from app.services.metrics import metrics_registry
+from app.services.prediction_log import prediction_log
+
 logger = logging.getLogger(__name__)
 
 # Define the path to the CNN model file
@@ -16,6 +20,34 @@ CONVERTED_MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirn
                          "models", "wildfire_cnn_model_converted.h5")
 NEW_MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
                          "models", "wildfire_cnn_model_new.h5")
+# Lookup table approximating the CNN, written by build_surrogate.py
+SURROGATE_MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
+                         "models", "wildfire_cnn_surrogate.npz")
+# CNN weights for the NumPy runtime, written by export_numpy_model.py
+NUMPY_MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
+                         "models", "wildfire_cnn_model.npz")
+# TFLite and ONNX exports of the CNN, written by export_optimized_models.py
+TFLITE_VARIANTS = ("float32", "float16", "int8")
+TFLITE_MODEL_PATHS = {
+    variant: os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+                          "models", f"wildfire_cnn_model_{variant}.tflite")
+    for variant in TFLITE_VARIANTS
+}
+ONNX_MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
+                         "models", "wildfire_cnn_model.onnx")
+
+# Inference backend serving CNN scores: "keras" loads the .h5 model files,
+# "numpy" runs the exported weights without TensorFlow, "tflite" and "onnx"
+# serve the exported (optionally quantized) graphs and "surrogate"
+# interpolates the precomputed lookup table without running the CNN
+INFERENCE_BACKEND = (os.getenv("INFERENCE_BACKEND") or "keras").lower()
+
+# Which TFLite export the "tflite" backend serves, and interpreter threads (0 = runtime default)
+TFLITE_VARIANT = (os.getenv("TFLITE_VARIANT") or "float16").lower()
+INFERENCE_NUM_THREADS = int(os.getenv("INFERENCE_NUM_THREADS") or 0)
+
+# Evaluate Keras models on a single row strip when the heatmap rows are identical
+ROW_INVARIANT_FASTPATH = (os.getenv("CNN_ROW_INVARIANT") or "true").lower() == "true"
 
 # Risk levels mapping
 RISK_LEVELS = {
@@ -26,6 +58,33 @@ RISK_LEVELS = {
     4: "Extreme"
 }
 
+# Weights of the normalized factors in the adjusted risk score
+FACTOR_WEIGHTS = {
+    "temperature": 0.3,
+    "humidity": 0.25,
+    "wind": 0.2,
+    "precipitation": 0.15,
+    "vegetation": 0.1
+}
+
+# Factor descriptions returned with each prediction
+FACTOR_DESCRIPTIONS = {
+    "temperature": "Higher temperatures increase wildfire risk",
+    "humidity": "Lower humidity increases wildfire risk",
+    "wind_speed": "Higher wind speeds can spread wildfires faster",
+    "precipitation": "Lower precipitation leads to drier conditions and higher risk",
+    "vegetation_density": "Higher vegetation density provides more fuel for wildfires"
+}
+
+# Scoring modes: "full" runs the CNN inline for model_details, "adjusted" only
+# computes the weighted-factor score, "deferred" answers like "adjusted" and
+# leaves the CNN comparison to background drift monitoring
+MODEL_MODES = ("full", "adjusted", "deferred")
+DEFAULT_MODEL_MODE = (os.getenv("MODEL_MODE") or "full").lower()
+
+# Number of heatmaps sent to the CNN per model call in batch predictions
+CNN_BATCH_SIZE = int(os.getenv("CNN_BATCH_SIZE") or 64)
+
 # Recommendations based on risk levels
 RECOMMENDATIONS = {
     "Low": [
@@ -62,47 +121,600 @@ RECOMMENDATIONS = {
     ]
 }
 
-def load_model():
+# Stages of a single prediction timed for /metrics
+PREDICT_STAGES = ("model_lookup", "preprocess", "inference", "adjusted_scoring", "response_assembly", "serialization")
+STAGE_SECONDS = {
+    stage: metrics_registry.histogram(
+        "predict_stage_seconds", "Time spent in each stage of a prediction request", labels={"stage": stage})
+    for stage in PREDICT_STAGES
+}
+
+# Every model_source a prediction can report
+MODEL_SOURCES = ("cnn_model", "mock_due_to_error", "mock_no_model", "skipped", "deferred")
+PREDICTIONS_TOTAL = {
+    source: metrics_registry.counter(
+        "predictions_total", "Predictions served, by the source of the original score", {"model_source": source})
+    for source in MODEL_SOURCES
+}
+
+# Model files in order of preference: (variant name, path, compile flag)
+MODEL_CANDIDATES = [
+    ("new", NEW_MODEL_PATH, True),
+    ("converted", CONVERTED_MODEL_PATH, False),
+    ("original", CNN_MODEL_PATH, False),
+]
+
+def _configure_tf_threads(tf):
     """
-    Load the CNN model from disk
+    Apply TF_NUM_INTRAOP_THREADS / TF_NUM_INTEROP_THREADS (e.g. as pinned per
+    worker by serve.py) before TensorFlow creates its thread pools
     """
+    intra_op_threads = int(os.getenv("TF_NUM_INTRAOP_THREADS") or 0)
+    inter_op_threads = int(os.getenv("TF_NUM_INTEROP_THREADS") or 0)
     try:
-        # First try to load the new model
-        if os.path.exists(NEW_MODEL_PATH):
-            model = tf.keras.models.load_model(
-                NEW_MODEL_PATH,
-                compile=True
-            )
-            logger.info("New CNN model loaded successfully")
-            return model
-        # Then try the converted model
-        elif os.path.exists(CONVERTED_MODEL_PATH):
-            model = tf.keras.models.load_model(
-                CONVERTED_MODEL_PATH,
-                compile=False
-            )
-            logger.info("Converted CNN model loaded successfully")
-            return model
-        # Finally try the original model
-        elif os.path.exists(CNN_MODEL_PATH):
-            # Use a custom loader with specific options to handle version differences
-            try:
-                model = tf.keras.models.load_model(
-                    CNN_MODEL_PATH,
-                    compile=False
-                )
-                logger.info("Original CNN model loaded successfully")
-                return model
-            except Exception as e:
-                logger.error(f"Error loading original model: {str(e)}")
-                logger.warning("Using mock prediction due to model loading error")
-                return None
-        else:
-            logger.warning(f"CNN model not found at any location. Using mock model for development.")
-            return None
+        if intra_op_threads:
+            tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+        if inter_op_threads:
+            tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+    except RuntimeError as e:
+        # Thread pools can only be sized before the runtime initializes
+        logger.warning(f"Could not set TensorFlow thread counts: {str(e)}")
+
+def _load_model_variant():
+    """
+    Load the first CNN model file that exists on disk
+
+    Returns:
+        Tuple of (model, variant, path); model is None if nothing could be loaded
+    """
+    for variant, path, compile_model in MODEL_CANDIDATES:
+        if not os.path.exists(path):
+            continue
+        try:
+            # TensorFlow takes seconds to import, so it is only pulled in here
+            import tensorflow as tf
+            _configure_tf_threads(tf)
+
+            # Use specific load options to handle version differences between model files
+            model = tf.keras.models.load_model(path, compile=compile_model)
+            logger.info(f"{variant.capitalize()} CNN model loaded successfully")
+            return model, variant, path
+        except Exception as e:
+            logger.error(f"Error loading {variant} CNN model: {str(e)}")
+            logger.warning("Using mock prediction due to model loading error")
+            return None, None, None
+
+    logger.warning(f"CNN model not found at any location. Using mock model for development.")
+    return None, None, None
+
+def _load_surrogate():
+    """
+    Load the surrogate lookup table
+
+    Returns:
+        Tuple of (model, variant, path); model is None if the table is unavailable
+    """
+    from app.services.surrogate import SurrogateModel
+
+    if not os.path.exists(SURROGATE_MODEL_PATH):
+        logger.warning(f"Surrogate table not found at {SURROGATE_MODEL_PATH}. Run build_surrogate.py first.")
+        return None, None, None
+    try:
+        model = SurrogateModel.load(SURROGATE_MODEL_PATH)
+        logger.info(f"Surrogate CNN table loaded successfully (max error {model.max_error})")
+        return model, "surrogate", SURROGATE_MODEL_PATH
     except Exception as e:
-        logger.error(f"Error loading CNN model: {str(e)}")
-        return None
+        logger.error(f"Error loading surrogate table: {str(e)}")
+        return None, None, None
+
+def _load_numpy_model():
+    """
+    Load the exported CNN weights into the NumPy runtime
+
+    Returns:
+        Tuple of (model, variant, path); model is None if the weights are unavailable
+    """
+    from app.services.numpy_cnn import NumpyCNN
+
+    if not os.path.exists(NUMPY_MODEL_PATH):
+        logger.warning(f"NumPy CNN weights not found at {NUMPY_MODEL_PATH}. Run export_numpy_model.py first.")
+        return None, None, None
+    try:
+        model = NumpyCNN.load(NUMPY_MODEL_PATH)
+        logger.info("NumPy CNN model loaded successfully")
+        return model, "numpy", NUMPY_MODEL_PATH
+    except Exception as e:
+        logger.error(f"Error loading NumPy CNN weights: {str(e)}")
+        return None, None, None
+
+def _load_tflite_model():
+    """
+    Load the configured TFLite export of the CNN
+
+    Returns:
+        Tuple of (model, variant, path); model is None if the export is unavailable
+    """
+    from app.services.exported_models import TFLiteModel
+
+    path = TFLITE_MODEL_PATHS.get(TFLITE_VARIANT)
+    if path is None:
+        raise ValueError(f"Unknown TFLite variant '{TFLITE_VARIANT}', expected one of {list(TFLITE_VARIANTS)}")
+    if not os.path.exists(path):
+        logger.warning(f"TFLite model not found at {path}. Run export_optimized_models.py first.")
+        return None, None, None
+    try:
+        model = TFLiteModel(path, num_threads=INFERENCE_NUM_THREADS or None)
+        logger.info(f"TFLite {TFLITE_VARIANT} CNN model loaded successfully")
+        return model, f"tflite-{TFLITE_VARIANT}", path
+    except Exception as e:
+        logger.error(f"Error loading TFLite model: {str(e)}")
+        return None, None, None
+
+def _load_onnx_model():
+    """
+    Load the ONNX export of the CNN with onnxruntime
+
+    Returns:
+        Tuple of (model, variant, path); model is None if the export or runtime is unavailable
+    """
+    from app.services.exported_models import OnnxModel
+
+    if not os.path.exists(ONNX_MODEL_PATH):
+        logger.warning(f"ONNX model not found at {ONNX_MODEL_PATH}. Run export_optimized_models.py first.")
+        return None, None, None
+    try:
+        model = OnnxModel(ONNX_MODEL_PATH, num_threads=INFERENCE_NUM_THREADS or None)
+        logger.info("ONNX CNN model loaded successfully")
+        return model, "onnx", ONNX_MODEL_PATH
+    except Exception as e:
+        logger.error(f"Error loading ONNX model: {str(e)}")
+        return None, None, None
+
+# Loaders for each inference backend, returning (model, variant, path)
+BACKEND_LOADERS = {
+    "keras": _load_model_variant,
+    "numpy": _load_numpy_model,
+    "tflite": _load_tflite_model,
+    "onnx": _load_onnx_model,
+    "surrogate": _load_surrogate
+}
+
+# Heavy runtime modules each backend imports on first load
+BACKEND_IMPORTS = {
+    "keras": ("tensorflow",),
+    "onnx": ("onnxruntime",)
+}
+
+def import_backend(backend=None):
+    """
+    Import the runtime modules a backend needs, so their cost is paid (and
+    timed) separately from reading the model file
+    """
+    backend = backend or INFERENCE_BACKEND
+    if backend == "tflite":
+        from app.services.exported_models import _tflite_interpreter_class
+        _tflite_interpreter_class()
+        return
+    for module in BACKEND_IMPORTS.get(backend, ()):
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            logger.warning(f"Could not import {module} for the {backend} backend: {str(e)}")
+
+def load_inference_model(backend=None):
+    """
+    Load the model for the configured (or given) inference backend
+
+    Returns:
+        Tuple of (model, variant, path); model is None if nothing could be loaded
+    """
+    backend = backend or INFERENCE_BACKEND
+    if backend not in BACKEND_LOADERS:
+        raise ValueError(f"Unknown inference backend '{backend}', expected one of {list(BACKEND_LOADERS)}")
+    return BACKEND_LOADERS[backend]()
+
+def load_model(backend=None):
+    """
+    Load the CNN model from disk for the configured (or given) inference backend
+    """
+    model, _, _ = load_inference_model(backend)
+    return model
+
+def backend_files(backend=None):
+    """
+    Model files a backend may load from, watched for changes by ModelWatcher
+    """
+    backend = backend or INFERENCE_BACKEND
+    if backend == "keras":
+        return [path for _, path, _ in MODEL_CANDIDATES]
+    if backend == "tflite":
+        return [TFLITE_MODEL_PATHS.get(TFLITE_VARIANT)]
+    paths = {"numpy": NUMPY_MODEL_PATH, "onnx": ONNX_MODEL_PATH, "surrogate": SURROGATE_MODEL_PATH}
+    return [paths[backend]] if backend in paths else []
+
+def files_signature(paths):
+    """
+    (path, mtime, size) of each file, with None for files that do not exist
+    """
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        except (OSError, TypeError):
+            signature.append((path, None, None))
+    return tuple(signature)
+
+def _file_digest(path):
+    # Short content hash identifying the exact weights a prediction used
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+class ModelVersion:
+    """
+    One loaded model together with the requests currently using it.
+
+    `version` is "<variant>@<content hash>" and is reported in model_details.
+    `in_flight` counts callers inside ModelRegistry.acquire(), so a version
+    that was swapped out can be released once its last request finishes.
+    """
+
+    def __init__(self, model, backend, variant, path, signature=None, row_invariant=False):
+        self.model = model
+        self.backend = backend
+        self.variant = variant
+        self.path = path
+        self.signature = signature
+        self.row_invariant = row_invariant
+        self.version = f"{variant}@{_file_digest(path)}" if model is not None and path else None
+        self.loaded_at = time.time()
+        self.warmed_up = False
+        self.in_flight = 0
+        self._drained = threading.Condition()
+
+    def enter(self):
+        with self._drained:
+            self.in_flight += 1
+
+    def exit(self):
+        with self._drained:
+            self.in_flight -= 1
+            if self.in_flight == 0:
+                self._drained.notify_all()
+
+    def wait_drained(self, timeout=None):
+        """
+        Block until no request is using this version; False on timeout
+        """
+        with self._drained:
+            return self._drained.wait_for(lambda: self.in_flight == 0, timeout)
+
+class ModelRegistry:
+    """
+    Process-wide holder for the CNN model.
+
+    The model is deserialized once (at application startup, in a background
+    thread, or on first use) and the same instance is handed to every
+    prediction instead of reloading the .h5 file per request. The time spent
+    importing the backend, loading the model and running the first inference
+    is kept in `startup` for the startup report.
+
+    reload() swaps in a new model without downtime: the replacement is loaded
+    and warmed up while the current one keeps serving, traffic moves over in
+    one assignment, and the old version is released once the requests that
+    acquired it have finished.
+    """
+
+    def __init__(self, img_size=128, backend=None, drain_timeout=30.0):
+        self.img_size = img_size
+        self.backend = backend or INFERENCE_BACKEND
+        self.drain_timeout = drain_timeout
+        self.active = None
+        self.startup = {}
+        self.swaps = 0
+        self._draining = []
+        self._swap_listeners = []
+        self._loading = False
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self.active is not None
+
+    @property
+    def model(self):
+        return self.active.model if self.active is not None else None
+
+    @property
+    def variant(self):
+        return self.active.variant if self.active is not None else None
+
+    @property
+    def path(self):
+        return self.active.path if self.active is not None else None
+
+    @property
+    def version(self):
+        return self.active.version if self.active is not None else None
+
+    @property
+    def warmed_up(self):
+        return self.active is not None and self.active.warmed_up
+
+    @property
+    def row_invariant(self):
+        return self.active is not None and self.active.row_invariant
+
+    @property
+    def state(self):
+        """
+        "idle", "loading", "ready", or "unavailable" when loading found no model
+        """
+        if self.active is not None:
+            return "ready" if self.active.model is not None else "unavailable"
+        return "loading" if self._loading else "idle"
+
+    @property
+    def ready(self):
+        return self.state == "ready"
+
+    def _load_version(self, backend, warmup):
+        # Import, load and warm up a model without touching the active version
+        started = time.perf_counter()
+        import_backend(backend)
+        imported = time.perf_counter()
+        signature = files_signature(backend_files(backend))
+        model, variant, path = load_inference_model(backend)
+        row_invariant = False
+        if backend == "keras" and ROW_INVARIANT_FASTPATH:
+            model, row_invariant = self._with_row_invariant_fastpath(model)
+        candidate = ModelVersion(model, backend, variant, path, signature, row_invariant)
+        loaded = time.perf_counter()
+        if warmup:
+            self._warmup(candidate)
+        timings = {
+            "import_seconds": round(imported - started, 3),
+            "load_seconds": round(loaded - imported, 3),
+            "first_inference_seconds": round(time.perf_counter() - loaded, 3) if warmup else None,
+            "total_seconds": round(time.perf_counter() - started, 3)
+        }
+        return candidate, timings
+
+    def load(self, warmup=True):
+        """
+        Load the model if it has not been loaded yet and optionally warm it up
+        """
+        with self._lock:
+            if self.active is None:
+                self._loading = True
+                try:
+                    self.active, self.startup = self._load_version(self.backend, warmup)
+                finally:
+                    self._loading = False
+                logger.info(f"Model registry {self.state} after {self.startup['total_seconds']}s: {self.startup}")
+        return self.model
+
+    def load_in_background(self, warmup=True):
+        """
+        Start loading the model in a daemon thread; requests needing the model
+        before it is ready wait in get() for the load to finish
+        """
+        self._loading = True
+        thread = threading.Thread(target=self.load, kwargs={"warmup": warmup},
+                                  name="model-loader", daemon=True)
+        thread.start()
+        return thread
+
+    def reload(self, backend=None):
+        """
+        Load and warm up a replacement model, then atomically switch traffic to it
+
+        The current model keeps serving if the replacement cannot be loaded or
+        fails its warmup inference.
+
+        Returns:
+            True if the new model is now serving
+        """
+        backend = backend or self.backend
+        if backend not in BACKEND_LOADERS:
+            raise ValueError(f"Unknown inference backend '{backend}', expected one of {list(BACKEND_LOADERS)}")
+        with self._reload_lock:
+            candidate, timings = self._load_version(backend, warmup=True)
+            if candidate.model is None or not candidate.warmed_up:
+                logger.error(f"Keeping model {self.version}: replacement {backend} model failed to load or warm up")
+                return False
+            with self._lock:
+                previous, self.active = self.active, candidate
+                self.backend = backend
+                self.swaps += 1
+            logger.info(f"Swapped model {previous.version if previous else None} -> {candidate.version} "
+                        f"in {timings['total_seconds']}s")
+            for listener in self._swap_listeners:
+                try:
+                    listener(candidate)
+                except Exception as e:
+                    logger.error(f"Model swap listener failed: {str(e)}")
+            if previous is not None:
+                self._retire(previous)
+            return True
+
+    def _retire(self, version):
+        # Drop the swapped-out version once its in-flight requests have finished
+        self._draining.append(version)
+
+        def drain():
+            if version.wait_drained(self.drain_timeout):
+                logger.info(f"Model {version.version} drained and released")
+            else:
+                logger.warning(f"Model {version.version} still had {version.in_flight} requests "
+                               f"after {self.drain_timeout}s, releasing it anyway")
+            self._draining.remove(version)
+            version.model = None
+
+        threading.Thread(target=drain, name="model-drain", daemon=True).start()
+
+    def add_swap_listener(self, listener):
+        """
+        Call listener(new_version) after every successful reload
+        """
+        self._swap_listeners.append(listener)
+
+    def _with_row_invariant_fastpath(self, model):
+        # Wrap the Keras model so synthetic heatmaps skip most convolution work
+        if model is None:
+            return None, False
+        from app.services.cnn_fastpath import RowInvariantModel, UnsupportedLayerError
+        try:
+            wrapped = RowInvariantModel(model)
+            logger.info("Row-invariant fast path enabled for CNN model")
+            return wrapped, True
+        except UnsupportedLayerError as e:
+            logger.warning(f"Row-invariant fast path unavailable: {str(e)}")
+            return model, False
+
+    def _warmup(self, version):
+        # Run a dummy tensor through the model so the first real request
+        # does not pay for graph tracing and kernel initialization
+        if version.model is None:
+            return
+        try:
+            dummy = np.zeros((1, self.img_size, self.img_size, 3), dtype=np.float32)
+            version.model.predict(dummy, verbose=0)
+            version.warmed_up = True
+            logger.info(f"Warmed up {version.variant} CNN model")
+        except Exception as e:
+            logger.error(f"Error warming up CNN model: {str(e)}")
+
+    def get(self):
+        """
+        Return the resident model, loading it on first use
+        """
+        if self.active is None:
+            return self.load()
+        return self.model
+
+    @contextmanager
+    def acquire(self):
+        """
+        Hold the active model version for the duration of a prediction, so a
+        concurrent reload() waits for this request before releasing it
+        """
+        if self.active is None:
+            self.load()
+        with self._lock:
+            version = self.active
+            version.enter()
+        try:
+            yield version
+        finally:
+            version.exit()
+
+    def info(self):
+        """
+        Describe which model variant is currently loaded
+        """
+        return {
+            "loaded": self.loaded,
+            "state": self.state,
+            "backend": self.backend,
+            "variant": self.variant if self.model is not None else "mock",
+            "version": self.version,
+            "path": os.path.basename(self.path) if self.path else None,
+            "loaded_at": self.active.loaded_at if self.active is not None else None,
+            "row_invariant_fastpath": self.row_invariant,
+            "warmed_up": self.warmed_up,
+            "swaps": self.swaps,
+            "draining": len(self._draining),
+            "startup": self.startup
+        }
+
+# Shared registry used by every request in this process
+model_registry = ModelRegistry()
+
+# Default feature values used when a feature row is shorter than the full vector:
+# temperature, humidity, wind speed, precipitation, vegetation, elevation, drought
+FEATURE_DEFAULTS = [25.0, 50.0, 10.0, 0.0, 0.5, 300.0, 0.3]
+
+def _feature_matrix(features_batch):
+    """
+    Convert a batch of feature rows to an (N, 7) float array, filling missing
+    trailing features with their defaults
+    """
+    matrix = np.asarray(features_batch, dtype=np.float64)
+    if matrix.ndim == 1:
+        matrix = matrix[np.newaxis, :]
+    n_rows, n_cols = matrix.shape
+    if n_cols < len(FEATURE_DEFAULTS):
+        defaults = np.tile(FEATURE_DEFAULTS[n_cols:], (n_rows, 1))
+        matrix = np.hstack([matrix, defaults])
+    return matrix
+
+def heatmap_params(features_batch):
+    """
+    Compute the per-row channel parameters that fully determine the heatmap.
+
+    Args:
+        features_batch: Sequence of N feature rows (see FEATURE_DEFAULTS for order)
+
+    Returns:
+        (N, 4) float64 array of [red, green, blue, wind] values. Red, green and
+        blue are the base channel values, wind is the normalized wind speed that
+        drives the left-to-right ramp.
+    """
+    matrix = _feature_matrix(features_batch)
+
+    # Normalize values
+    temp_norm = np.clip((matrix[:, 0] - 15) / 25, 0.0, 1.0)  # Normalize temp between 15-40°C
+    humidity_norm = np.clip(matrix[:, 1] / 100, 0.0, 1.0)
+    wind_norm = np.clip(matrix[:, 2] / 50, 0.0, 1.0)  # Normalize wind speed between 0-50 km/h
+    precip_norm = np.clip(matrix[:, 3] / 25, 0.0, 1.0)  # Normalize precipitation between 0-25 mm
+    veg_norm = np.clip(matrix[:, 4], 0.0, 1.0)
+    drought_norm = np.clip(matrix[:, 6], 0.0, 1.0)
+
+    # Red channel - temperature and drought (higher = redder)
+    # Green channel - humidity and vegetation (higher = greener)
+    # Blue channel - precipitation (higher = bluer)
+    red = temp_norm * (1 + drought_norm * 0.5)
+    green = (humidity_norm + veg_norm) / 2
+    blue = precip_norm
+
+    return np.stack([red, green, blue, wind_norm], axis=1)
+
+def render_heatmaps(params, img_size=128):
+    """
+    Render (N, 4) heatmap parameters into an (N, img_size, img_size, 3) tensor
+    """
+    params = np.asarray(params, dtype=np.float64)
+    # Base channel values are stored as float32 before the wind effect is applied
+    base = params[:, :3].astype(np.float32).astype(np.float64)
+
+    # Add wind effect (creates directional patterns): it only depends on the
+    # column, increasing red and decreasing blue to simulate drying effect
+    wind_effect = params[:, 3:4] * (np.arange(img_size) / img_size)
+    rows = np.empty((params.shape[0], img_size, 3), dtype=np.float32)
+    rows[:, :, 0] = np.minimum(1.0, base[:, 0:1] + (wind_effect * 0.2))
+    rows[:, :, 1] = base[:, 1:2]
+    rows[:, :, 2] = np.maximum(0.0, base[:, 2:3] - (wind_effect * 0.1))
+
+    # Every row of the image is identical, so repeat the single row strip
+    return np.repeat(rows[:, np.newaxis, :, :], img_size, axis=1)
+
+def preprocess_features_batch(features_batch, img_size=128):
+    """
+    Convert a batch of feature rows to CNN input tensors in one vectorized pass.
+
+    Args:
+        features_batch: Sequence of N feature rows (see FEATURE_DEFAULTS for order)
+        img_size: Size of images the model was trained on
+
+    Returns:
+        (N, img_size, img_size, 3) float32 tensor
+    """
+    return render_heatmaps(heatmap_params(features_batch), img_size)
 
 def preprocess_features(features, coordinates=None, img_size=128):
     """
@@ -117,60 +729,10 @@ def preprocess_features(features, coordinates=None, img_size=128):
         Preprocessed image tensor suitable for CNN model input
     """
     try:
-        # Extract features
-        temperature = features[0] if len(features) > 0 else 25.0
-        humidity = features[1] if len(features) > 1 else 50.0
-        wind_speed = features[2] if len(features) > 2 else 10.0
-        precipitation = features[3] if len(features) > 3 else 0.0
-        vegetation_density = features[4] if len(features) > 4 else 0.5
-        elevation = features[5] if len(features) > 5 else 300.0
-        drought_index = features[6] if len(features) > 6 else 0.3
-        
         # Create a heatmap representation of the features for CNN input
         # This approach creates a synthetic image from our weather data
         # For a real implementation, you might fetch actual satellite imagery
-        heatmap = np.zeros((img_size, img_size, 3), dtype=np.float32)
-        
-        # Normalize values
-        temp_norm = min(1.0, max(0.0, (temperature - 15) / 25))  # Normalize temp between 15-40°C
-        humidity_norm = min(1.0, max(0.0, humidity / 100))
-        wind_norm = min(1.0, max(0.0, wind_speed / 50))  # Normalize wind speed between 0-50 km/h
-        precip_norm = min(1.0, max(0.0, precipitation / 25))  # Normalize precipitation between 0-25 mm
-        veg_norm = min(1.0, max(0.0, vegetation_density))
-        drought_norm = min(1.0, max(0.0, drought_index))
-        
-        # Generate a heatmap representation of the data:
-        # Red channel - temperature and drought (higher = redder)
-        # Green channel - humidity and vegetation (higher = greener)
-        # Blue channel - precipitation (higher = bluer)
-        
-        # Fill the red channel with temperature (higher = redder)
-        heatmap[:, :, 0] = temp_norm * (1 + drought_norm * 0.5)
-        
-        # Fill the green channel with humidity and vegetation (higher = greener)
-        heatmap[:, :, 1] = (humidity_norm + veg_norm) / 2
-        
-        # Fill the blue channel with precipitation (higher = bluer)
-        heatmap[:, :, 2] = precip_norm
-        
-        # Add some variation based on wind speed
-        # This creates patterns in the image
-        for i in range(img_size):
-            for j in range(img_size):
-                # Add wind effect (creates directional patterns)
-                wind_effect = wind_norm * (j / img_size)
-                
-                # Apply wind effect - increases red, decreases blue to simulate drying effect
-                heatmap[i, j, 0] = min(1.0, heatmap[i, j, 0] + (wind_effect * 0.2))
-                heatmap[i, j, 2] = max(0.0, heatmap[i, j, 2] - (wind_effect * 0.1))
-        
-        # Add batch dimension for CNN model
-        input_tensor = np.expand_dims(heatmap, axis=0)
-        
-        # Scale to 0-255 range if your model expects it
-        # input_tensor = input_tensor * 255.0
-        
-        return input_tensor
+        return preprocess_features_batch([features], img_size)
         
     except Exception as e:
         logger.error(f"Error in preprocessing features: {str(e)}")
@@ -216,9 +778,16 @@ def mock_prediction(features):
         "confidence": float(confidence)
     }
 
-def predict_risk(
-    latitude: float,
-    longitude: float,
+def resolve_model_mode(model_mode: Optional[str] = None):
+    """
+    Return the scoring mode for a request, falling back to the deployment default
+    """
+    mode = (model_mode or DEFAULT_MODEL_MODE).lower()
+    if mode not in MODEL_MODES:
+        raise ValueError(f"Unknown model mode '{mode}', expected one of {MODEL_MODES}")
+    return mode
+
+def build_features(
     temperature: float,
     humidity: float,
     wind_speed: float,
@@ -228,15 +797,8 @@ def predict_risk(
     drought_index: Optional[float] = None
 ):
     """
-    Predict wildfire risk based on weather and environmental data
+    Assemble the model feature vector, filling in defaults for missing optional inputs
     """
-    # Detailed logging of input parameters
-    logger.info(f"Prediction request received with parameters:")
-    logger.info(f"  Location: lat={latitude}, lng={longitude}")
-    logger.info(f"  Weather: temp={temperature}°C, humidity={humidity}%, wind={wind_speed}km/h, precip={precipitation}mm")
-    logger.info(f"  Environmental: vegetation={vegetation_density}, elevation={elevation}, drought={drought_index}")
-    
-    # Prepare features for the model
     features = [temperature, humidity, wind_speed, precipitation]
     
     # Add optional features if available
@@ -258,57 +820,121 @@ def predict_risk(
         # Could be computed from historical weather data
         features.append(0.3)  # Default moderate drought index
     
-    # Load the CNN model
-    cnn_model = load_model()
+    return features
+
+def predict_risk(
+    latitude: float,
+    longitude: float,
+    temperature: float,
+    humidity: float,
+    wind_speed: float,
+    precipitation: float,
+    vegetation_density: Optional[float] = None,
+    elevation: Optional[float] = None,
+    drought_index: Optional[float] = None,
+    model_mode: Optional[str] = None
+):
+    """
+    Predict wildfire risk based on weather and environmental data
+
+    In "adjusted" and "deferred" model modes the CNN is skipped entirely and
+    model_details carries no original score.
+    """
+    # Prepare features for the model
+    features = build_features(temperature, humidity, wind_speed, precipitation,
+                              vegetation_density, elevation, drought_index)
     
     # Initialize variables to store both original and adjusted predictions
     original_risk_score = None
     original_risk_level_idx = None
     model_source = "unknown"
+    model_version = None
     
-    # Make prediction
+    mode = resolve_model_mode(model_mode)
+    if mode != "full":
+        # The final answer only uses the adjusted score, so don't run the CNN
+        model_source = "skipped" if mode == "adjusted" else "deferred"
+    else:
+        # Only the full mode needs the resident CNN model (loaded once per process)
+        started = time.perf_counter()
+        with model_registry.acquire() as active:
+            STAGE_SECONDS["model_lookup"].observe(time.perf_counter() - started)
+            original_risk_score, original_risk_level_idx, model_source = _predict_single(
+                active.model, features, (latitude, longitude))
+            if model_source == "cnn_model":
+                model_version = active.version
+    
+    result = build_prediction(
+        temperature=temperature,
+        humidity=humidity,
+        wind_speed=wind_speed,
+        precipitation=precipitation,
+        vegetation_density=vegetation_density,
+        original_risk_score=original_risk_score,
+        original_risk_level_idx=original_risk_level_idx,
+        model_source=model_source,
+        model_version=model_version
+    )
+    prediction_log.record(result, latitude=latitude, longitude=longitude, temperature=temperature,
+                          humidity=humidity, wind_speed=wind_speed, precipitation=precipitation,
+                          vegetation_density=vegetation_density, elevation=elevation, drought_index=drought_index)
+    return result
+
+def _predict_single(cnn_model, features, coordinates):
+    """
+    Score one feature vector with the CNN, falling back to mock_prediction
+
+    Returns:
+        Tuple of (original risk score, original level index, model_source)
+    """
     if cnn_model is not None:
         # If we have the real CNN model, use it
         try:
             # Preprocess features for CNN model
-            coordinates = (latitude, longitude)
+            started = time.perf_counter()
             preprocessed_input = preprocess_features(features, coordinates)
+            preprocessed = time.perf_counter()
+            STAGE_SECONDS["preprocess"].observe(preprocessed - started)
             
             # Get prediction from CNN model
-            logger.info("Making prediction with CNN model...")
             prediction = cnn_model.predict(preprocessed_input, verbose=0)
             wildfire_probability = float(prediction[0][0])
-            logger.info(f"Raw model output: {wildfire_probability}")
+            STAGE_SECONDS["inference"].observe(time.perf_counter() - preprocessed)
             
             # Store the original model prediction
             original_risk_score = wildfire_probability
             original_risk_level_idx = min(4, max(0, int(original_risk_score * 5)))
-            model_source = "cnn_model"
-            
-            # If the new model is used, log this information
-            if os.path.exists(NEW_MODEL_PATH):
-                logger.info("Using newly created model for prediction")
-            elif os.path.exists(CONVERTED_MODEL_PATH):
-                logger.info("Using converted model for prediction")
-            elif os.path.exists(CNN_MODEL_PATH):
-                logger.info("Using original model for prediction")
+            return original_risk_score, original_risk_level_idx, "cnn_model"
             
         except Exception as e:
-            logger.error(f"Error during prediction with CNN model: {str(e)}")
+            logger.error(f"Error during prediction with CNN model, using mock prediction: {str(e)}")
             # Fallback to mock prediction
-            logger.warning("Using mock prediction due to CNN model error")
             mock_result = mock_prediction(features)
-            original_risk_score = mock_result["risk_score"]
-            original_risk_level_idx = mock_result["risk_level_idx"]
-            model_source = "mock_due_to_error"
-    else:
-        # Use mock prediction for development if model is not available
-        logger.warning("No model available, using mock prediction")
-        mock_result = mock_prediction(features)
-        original_risk_score = mock_result["risk_score"]
-        original_risk_level_idx = mock_result["risk_level_idx"]
-        model_source = "mock_no_model"
+            return mock_result["risk_score"], mock_result["risk_level_idx"], "mock_due_to_error"
     
+    # Use mock prediction for development if model is not available
+    # (logged with the prediction record)
+    mock_result = mock_prediction(features)
+    return mock_result["risk_score"], mock_result["risk_level_idx"], "mock_no_model"
+
+def build_prediction(
+    temperature: float,
+    humidity: float,
+    wind_speed: float,
+    precipitation: float,
+    vegetation_density: Optional[float],
+    original_risk_score: Optional[float],
+    original_risk_level_idx: Optional[int],
+    model_source: str,
+    model_version: Optional[str] = None
+):
+    """
+    Compute the adjusted risk score from the input features and assemble the
+    prediction response around the original model (or mock) score, if any
+    """
+    started = time.perf_counter()
+    count_predictions(model_source)
+
     # ---- Calculate adjusted score based directly on input features ----
     # Normalize input features to 0-1 range
     temp_factor = min(1.0, max(0.0, (temperature - 15) / 30))  # 15-45°C range
@@ -317,22 +943,8 @@ def predict_risk(
     precip_factor = 1.0 - min(1.0, max(0.0, precipitation / 10))  # Invert so lower precip = higher risk
     veg_factor = vegetation_density if vegetation_density is not None else 0.5
     
-    # Log the normalized factors
-    logger.info(f"Normalized factors for adjusted score:")
-    logger.info(f"  Temperature: {temp_factor:.4f} (from {temperature}°C)")
-    logger.info(f"  Humidity: {humidity_factor:.4f} (from {humidity}%)")
-    logger.info(f"  Wind: {wind_factor:.4f} (from {wind_speed} km/h)")
-    logger.info(f"  Precipitation: {precip_factor:.4f} (from {precipitation} mm)")
-    logger.info(f"  Vegetation: {veg_factor:.4f}")
-    
     # Define factor weights
-    weights = {
-        "temperature": 0.3,
-        "humidity": 0.25,
-        "wind": 0.2,
-        "precipitation": 0.15,
-        "vegetation": 0.1
-    }
+    weights = FACTOR_WEIGHTS
     
     # Calculate weighted contributions
     contributions = {
@@ -349,14 +961,11 @@ def predict_risk(
     # Ensure score is within 0-1 range
     adjusted_risk_score = min(1.0, max(0.0, adjusted_risk_score))
     
-    # Log comparison between original and adjusted scores
-    logger.info(f"Risk score comparison:")
-    logger.info(f"  Original model score: {original_risk_score:.4f} (source: {model_source})")
-    logger.info(f"  Adjusted score: {adjusted_risk_score:.4f}")
-    
     # Use the adjusted score for the final prediction
     risk_score = adjusted_risk_score
     risk_level_idx = min(4, max(0, int(risk_score * 5)))  # Scale to 0-4 index
+    scored = time.perf_counter()
+    STAGE_SECONDS["adjusted_scoring"].observe(scored - started)
     
     # Adjust confidence based on model source
     if model_source.startswith("mock"):
@@ -372,31 +981,31 @@ def predict_risk(
         "temperature": {
             "value": temperature,
             "impact": "High" if temp_factor > 0.7 else "Medium" if temp_factor > 0.3 else "Low",
-            "description": "Higher temperatures increase wildfire risk",
+            "description": FACTOR_DESCRIPTIONS["temperature"],
             "contribution": float(f"{contributions['temperature']:.4f}")
         },
         "humidity": {
             "value": humidity,
             "impact": "High" if humidity_factor > 0.7 else "Medium" if humidity_factor > 0.3 else "Low",
-            "description": "Lower humidity increases wildfire risk",
+            "description": FACTOR_DESCRIPTIONS["humidity"],
             "contribution": float(f"{contributions['humidity']:.4f}")
         },
         "wind_speed": {
             "value": wind_speed,
             "impact": "High" if wind_factor > 0.7 else "Medium" if wind_factor > 0.3 else "Low",
-            "description": "Higher wind speeds can spread wildfires faster",
+            "description": FACTOR_DESCRIPTIONS["wind_speed"],
             "contribution": float(f"{contributions['wind']:.4f}")
         },
         "precipitation": {
             "value": precipitation,
             "impact": "High" if precip_factor > 0.7 else "Medium" if precip_factor > 0.3 else "Low",
-            "description": "Lower precipitation leads to drier conditions and higher risk",
+            "description": FACTOR_DESCRIPTIONS["precipitation"],
             "contribution": float(f"{contributions['precipitation']:.4f}")
         },
         "vegetation_density": {
             "value": vegetation_density if vegetation_density is not None else 0.5,
             "impact": "High" if veg_factor > 0.7 else "Medium" if veg_factor > 0.3 else "Low",
-            "description": "Higher vegetation density provides more fuel for wildfires",
+            "description": FACTOR_DESCRIPTIONS["vegetation_density"],
             "contribution": float(f"{contributions['vegetation']:.4f}")
         }
     }
@@ -404,20 +1013,272 @@ def predict_risk(
     # Get appropriate recommendations based on risk level
     recommendations = RECOMMENDATIONS[risk_level]
     
-    # Log the final prediction
-    logger.info(f"Final prediction: Risk level: {risk_level}, Risk score: {risk_score:.4f}")
-    
     # Return full prediction result with detailed information
-    return {
+    result = {
         "risk_level": risk_level,
         "risk_score": float(f"{risk_score:.6f}"),  # Format to 6 decimal places
         "confidence": float(f"{confidence:.2f}"),
         "factors": factor_descriptions,
         "recommendations": recommendations,
-        "model_details": {
+        "model_details": _model_details(model_source, risk_score, original_risk_score, original_risk_level_idx,
+                                        model_version)
+    }
+    STAGE_SECONDS["response_assembly"].observe(time.perf_counter() - scored)
+    return result
+
+def count_predictions(model_source, count=1):
+    """
+    Add predictions to the per-source counter exported on /metrics
+    """
+    counter = PREDICTIONS_TOTAL.get(model_source)
+    if counter is not None:
+        counter.inc(count)
+
+def _model_details(model_source, risk_score, original_risk_score, original_risk_level_idx, model_version=None):
+    """
+    Describe the original model (or mock) score next to the final adjusted score,
+    with the version of the model that produced it
+    """
+    if original_risk_score is None:
+        # The CNN was skipped for this prediction
+        return {
             "source": model_source,
-            "original_score": float(f"{original_risk_score:.6f}"),
-            "original_level": RISK_LEVELS[original_risk_level_idx],
-            "adjustment_applied": model_source.startswith("mock") or abs(risk_score - original_risk_score) > 0.01
+            "model_version": None,
+            "original_score": None,
+            "original_level": None,
+            "adjustment_applied": None
         }
+    return {
+        "source": model_source,
+        "model_version": model_version,
+        "original_score": float(f"{original_risk_score:.6f}"),
+        "original_level": RISK_LEVELS[original_risk_level_idx],
+        "adjustment_applied": model_source.startswith("mock") or abs(risk_score - original_risk_score) > 0.01
+    }
+
+def _impact_levels(factor):
+    """
+    Vectorized High/Medium/Low impact classification of normalized factors
+    """
+    return np.where(factor > 0.7, "High", np.where(factor > 0.3, "Medium", "Low"))
+
+def _column(values, n_rows, default=None):
+    """
+    Convert a column of per-row inputs to a float array. Optional columns may be
+    None as a whole or contain None for individual rows; those entries are
+    replaced by the default.
+    """
+    if values is None:
+        values = [None] * n_rows
+    # NumPy turns None into NaN when converting to a float array
+    column = np.array(values, dtype=np.float64)
+    if column.shape != (n_rows,):
+        raise ValueError(f"Expected {n_rows} values per column, got {column.shape}")
+    missing = np.isnan(column)
+    if missing.any():
+        if default is None:
+            raise ValueError("Required column contains missing values")
+        column[missing] = default
+    return column
+
+def adjusted_scores(temperature, humidity, wind_speed, precipitation, vegetation_density):
+    """
+    Vectorized version of the adjusted scoring in build_prediction.
+
+    All arguments are equally shaped arrays (vegetation_density already has its
+    default filled in). Returns a dict with the normalized factors, their
+    weighted contributions, the clamped risk score and the 0-4 risk level index.
+    """
+    # Normalize input features to 0-1 range
+    factors = {
+        "temperature": np.clip((temperature - 15) / 30, 0.0, 1.0),  # 15-45°C range
+        "humidity": 1.0 - np.clip(humidity / 100, 0.0, 1.0),  # Invert so lower humidity = higher risk
+        "wind": np.clip(wind_speed / 40, 0.0, 1.0),  # 0-40 km/h range
+        "precipitation": 1.0 - np.clip(precipitation / 10, 0.0, 1.0),  # Invert so lower precip = higher risk
+        "vegetation": vegetation_density
+    }
+
+    # Calculate weighted contributions, summed in the same order as build_prediction
+    contributions = {name: factors[name] * weight for name, weight in FACTOR_WEIGHTS.items()}
+    risk_score = np.zeros_like(factors["temperature"])
+    for contribution in contributions.values():
+        risk_score = risk_score + contribution
+    risk_score = np.clip(risk_score, 0.0, 1.0)
+
+    return {
+        "factors": factors,
+        "contributions": contributions,
+        "risk_score": risk_score,
+        "risk_level_idx": np.clip((risk_score * 5).astype(np.int64), 0, 4)
+    }
+
+def _mock_scores(features):
+    """
+    Vectorized risk score and level of mock_prediction for an (N, 7) feature matrix
+    """
+    temp_norm = np.clip((features[:, 0] - 15) / 25, 0.0, 1.0)
+    humidity_norm = np.clip(features[:, 1] / 100, 0.0, 1.0)
+    wind_norm = np.clip(features[:, 2] / 50, 0.0, 1.0)
+    precip_norm = np.clip(features[:, 3] / 25, 0.0, 1.0)
+
+    risk_score = (
+        temp_norm * 0.3 +
+        humidity_norm * -0.25 +
+        wind_norm * 0.25 +
+        precip_norm * -0.2 +
+        0.5  # baseline
+    )
+    risk_score = np.clip(risk_score, 0.0, 1.0)
+    return risk_score, (risk_score * 4).astype(np.int64)
+
+def cnn_scores(features):
+    """
+    Run the CNN over an (N, 7) feature matrix in chunks of CNN_BATCH_SIZE
+
+    Returns:
+        Tuple of (scores, level indices, model_source, model_version)
+    """
+    with model_registry.acquire() as active:
+        cnn_model = active.model
+        if cnn_model is None:
+            logger.warning("No model available, using mock prediction for batch")
+            return (*_mock_scores(features), "mock_no_model", None)
+
+        try:
+            scores = np.empty(len(features), dtype=np.float64)
+            if hasattr(cnn_model, "predict_params"):
+                # Lookup-table backends score the heatmap parameters directly
+                scores = cnn_model.predict_params(heatmap_params(features))
+                return scores, np.clip((scores * 5).astype(np.int64), 0, 4), "cnn_model", active.version
+            for start in range(0, len(features), CNN_BATCH_SIZE):
+                chunk = preprocess_features_batch(features[start:start + CNN_BATCH_SIZE])
+                prediction = cnn_model.predict(chunk, verbose=0)
+                scores[start:start + len(chunk)] = np.asarray(prediction, dtype=np.float64).reshape(len(chunk), -1)[:, 0]
+        except Exception as e:
+            logger.error(f"Error during batch prediction with CNN model, using mock prediction: {str(e)}")
+            return (*_mock_scores(features), "mock_due_to_error", None)
+
+        return scores, np.clip((scores * 5).astype(np.int64), 0, 4), "cnn_model", active.version
+
+def feature_matrix(
+    latitude,
+    longitude,
+    temperature,
+    humidity,
+    wind_speed,
+    precipitation,
+    vegetation_density=None,
+    elevation=None,
+    drought_index=None
+):
+    """
+    Validate columnar inputs and build the (N, 7) feature matrix with the
+    defaults of build_features filled in for missing optional values
+    """
+    n_rows = len(temperature)
+    _column(latitude, n_rows)
+    _column(longitude, n_rows)
+    return np.column_stack([
+        _column(temperature, n_rows),
+        _column(humidity, n_rows),
+        _column(wind_speed, n_rows),
+        _column(precipitation, n_rows),
+        _column(vegetation_density, n_rows, 0.5),
+        _column(elevation, n_rows, 300),
+        _column(drought_index, n_rows, 0.3)
+    ]).reshape(n_rows, len(FEATURE_DEFAULTS))
+
+def predict_risk_batch(
+    latitude,
+    longitude,
+    temperature,
+    humidity,
+    wind_speed,
+    precipitation,
+    vegetation_density=None,
+    elevation=None,
+    drought_index=None,
+    model_mode=None
+):
+    """
+    Predict wildfire risk for many locations at once from columnar inputs.
+
+    Each argument is a sequence with one value per location; the optional
+    columns may be omitted or contain None for individual rows. The scoring is
+    done with NumPy over the whole batch and the CNN sees the batch in chunks,
+    but each returned dict matches what predict_risk returns for that row.
+
+    Returns:
+        List of prediction dicts in input order
+    """
+    mode = resolve_model_mode(model_mode)
+    features = feature_matrix(latitude, longitude, temperature, humidity, wind_speed,
+                              precipitation, vegetation_density, elevation, drought_index)
+    n_rows = len(features)
+    if n_rows == 0:
+        return []
+    temperature, humidity, wind_speed, precipitation, vegetation = features[:, :5].T
+
+    if mode == "full":
+        original_scores, original_level_idx, model_source, model_version = cnn_scores(features)
+    else:
+        original_scores = original_level_idx = model_version = None
+        model_source = "skipped" if mode == "adjusted" else "deferred"
+
+    adjusted = adjusted_scores(temperature, humidity, wind_speed, precipitation, vegetation)
+    risk_scores = adjusted["risk_score"]
+    risk_level_idx = adjusted["risk_level_idx"]
+    factors = adjusted["factors"]
+    contributions = adjusted["contributions"]
+    impacts = {name: _impact_levels(factor) for name, factor in factors.items()}
+    confidence = 0.6 if model_source.startswith("mock") else 0.8
+
+    logger.debug(f"Batch prediction for {n_rows} locations (source: {model_source})")
+    count_predictions(model_source, n_rows)
+
+    values = {
+        "temperature": temperature,
+        "humidity": humidity,
+        "wind_speed": wind_speed,
+        "precipitation": precipitation,
+        "vegetation_density": vegetation
     }
+    factor_keys = {
+        "temperature": "temperature",
+        "humidity": "humidity",
+        "wind_speed": "wind",
+        "precipitation": "precipitation",
+        "vegetation_density": "vegetation"
+    }
+
+    results = []
+    for i in range(n_rows):
+        risk_level = RISK_LEVELS[int(risk_level_idx[i])]
+        results.append({
+            "risk_level": risk_level,
+            "risk_score": float(f"{risk_scores[i]:.6f}"),
+            "confidence": confidence,
+            "factors": {
+                name: {
+                    "value": float(values[name][i]),
+                    "impact": str(impacts[key][i]),
+                    "description": FACTOR_DESCRIPTIONS[name],
+                    "contribution": float(f"{contributions[key][i]:.4f}")
+                }
+                for name, key in factor_keys.items()
+            },
+            "recommendations": RECOMMENDATIONS[risk_level],
+            "model_details": _model_details(
+                model_source,
+                float(risk_scores[i]),
+                None if original_scores is None else float(original_scores[i]),
+                None if original_level_idx is None else int(original_level_idx[i]),
+                model_version
+            )
+        })
+
+    prediction_log.record_batch(results, latitude=latitude, longitude=longitude, temperature=temperature,
+                                humidity=humidity, wind_speed=wind_speed, precipitation=precipitation,
+                                vegetation_density=vegetation_density, elevation=elevation,
+                                drought_index=drought_index)
+    return results
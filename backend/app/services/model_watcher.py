@@ -0,0 +1,106 @@
+import logging
+import os
+import threading
+
+from app.services.model_service import backend_files, files_signature, model_registry
+
+logger = logging.getLogger(__name__)
+
+
+class ModelWatcher:
+    """
+    Polls the files the active backend loads from and hot-swaps the model when
+    they change.
+
+    A change is only acted on once the files look the same on two consecutive
+    polls, so a model that is still being copied into place is not loaded
+    half-written. A signature whose reload failed is not retried until the
+    files change again.
+    """
+
+    def __init__(self, registry=None, interval_seconds=10.0):
+        self.registry = registry or model_registry
+        self.interval_seconds = interval_seconds
+        self.reloads = 0
+        self.failed_reloads = 0
+        self._pending = None
+        self._failed = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build a watcher from MODEL_WATCH_INTERVAL_SECONDS (0 disables watching)
+        """
+        return cls(interval_seconds=float(os.getenv("MODEL_WATCH_INTERVAL_SECONDS") or 10))
+
+    @property
+    def enabled(self):
+        return self.interval_seconds > 0
+
+    def start(self):
+        """
+        Start polling in a daemon thread
+        """
+        if not self.enabled or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+        self._thread.start()
+        logger.info(f"Watching model files every {self.interval_seconds}s")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval_seconds + 1)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Model watcher check failed: {str(e)}")
+
+    def check(self):
+        """
+        Compare the model files with those of the active version, reloading
+        once a change has settled
+
+        Returns:
+            True if a new model was swapped in
+        """
+        active = self.registry.active
+        if active is None:
+            # Nothing to replace until the initial load has finished
+            return False
+        signature = files_signature(backend_files(self.registry.backend))
+        if signature == active.signature or signature == self._failed:
+            self._pending = None
+            return False
+        if signature != self._pending:
+            # Wait one more poll in case the file is still being written
+            self._pending = signature
+            return False
+
+        self._pending = None
+        logger.info("Model files changed, reloading")
+        if self.registry.reload():
+            self.reloads += 1
+            return True
+        self.failed_reloads += 1
+        self._failed = signature
+        return False
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "interval_seconds": self.interval_seconds,
+            "reloads": self.reloads,
+            "failed_reloads": self.failed_reloads
+        }
+
+
+# Shared watcher started with the application
+model_watcher = ModelWatcher.from_env()
@@ -0,0 +1,132 @@
+import json
+import logging
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app.services.cnn_fastpath import (
+    ACTIVATIONS,
+    compile_row_plan,
+    is_row_invariant,
+    run_row_plan
+)
+
+logger = logging.getLogger(__name__)
+
+
+def save_layers(path, specs, input_shape):
+    """
+    Write layer specs from extract_layers to a flat .npz file.
+
+    Weights are stored as layer_<i>_kernel / layer_<i>_bias arrays and the
+    remaining settings as a JSON description, so loading needs only NumPy.
+    """
+    arrays = {}
+    description = []
+    for i, spec in enumerate(specs):
+        entry = {key: value for key, value in spec.items() if key not in ("kernel", "bias")}
+        for name in ("kernel", "bias"):
+            if name in spec:
+                arrays[f"layer_{i}_{name}"] = spec[name]
+        description.append(entry)
+    arrays["layers"] = np.array(json.dumps({"input_shape": list(input_shape), "layers": description}))
+    np.savez(path, **arrays)
+
+
+def load_layers(path):
+    """
+    Read layer specs written by save_layers
+
+    Returns:
+        Tuple of (specs, input_shape)
+    """
+    with np.load(path) as data:
+        description = json.loads(str(data["layers"]))
+        specs = []
+        for i, entry in enumerate(description["layers"]):
+            spec = dict(entry)
+            for key in ("pool_size", "strides"):
+                if key in spec:
+                    spec[key] = tuple(spec[key])
+            for name in ("kernel", "bias"):
+                if f"layer_{i}_{name}" in data:
+                    spec[name] = data[f"layer_{i}_{name}"].astype(np.float32)
+            specs.append(spec)
+    return specs, tuple(description["input_shape"])
+
+
+def conv2d(x, kernel, bias):
+    """
+    Valid, stride-1 2-D convolution of an (N, H, W, C) batch.
+
+    Accumulates one (C, O) matmul per kernel offset over shifted views of the
+    input, which avoids materializing a full im2col matrix.
+    """
+    kh, kw, _, filters = kernel.shape
+    out_h, out_w = x.shape[1] - kh + 1, x.shape[2] - kw + 1
+    out = np.zeros((x.shape[0], out_h, out_w, filters), dtype=np.float32)
+    for i in range(kh):
+        for j in range(kw):
+            out += x[:, i:i + out_h, j:j + out_w, :] @ kernel[i, j]
+    return out + bias
+
+
+def max_pool2d(x, pool_size, strides):
+    """
+    Valid max pooling of an (N, H, W, C) batch
+    """
+    (ph, pw), (sh, sw) = pool_size, strides
+    windows = sliding_window_view(x, (ph, pw), axis=(1, 2))[:, ::sh, ::sw]
+    return windows.max(axis=(-2, -1))
+
+
+class NumpyCNN:
+    """
+    NumPy runtime for the wildfire CNN (Conv2D/MaxPool/Flatten/Dense stacks as
+    built by recreate_model.create_new_model), serving model.predict without
+    TensorFlow.
+
+    Row-invariant batches, which is every heatmap preprocess_features
+    produces, go through the single-row plan from cnn_fastpath; anything else
+    runs the full 2-D forward pass.
+    """
+
+    def __init__(self, specs, input_shape, max_batch_size=16):
+        self.specs = specs
+        self.input_shape = tuple(input_shape)
+        self.max_batch_size = max_batch_size
+        self.row_plan = compile_row_plan(specs, self.input_shape[0])
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load weights exported by export_numpy_model.py
+        """
+        specs, input_shape = load_layers(path)
+        return cls(specs, input_shape)
+
+    def _forward(self, x):
+        for spec in self.specs:
+            if spec["type"] == "conv2d":
+                x = ACTIVATIONS[spec["activation"]](conv2d(x, spec["kernel"], spec["bias"]))
+            elif spec["type"] == "maxpool2d":
+                x = max_pool2d(x, spec["pool_size"], spec["strides"])
+            elif spec["type"] == "flatten":
+                x = x.reshape(len(x), -1)
+            elif spec["type"] == "dense":
+                x = ACTIVATIONS[spec["activation"]](x @ spec["kernel"] + spec["bias"])
+        return x
+
+    def predict(self, inputs, verbose=0):
+        """
+        Keras-compatible predict returning an (N, outputs) array
+        """
+        inputs = np.asarray(inputs, dtype=np.float32)
+        if inputs.shape[1:] != self.input_shape:
+            raise ValueError(f"Expected inputs of shape (N, {self.input_shape}), got {inputs.shape}")
+        if is_row_invariant(inputs):
+            return run_row_plan(self.row_plan, inputs[:, 0])
+        # The full forward pass keeps large feature maps, so bound the batch
+        outputs = [self._forward(inputs[start:start + self.max_batch_size])
+                   for start in range(0, len(inputs), self.max_batch_size)]
+        return np.concatenate(outputs, axis=0)
@@ -0,0 +1,262 @@
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from app.services.metrics import metrics_registry
+from app.services.model_service import model_registry
+
+logger = logging.getLogger(__name__)
+
+# Step each input is rounded to before it becomes part of a cache key
+DEFAULT_PRECISION = {
+    "latitude": 0.01,
+    "longitude": 0.01,
+    "temperature": 0.1,
+    "humidity": 1.0,
+    "wind_speed": 0.1,
+    "precipitation": 0.1,
+    "vegetation_density": 0.01,
+    "elevation": 10.0,
+    "drought_index": 0.01
+}
+
+# Stand-in for missing optional inputs inside keys (NaN never compares equal)
+_MISSING = math.inf
+
+# Inputs a prediction echoes as the `value` of its factor, with the value
+# reported when the input is missing
+FACTOR_INPUTS = {
+    "temperature": None,
+    "humidity": None,
+    "wind_speed": None,
+    "precipitation": None,
+    "vegetation_density": 0.5
+}
+
+
+def echo_inputs(result, inputs):
+    """
+    Copy of a shared result whose factor values are the given request's
+    inputs instead of those of the request that produced it
+    """
+    factors = result.get("factors")
+    if not factors:
+        return result
+    factors = dict(factors)
+    for name, default in FACTOR_INPUTS.items():
+        if name in factors:
+            value = inputs.get(name)
+            factors[name] = dict(factors[name], value=default if value is None else value)
+    return dict(result, factors=factors)
+
+
+def _row(columns, i):
+    return {name: None if values is None else values[i] for name, values in columns.items()}
+
+
+def select_rows(columns, rows):
+    """
+    Columnar inputs restricted to the given row numbers
+    """
+    if len(rows) == len(columns["temperature"]):
+        return columns
+    return {name: None if values is None else [values[i] for i in rows] for name, values in columns.items()}
+
+
+def _parse_precision(spec):
+    """
+    Parse overrides like "temperature=0.5,humidity=2" on top of DEFAULT_PRECISION
+    """
+    precision = dict(DEFAULT_PRECISION)
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        name, _, step = item.partition("=")
+        if name.strip() not in precision:
+            raise ValueError(f"Unknown cache precision field: {name}")
+        precision[name.strip()] = float(step)
+    return precision
+
+
+class PredictionCache:
+    """
+    In-process LRU cache of prediction results with a time-to-live.
+
+    Keys are built from the request inputs rounded to a configurable precision,
+    so nearby inputs (e.g. 25.04°C and 25.01°C at 0.1°C precision) share one
+    entry. A hit keeps the scores of the request that filled the entry, but
+    its factor values are the current request's inputs (see echo_inputs).
+    Memory is bounded by `max_entries`; a size of 0 disables the cache.
+    """
+
+    def __init__(self, max_entries=10000, ttl_seconds=300.0, precision=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.precision = precision or dict(DEFAULT_PRECISION)
+        self._fields = list(self.precision)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build a cache from the PREDICTION_CACHE_* environment variables
+        """
+        return cls(
+            max_entries=int(os.getenv("PREDICTION_CACHE_MAX_ENTRIES") or 10000),
+            ttl_seconds=float(os.getenv("PREDICTION_CACHE_TTL_SECONDS") or 300),
+            precision=_parse_precision(os.getenv("PREDICTION_CACHE_PRECISION"))
+        )
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def key(self, inputs, model_mode):
+        """
+        Cache key for a single request's inputs
+        """
+        return (model_mode,) + tuple(
+            _MISSING if inputs.get(name) is None else round(inputs[name] / self.precision[name])
+            for name in self._fields
+        )
+
+    def keys(self, columns, model_mode):
+        """
+        Cache keys for columnar batch inputs, quantized in one NumPy pass
+        """
+        n_rows = len(columns["temperature"])
+        quantized = []
+        for name in self._fields:
+            values = columns.get(name)
+            if values is None:
+                quantized.append([_MISSING] * n_rows)
+                continue
+            # None becomes NaN here and is mapped to the same marker as in key()
+            steps = np.round(np.array(values, dtype=np.float64) / self.precision[name])
+            quantized.append(np.where(np.isnan(steps), _MISSING, steps).tolist())
+        return [(model_mode,) + row for row in zip(*quantized)]
+
+    def get(self, key):
+        """
+        Return the cached result for key, or None on a miss or expired entry
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        Store a result, evicting the least recently used entries beyond max_entries
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self, model_mode=None):
+        """
+        Drop every entry, or only those cached for one scoring mode
+        """
+        with self._lock:
+            if model_mode is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] == model_mode]:
+                del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup_batch(self, columns, model_mode):
+        """
+        Cached results of a columnar batch. The misses are then scored with
+        predict_risk_batch and handed to store_batch.
+
+        Args:
+            columns: Columnar inputs as accepted by predict_risk_batch
+            model_mode: Resolved scoring mode, part of every key
+
+        Returns:
+            (keys, results, missing): the cache keys (None when the cache is
+            disabled), the results in input order with None for every miss,
+            and the row numbers of the misses
+        """
+        n_rows = len(columns["temperature"])
+        if not self.enabled:
+            return None, [None] * n_rows, list(range(n_rows))
+
+        keys = self.keys(columns, model_mode)
+        results = [self.get(key) for key in keys]
+        missing = []
+        for i, result in enumerate(results):
+            if result is None:
+                missing.append(i)
+            else:
+                results[i] = echo_inputs(result, _row(columns, i))
+        logger.debug(f"Batch cache lookup: {n_rows - len(missing)} hits, {len(missing)} misses")
+        return keys, results, missing
+
+    def store_batch(self, keys, results, missing, scored):
+        """
+        Fill the misses of a lookup_batch with their scored results and cache them
+        """
+        for i, result in zip(missing, scored):
+            results[i] = result
+            if keys is not None:
+                self.put(keys[i], result)
+        return results
+
+    def stats(self):
+        """
+        Hit/miss/eviction counters and current size
+        """
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+
+# Shared cache in front of the prediction routes
+prediction_cache = PredictionCache.from_env()
+metrics_registry.gauge("prediction_cache_entries", "Predictions held in the result cache",
+                       callback=lambda: len(prediction_cache))
+metrics_registry.counter("prediction_cache_hits_total", "Result cache lookups that returned a prediction",
+                         callback=lambda: prediction_cache.hits)
+metrics_registry.counter("prediction_cache_misses_total", "Result cache lookups that missed or had expired",
+                         callback=lambda: prediction_cache.misses)
+metrics_registry.counter("prediction_cache_evictions_total", "Predictions evicted to stay within the entry limit",
+                         callback=lambda: prediction_cache.evictions)
+
+# Full-mode entries hold the swapped-out model's scores; the other modes never use the CNN
+model_registry.add_swap_listener(lambda version: prediction_cache.clear("full"))
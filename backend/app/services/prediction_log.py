@@ -0,0 +1,159 @@
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+
+from app.services.metrics import metrics_registry
+
+# Share of regular predictions that get a log record; mock fallbacks are always logged
+PREDICTION_LOG_SAMPLE_RATE = float(os.getenv("PREDICTION_LOG_SAMPLE_RATE") or 0.01)
+# Records waiting for the writer thread before new ones are dropped
+PREDICTION_LOG_QUEUE_SIZE = int(os.getenv("PREDICTION_LOG_QUEUE_SIZE") or 10000)
+
+
+class PredictionRecord:
+    """
+    Log message for one prediction. The JSON is only built when the writer
+    thread formats the record, never on the request thread.
+    """
+
+    __slots__ = ("inputs", "result")
+
+    def __init__(self, inputs, result):
+        self.inputs = inputs
+        self.result = result
+
+    def fields(self):
+        details = self.result.get("model_details") or {}
+        return {
+            "event": "prediction",
+            **self.inputs,
+            "risk_level": self.result["risk_level"],
+            "risk_score": self.result["risk_score"],
+            "model_source": details.get("source"),
+            "model_version": details.get("model_version"),
+            "original_score": details.get("original_score")
+        }
+
+    def __str__(self):
+        return json.dumps(self.fields(), default=str)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that passes records on unformatted and drops them when the
+    queue is full instead of blocking the caller
+    """
+
+    def __init__(self, record_queue):
+        super().__init__(record_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # The stock prepare() formats the message on the calling thread
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class PredictionLog:
+    """
+    Writes one structured (JSON) record per prediction from a background
+    listener thread.
+
+    Regular predictions are sampled at `sample_rate` and logged at INFO; mock
+    fallbacks (no model loaded or a model error) are always logged at WARNING.
+    Records go through a bounded queue, so a slow log sink drops records
+    rather than slowing requests down.
+    """
+
+    def __init__(self, sample_rate=0.01, queue_size=10000, name="app.predictions", handler=None):
+        self.sample_rate = sample_rate
+        self.logger = logging.getLogger(name)
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        self.queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+        self.logger.addHandler(self.queue_handler)
+        if handler is None:
+            handler = logging.StreamHandler(sys.stderr)
+            handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+        self.handler = handler
+        self._listener = None
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build a prediction log from the PREDICTION_LOG_* environment variables
+        """
+        return cls(sample_rate=PREDICTION_LOG_SAMPLE_RATE, queue_size=PREDICTION_LOG_QUEUE_SIZE)
+
+    @property
+    def dropped(self):
+        return self.queue_handler.dropped
+
+    def start(self):
+        """
+        Start the thread that formats and writes queued records
+        """
+        if self._listener is None:
+            self._listener = logging.handlers.QueueListener(
+                self.queue_handler.queue, self.handler, respect_handler_level=True)
+            self._listener.start()
+
+    def stop(self):
+        """
+        Write out the records still queued and stop the writer thread
+        """
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+    def _level(self, result):
+        # Level to log a result at, or None when sampling skips it
+        source = (result.get("model_details") or {}).get("source") or ""
+        if source.startswith("mock"):
+            level = logging.WARNING
+        elif self.sample_rate >= 1.0 or random.random() < self.sample_rate:
+            level = logging.INFO
+        else:
+            return None
+        return level if self.logger.isEnabledFor(level) else None
+
+    def record(self, result, **inputs):
+        """
+        Log a prediction result with the inputs that produced it, subject to sampling
+        """
+        level = self._level(result)
+        if level is not None:
+            self.logger.log(level, "%s", PredictionRecord(inputs, result))
+
+    def record_batch(self, results, **columns):
+        """
+        Log the results of a batch prediction, sampling each row like record()
+
+        Args:
+            columns: Columnar inputs of the batch; a column may be None
+        """
+        for row, result in enumerate(results):
+            level = self._level(result)
+            if level is not None:
+                inputs = {name: None if values is None else _scalar(values[row]) for name, values in columns.items()}
+                self.logger.log(level, "%s", PredictionRecord(inputs, result))
+
+
+def _scalar(value):
+    # NumPy scalars from array columns become plain Python numbers
+    return value.item() if hasattr(value, "item") else value
+
+
+# Shared prediction log, started with the app
+prediction_log = PredictionLog.from_env()
+metrics_registry.counter("prediction_log_dropped_total", "Prediction log records dropped because the queue was full",
+                         callback=lambda: prediction_log.dropped)
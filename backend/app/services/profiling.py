@@ -0,0 +1,217 @@
+import cProfile
+import contextvars
+import io
+import logging
+import marshal
+import pstats
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Request header that asks for a profile (together with a valid admin token)
+PROFILE_HEADER = b"x-profile"
+ADMIN_TOKEN_HEADER = b"x-admin-token"
+
+# Profile of the request being handled in this context, if any
+_active_session = contextvars.ContextVar("active_profile_session", default=None)
+
+
+class ProfileSession:
+    """
+    cProfile data for one request. Before Python 3.12 cProfile only sees the
+    thread it was enabled on, so work sent to the inference executor is
+    profiled in the worker thread and merged in when the report is built.
+    From 3.12 cProfile is built on sys.monitoring, which allows one active
+    profiler per process: it already sees the worker thread, and the nested
+    profiler is skipped.
+    """
+
+    def __init__(self, method, path):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.status = None
+        self.started_at = time.time()
+        self.duration_seconds = None
+        self._profiles = []
+        self._lock = threading.Lock()
+
+    def run(self, fn):
+        """
+        Call fn() under a profiler on the current thread
+        """
+        profile = self.start()
+        if profile is None:
+            return fn()
+        try:
+            return fn()
+        finally:
+            profile.disable()
+
+    def start(self):
+        """
+        Enable a profiler on the current thread and return it for disabling,
+        or None when another profiler is already active
+        """
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            # "Another profiling tool is already active" (Python 3.12+)
+            logger.debug(f"Not starting a nested profiler: {str(e)}")
+            return None
+        with self._lock:
+            self._profiles.append(profile)
+        return profile
+
+    def stats(self):
+        with self._lock:
+            profiles = list(self._profiles)
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        return stats
+
+    def summary(self, limit=40, sort="cumulative"):
+        """
+        Text report of the most expensive functions
+        """
+        out = io.StringIO()
+        stats = self.stats()
+        stats.stream = out
+        stats.sort_stats(sort).print_stats(limit)
+        return (f"{self.method} {self.path} -> {self.status} in {self.duration_seconds * 1000:.2f} ms\n"
+                + out.getvalue())
+
+    def pstats_bytes(self):
+        """
+        Profile in the binary format written by pstats.Stats.dump_stats, for
+        snakeviz, flameprof or pstats.Stats(path)
+        """
+        return marshal.dumps(self.stats().stats)
+
+    def info(self):
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_seconds * 1000, 3) if self.duration_seconds is not None else None
+        }
+
+
+def profiled(fn):
+    """
+    Wrap a zero-argument callable headed for a worker thread so it is profiled
+    as part of the current request's session. Returns fn unchanged when the
+    request is not being profiled.
+    """
+    session = _active_session.get()
+    if session is None:
+        return fn
+    return lambda: session.run(fn)
+
+
+class ProfileStore:
+    """
+    Keeps the most recent request profiles for download
+    """
+
+    def __init__(self, max_profiles=20):
+        self.max_profiles = max_profiles
+        self._profiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, session):
+        with self._lock:
+            self._profiles[session.id] = session
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id):
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self):
+        with self._lock:
+            return [session.info() for session in reversed(self._profiles.values())]
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles a request when it carries `X-Profile: 1`
+    and a valid admin token.
+
+    The response gets an `X-Profile-Id` header; the report is downloaded from
+    the admin profile routes. Only one request is profiled at a time and,
+    since the event loop is shared, coroutine time of requests running
+    concurrently with it can show up in its profile. Requests without the
+    header only pay for a scan of their header list.
+    """
+
+    def __init__(self, app, authorize, store=None):
+        self.app = app
+        self.authorize = authorize
+        self.store = store if store is not None else profile_store
+        self._busy = threading.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        requested = token = None
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                requested = value
+            elif name == ADMIN_TOKEN_HEADER:
+                token = value
+        if requested is None or requested.lower() in (b"0", b"false", b"") or not self.authorize(
+                token.decode("latin-1") if token is not None else None):
+            return await self.app(scope, receive, send)
+        if not self._busy.acquire(blocking=False):
+            return await self.app(scope, receive, self._with_headers(send, [(b"x-profile-status", b"busy")]))
+        try:
+            await self._profile(scope, receive, send)
+        finally:
+            self._busy.release()
+
+    async def _profile(self, scope, receive, send):
+        session = ProfileSession(scope.get("method", ""), scope.get("path", ""))
+        started = time.perf_counter()
+        profile = session.start()
+        if profile is None:
+            # Another profiler (e.g. a coverage tool) owns the interpreter
+            return await self.app(scope, receive, self._with_headers(send, [(b"x-profile-status", b"unavailable")]))
+        token = _active_session.set(session)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                session.status = message["status"]
+                message = {**message, "headers": list(message.get("headers", [])) + [
+                    (b"x-profile-id", session.id.encode("ascii"))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profile.disable()
+            session.duration_seconds = time.perf_counter() - started
+            _active_session.reset(token)
+            self.store.add(session)
+            logger.info(f"Profiled {session.method} {session.path} as {session.id} "
+                        f"({session.duration_seconds * 1000:.2f} ms)")
+
+    @staticmethod
+    def _with_headers(send, headers):
+        async def wrapped(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": list(message.get("headers", [])) + headers}
+            await send(message)
+        return wrapped
+
+
+# Recent request profiles served by the admin routes
+profile_store = ProfileStore()
@@ -0,0 +1,170 @@
+import base64
+import logging
+import math
+import os
+
+import numpy as np
+
+from app.services.model_service import FEATURE_DEFAULTS, RISK_LEVELS, adjusted_scores
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds on a single raster request
+MAX_GRID_CELLS = int(os.getenv("MAX_GRID_CELLS") or 250000)
+MAX_GRID_MEMORY_MB = float(os.getenv("MAX_GRID_MEMORY_MB") or 64)
+
+# Weather inputs of the adjusted score, in adjusted_scores argument order
+WEATHER_FIELDS = ("temperature", "humidity", "wind_speed", "precipitation", "vegetation_density")
+# Float64 arrays of the grid shape alive at once while scoring: the five
+# inputs, normalized factors and contributions plus intermediates and outputs
+_ARRAYS_PER_CELL = 20
+
+
+class GridTooLargeError(ValueError):
+    """
+    Raised when a raster exceeds MAX_GRID_CELLS or MAX_GRID_MEMORY_MB
+    """
+
+
+def grid_shape(bbox, resolution):
+    """
+    Number of (rows, cols) of `resolution`-degree cells covering a
+    [west, south, east, north] bounding box
+    """
+    west, south, east, north = bbox
+    # The epsilon keeps an exact multiple of the resolution from gaining a cell
+    rows = max(1, math.ceil((north - south) / resolution - 1e-9))
+    cols = max(1, math.ceil((east - west) / resolution - 1e-9))
+    return rows, cols
+
+
+def grid_axes(bbox, resolution):
+    """
+    Cell-center latitudes (north to south, matching row order) and longitudes
+    (west to east)
+    """
+    west, south, east, north = bbox
+    rows, cols = grid_shape(bbox, resolution)
+    latitudes = north - (np.arange(rows) + 0.5) * resolution
+    longitudes = west + (np.arange(cols) + 0.5) * resolution
+    return latitudes, longitudes
+
+
+def estimated_bytes(n_cells):
+    """
+    Rough peak working memory of scoring n_cells
+    """
+    return n_cells * _ARRAYS_PER_CELL * 8
+
+
+def check_grid_size(shape, max_cells=None, max_memory_mb=None):
+    """
+    Raises:
+        GridTooLargeError: if the raster is above the cell or memory limit
+    """
+    max_cells = MAX_GRID_CELLS if max_cells is None else max_cells
+    max_memory_mb = MAX_GRID_MEMORY_MB if max_memory_mb is None else max_memory_mb
+    n_cells = shape[0] * shape[1]
+    if n_cells > max_cells:
+        raise GridTooLargeError(f"Grid of {shape[0]}x{shape[1]} = {n_cells} cells exceeds the limit of {max_cells}")
+    memory_mb = estimated_bytes(n_cells) / 2 ** 20
+    if memory_mb > max_memory_mb:
+        raise GridTooLargeError(f"Grid of {n_cells} cells needs about {memory_mb:.0f} MB, "
+                                f"above the limit of {max_memory_mb:g} MB")
+
+
+def grid_field(name, value, shape, default=None):
+    """
+    A weather input as a float64 array of the grid shape. A scalar applies
+    to every cell; missing cells take `default`, or are an error without one
+    """
+    if value is None:
+        if default is None:
+            raise ValueError(f"Missing weather field '{name}'")
+        value = default
+    array = np.asarray(value, dtype=np.float64)
+    if array.ndim == 0:
+        return np.full(shape, float(array))
+    if array.shape != shape:
+        raise ValueError(f"Field '{name}' has shape {list(array.shape)}, expected {list(shape)} or a single value")
+    if np.isnan(array).any():
+        if default is None:
+            raise ValueError(f"Field '{name}' contains missing values")
+        array = np.where(np.isnan(array), default, array)
+    return array
+
+
+def score_grid(shape, temperature, humidity, wind_speed, precipitation, vegetation_density=None):
+    """
+    Adjusted risk for every cell of a raster, with the formulas of predict_risk.
+
+    Each weather field is either a single value for the whole grid or an
+    array of the grid shape.
+
+    Returns:
+        The adjusted_scores dict, with every array in the grid shape
+    """
+    shape = tuple(shape)
+    check_grid_size(shape)
+    return adjusted_scores(
+        grid_field("temperature", temperature, shape),
+        grid_field("humidity", humidity, shape),
+        grid_field("wind_speed", wind_speed, shape),
+        grid_field("precipitation", precipitation, shape),
+        grid_field("vegetation_density", vegetation_density, shape, FEATURE_DEFAULTS[4])
+    )
+
+
+def encode_array(array, encoding, dtype, decimals=None):
+    """
+    Encode a 2-D result as nested JSON lists or as base64 of its row-major
+    little-endian bytes
+    """
+    if encoding == "base64":
+        packed = np.asarray(array, dtype=np.dtype(dtype).newbyteorder("<"))
+        return base64.b64encode(packed.tobytes()).decode("ascii")
+    if decimals is not None:
+        # Round in float64 so the JSON does not carry float32 noise
+        return np.round(np.asarray(array, dtype=np.float64), decimals).tolist()
+    return np.asarray(array, dtype=dtype).tolist()
+
+
+def predict_grid(bbox, resolution, weather, include_contributions=False, encoding="json"):
+    """
+    Score a bounding box as a raster and return it in compact form.
+
+    Args:
+        bbox: [west, south, east, north] in degrees
+        resolution: Cell size in degrees
+        weather: Dict of WEATHER_FIELDS values, each a number or a rows x cols array
+        include_contributions: Also return each factor's weighted contribution
+        encoding: "json" for nested lists, "base64" for packed float32/uint8 arrays
+
+    Raises:
+        GridTooLargeError: if the raster is above the configured limits
+        ValueError: if a weather array does not match the grid
+    """
+    shape = grid_shape(bbox, resolution)
+    check_grid_size(shape)
+    latitudes, longitudes = grid_axes(bbox, resolution)
+    scored = score_grid(shape, **{name: weather.get(name) for name in WEATHER_FIELDS})
+
+    result = {
+        "bbox": list(bbox),
+        "resolution": resolution,
+        "shape": list(shape),
+        "latitudes": np.round(latitudes, 6).tolist(),
+        "longitudes": np.round(longitudes, 6).tolist(),
+        "encoding": encoding,
+        "risk_levels": [RISK_LEVELS[i] for i in sorted(RISK_LEVELS)],
+        "risk_score": encode_array(scored["risk_score"], encoding, np.float32, 6),
+        "risk_level_idx": encode_array(scored["risk_level_idx"], encoding, np.uint8)
+    }
+    if encoding == "base64":
+        result["dtypes"] = {"risk_score": "float32", "risk_level_idx": "uint8", "contributions": "float32"}
+    if include_contributions:
+        result["contributions"] = {
+            name: encode_array(contribution, encoding, np.float32, 4)
+            for name, contribution in scored["contributions"].items()
+        }
+    return result
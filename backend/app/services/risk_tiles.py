@@ -0,0 +1,457 @@
+import hashlib
+import io
+import json
+import logging
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from app.services.metrics import metrics_registry
+from app.services.model_service import FEATURE_DEFAULTS
+from app.services.risk_grid import WEATHER_FIELDS, grid_field, grid_shape, score_grid
+
+logger = logging.getLogger(__name__)
+
+TILE_SIZE = 256
+MAX_TILE_ZOOM = 18
+TILE_FORMATS = {"png": "image/png", "f16": "application/octet-stream"}
+# Disk cache files are the SHA-1 of the tile key with this suffix
+TILE_FILE_SUFFIX = ".tile"
+_TILE_FILE_NAME = re.compile(r"[0-9a-f]{40}" + re.escape(TILE_FILE_SUFFIX))
+
+# Risk score stops of the PNG color ramp and their RGBA colors
+_COLOR_STOPS = np.array([0.0, 0.2, 0.4, 0.6, 0.8, 1.0])
+_COLORS = np.array([
+    [26, 152, 80, 160],
+    [145, 207, 96, 170],
+    [254, 224, 139, 185],
+    [252, 141, 89, 200],
+    [215, 48, 39, 215],
+    [127, 0, 0, 230]
+], dtype=np.float64)
+# Score -> RGBA lookup table, indexed by the score scaled to 0..255
+_COLOR_TABLE = np.stack(
+    [np.interp(np.linspace(0, 1, 256), _COLOR_STOPS, _COLORS[:, channel]) for channel in range(4)], axis=1
+).round().astype(np.uint8)
+
+
+def tile_axes(z, x, y):
+    """
+    Latitudes of the pixel rows (north to south) and longitudes of the pixel
+    columns (west to east) of a Web Mercator tile, at pixel centers
+    """
+    n = 2 ** z
+    offsets = (np.arange(TILE_SIZE) + 0.5) / TILE_SIZE
+    longitudes = (x + offsets) / n * 360.0 - 180.0
+    latitudes = np.degrees(np.arctan(np.sinh(math.pi * (1.0 - 2.0 * (y + offsets) / n))))
+    return latitudes, longitudes
+
+
+def check_tile(z, x, y):
+    """
+    Raises:
+        ValueError: if z/x/y is not a tile of the Web Mercator pyramid
+    """
+    if not 0 <= z <= MAX_TILE_ZOOM:
+        raise ValueError(f"Zoom {z} is outside 0..{MAX_TILE_ZOOM}")
+    if not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise ValueError(f"Tile {z}/{x}/{y} does not exist at zoom {z}")
+
+
+class WeatherGrid:
+    """
+    Immutable snapshot of gridded weather.
+
+    Each field is a single value, or an array over `bbox` at `resolution`
+    degrees laid out like a /predict/grid request. The fingerprint hashes the
+    content and is part of every tile cache key, so tiles of older weather
+    are never served again.
+    """
+
+    def __init__(self, fields, bbox=None, resolution=None, updated_at=None):
+        """
+        Raises:
+            ValueError: if an array field is given without a bbox, or does not
+                match the bbox grid
+        """
+        shape = grid_shape(bbox, resolution) if bbox is not None else None
+        self.fields = {}
+        for name in WEATHER_FIELDS:
+            value = fields.get(name)
+            if value is None or np.ndim(value) == 0:
+                self.fields[name] = None if value is None else float(value)
+                continue
+            if shape is None:
+                raise ValueError(f"Field '{name}' is an array but no bbox and resolution were given")
+            default = FEATURE_DEFAULTS[4] if name == "vegetation_density" else None
+            self.fields[name] = grid_field(name, value, shape, default)
+        self.bbox = [float(edge) for edge in bbox] if bbox is not None else None
+        self.resolution = float(resolution) if resolution is not None else None
+        self.updated_at = updated_at if updated_at is not None else time.time()
+
+        digest = hashlib.sha1(repr((self.bbox, self.resolution)).encode())
+        for name, value in self.fields.items():
+            digest.update(name.encode())
+            digest.update(repr(value).encode() if value is None or np.ndim(value) == 0 else value.tobytes())
+        self.fingerprint = digest.hexdigest()[:16]
+
+    def sample(self, latitudes, longitudes):
+        """
+        Weather fields at the pixels of a tile
+
+        Returns:
+            (fields, covered): scalar or (rows, cols) values per field, and a
+            boolean mask of the pixels inside the bbox (None when all are)
+        """
+        if self.bbox is None:
+            return dict(self.fields), None
+
+        west, south, east, north = self.bbox
+        rows, cols = grid_shape(self.bbox, self.resolution)
+        row_index = np.floor((north - latitudes) / self.resolution).astype(np.int64)
+        col_index = np.floor((longitudes - west) / self.resolution).astype(np.int64)
+        row_inside = (row_index >= 0) & (row_index < rows)
+        col_inside = (col_index >= 0) & (col_index < cols)
+        # Latitude only varies by row and longitude by column, so one outer
+        # index gathers a whole tile
+        cells = np.ix_(np.clip(row_index, 0, rows - 1), np.clip(col_index, 0, cols - 1))
+        sampled = {name: value if value is None or np.ndim(value) == 0 else value[cells]
+                   for name, value in self.fields.items()}
+        return sampled, np.outer(row_inside, col_inside)
+
+    def save(self, path):
+        """
+        Write the grid to an .npz file, atomically
+        """
+        arrays = {name: np.asarray(np.nan if value is None else value, dtype=np.float64)
+                  for name, value in self.fields.items()}
+        meta = json.dumps({"bbox": self.bbox, "resolution": self.resolution, "updated_at": self.updated_at})
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            np.savez(f, _meta=np.frombuffer(meta.encode(), dtype=np.uint8), **arrays)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(data["_meta"].tobytes().decode())
+            fields = {}
+            for name in WEATHER_FIELDS:
+                value = data[name]
+                fields[name] = (None if np.isnan(value) else float(value)) if value.ndim == 0 else value
+        return cls(fields, meta["bbox"], meta["resolution"], meta["updated_at"])
+
+    def info(self):
+        return {
+            "fingerprint": self.fingerprint,
+            "updated_at": self.updated_at,
+            "bbox": self.bbox,
+            "resolution": self.resolution,
+            "fields": {name: None if value is None else ("scalar" if np.ndim(value) == 0 else list(value.shape))
+                       for name, value in self.fields.items()}
+        }
+
+
+class WeatherLayer:
+    """
+    The current WeatherGrid tiles are scored from.
+
+    With a `path`, updates are written to that file and every worker process
+    picks them up on its next tile request (a stat() per call), which also
+    keeps the layer across restarts. Without one the layer lives in this
+    process only and starts empty.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or None
+        self._grid = WeatherGrid({})
+        self._loaded_mtime = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build a layer persisted to WEATHER_LAYER_PATH, or held in memory when unset
+        """
+        return cls(os.getenv("WEATHER_LAYER_PATH"))
+
+    def set(self, grid):
+        """
+        Replace the layer with a WeatherGrid
+        """
+        if self.path:
+            grid.save(self.path)
+        with self._lock:
+            self._grid = grid
+            self._loaded_mtime = os.path.getmtime(self.path) if self.path else None
+        logger.info(f"Weather layer updated to {grid.fingerprint}"
+                    + (f" over {grid.bbox} at {grid.resolution} degrees" if grid.bbox is not None else ""))
+
+    def current(self):
+        """
+        The latest WeatherGrid, reloaded if another process updated the file
+        """
+        if self.path:
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError:
+                mtime = None
+            if mtime is not None and mtime != self._loaded_mtime:
+                try:
+                    grid = WeatherGrid.load(self.path)
+                except (OSError, ValueError, KeyError) as e:
+                    logger.warning(f"Could not load the weather layer from {self.path}: {str(e)}")
+                else:
+                    with self._lock:
+                        self._grid, self._loaded_mtime = grid, mtime
+        return self._grid
+
+
+def render_tile(z, x, y, grid, overrides=None, tile_format="png"):
+    """
+    Score the 256x256 pixels of a tile and encode them.
+
+    Args:
+        grid: WeatherGrid to sample
+        overrides: Single values replacing grid fields for the whole tile
+        tile_format: "png" for a colored RGBA image (transparent outside the
+            grid), "f16" for row-major little-endian float16 risk scores
+            (NaN outside the grid)
+
+    Raises:
+        ValueError: for an invalid tile or a weather field missing from both
+            the layer and the overrides
+    """
+    check_tile(z, x, y)
+    latitudes, longitudes = tile_axes(z, x, y)
+    fields, covered = grid.sample(latitudes, longitudes)
+    fields.update({name: value for name, value in (overrides or {}).items() if value is not None})
+    for name in WEATHER_FIELDS[:4]:
+        if fields.get(name) is None:
+            raise ValueError(f"Missing weather field '{name}': set the weather layer or pass it as a query parameter")
+
+    scores = score_grid((TILE_SIZE, TILE_SIZE), **fields)["risk_score"]
+    if covered is not None:
+        scores = np.where(covered, scores, np.nan)
+
+    if tile_format == "f16":
+        return scores.astype("<f2").tobytes()
+    return encode_png(scores)
+
+
+def encode_png(scores):
+    """
+    RGBA PNG of a 2-D array of risk scores; NaN pixels are transparent
+    """
+    # Imported here so the API starts without loading Pillow
+    from PIL import Image
+
+    missing = np.isnan(scores)
+    index = np.clip(np.nan_to_num(scores) * 255, 0, 255).round().astype(np.uint8)
+    rgba = _COLOR_TABLE[index]
+    rgba[missing] = 0
+    out = io.BytesIO()
+    Image.fromarray(rgba, "RGBA").save(out, format="PNG", optimize=False, compress_level=6)
+    return out.getvalue()
+
+
+class TileCache:
+    """
+    Two-tier cache of encoded tiles: an LRU of at most `max_entries` tiles in
+    memory in front of a directory of tile files. Both tiers expire entries
+    after `ttl_seconds`, and the disk tier is pruned back to `max_disk_files`
+    (oldest first) every `prune_every` writes. An empty `directory` keeps the
+    cache in memory only. The directory is created on the first write, and
+    pruning only touches files named like this cache's tiles.
+    """
+
+    def __init__(self, max_entries=2000, ttl_seconds=900.0, directory=None, max_disk_files=50000,
+                 prune_every=500):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.directory = directory or None
+        self.max_disk_files = max_disk_files
+        self.prune_every = prune_every
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._directory_ready = False
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build a cache from the TILE_CACHE_* environment variables
+        """
+        max_disk_files = int(os.getenv("TILE_CACHE_MAX_DISK_FILES") or 50000)
+        return cls(
+            max_entries=int(os.getenv("TILE_CACHE_MAX_ENTRIES") or 2000),
+            ttl_seconds=float(os.getenv("TILE_CACHE_TTL_SECONDS") or 900),
+            # A disk limit of 0 keeps tiles in memory only
+            directory=(os.getenv("TILE_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "wildfire-risk-tiles"))
+            if max_disk_files > 0 else None,
+            max_disk_files=max_disk_files
+        )
+
+    @staticmethod
+    def etag(key):
+        """
+        Strong ETag of a tile, derived from its key so it is known before rendering
+        """
+        return '"' + hashlib.sha1(key.encode()).hexdigest()[:20] + '"'
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest() + TILE_FILE_SUFFIX)
+
+    def get(self, key):
+        """
+        Return the cached tile bytes, or None on a miss or expired entry
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, body = entry
+                if now - stored_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.memory_hits += 1
+                    return body
+                del self._entries[key]
+
+        if self.directory:
+            path = self._path(key)
+            try:
+                stored_at = os.path.getmtime(path)
+                if now - stored_at <= self.ttl_seconds:
+                    with open(path, "rb") as f:
+                        body = f.read()
+                    self._remember(key, body, stored_at)
+                    self.disk_hits += 1
+                    return body
+                os.remove(path)
+            except OSError:
+                pass
+        self.misses += 1
+        return None
+
+    def put(self, key, body):
+        """
+        Store a tile in memory and, when enabled, on disk
+        """
+        now = time.time()
+        self._remember(key, body, now)
+        if not self.directory:
+            return
+        path = self._path(key)
+        # Write then rename so concurrent readers never see a partial tile
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            if not self._directory_ready:
+                os.makedirs(self.directory, exist_ok=True)
+                self._directory_ready = True
+            with open(temporary, "wb") as f:
+                f.write(body)
+            os.replace(temporary, path)
+        except OSError as e:
+            logger.warning(f"Could not write tile to the disk cache: {str(e)}")
+            return
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % self.prune_every == 0
+        if prune:
+            self.prune()
+
+    def _remember(self, key, body, stored_at):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (stored_at, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def prune(self):
+        """
+        Delete expired tile files, then the oldest ones above max_disk_files.
+        Other files in the directory are left alone.
+        """
+        if not self.directory:
+            return 0
+        now = time.time()
+        files = []
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return 0
+        for entry in entries:
+            if not _TILE_FILE_NAME.fullmatch(entry.name):
+                continue
+            try:
+                files.append((entry.stat().st_mtime, entry.path))
+            except OSError:
+                continue
+        files.sort()
+        excess = len(files) - self.max_disk_files
+        removed = 0
+        for i, (stored_at, path) in enumerate(files):
+            if now - stored_at <= self.ttl_seconds and i >= excess:
+                continue
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def clear_memory(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "directory": self.directory,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+        }
+
+
+def tile_key(z, x, y, grid, overrides=None, tile_format="png"):
+    """
+    Cache key of a tile: the weather layer fingerprint, the overridden fields
+    and the tile address. Overrides keep their full float precision, so two
+    different values never share a tile.
+    """
+    override_part = ",".join(f"{name}={float(value)!r}" for name, value in sorted((overrides or {}).items())
+                             if value is not None)
+    return f"{grid.fingerprint}/{override_part}/{z}/{x}/{y}.{tile_format}"
+
+
+# Weather the tiles are scored from, replaced through the admin routes
+weather_layer = WeatherLayer.from_env()
+# Rendered tiles shared by the tile route
+tile_cache = TileCache.from_env()
+metrics_registry.gauge("tile_cache_entries", "Risk tiles held in the in-memory tile cache",
+                       callback=lambda: len(tile_cache))
+metrics_registry.counter("tile_cache_hits_total", "Tile requests served from the cache, by tier",
+                         {"tier": "memory"}, callback=lambda: tile_cache.memory_hits)
+metrics_registry.counter("tile_cache_hits_total", "Tile requests served from the cache, by tier",
+                         {"tier": "disk"}, callback=lambda: tile_cache.disk_hits)
+metrics_registry.counter("tile_cache_misses_total", "Tile requests that had to be rendered",
+                         callback=lambda: tile_cache.misses)
@@ -0,0 +1,59 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Shares one in-flight computation between identical concurrent calls.
+
+    The first caller for a key starts the work as its own task; callers that
+    arrive with the same key while it is running await that task instead of
+    repeating the work. The task is shielded, so a caller disconnecting does
+    not cancel the result for everybody else.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn):
+        """
+        Await fn() for key, joining an identical in-flight call if there is one
+
+        Args:
+            key: Hashable identity of the computation
+            fn: Zero-argument coroutine function doing the work
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved in case every caller went away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self):
+        """
+        Number of computations started and of requests that joined one
+        """
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced
+        }
+
+
+# Shared group for identical concurrent /predict requests
+prediction_flights = SingleFlight()
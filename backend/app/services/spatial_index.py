@@ -0,0 +1,264 @@
+import logging
+import math
+import os
+import threading
+import time
+
+import numpy as np
+
+from app.services.metrics import metrics_registry
+from app.services.model_service import RISK_LEVELS
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+# Locations whose coordinates agree to this many decimals share one entry (~1 m)
+KEY_DECIMALS = 5
+
+_LEVEL_INDEX = {level: index for index, level in RISK_LEVELS.items()}
+
+
+def to_unit_vectors(latitudes, longitudes):
+    """
+    (N, 3) points on the unit sphere, so that Euclidean distance in the tree
+    is the chord between two locations
+    """
+    lat = np.radians(np.asarray(latitudes, dtype=np.float64))
+    lon = np.radians(np.asarray(longitudes, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def chord_for_km(distance_km):
+    """
+    Chord length on the unit sphere of a great-circle distance
+    """
+    return 2.0 * math.sin(min(distance_km / EARTH_RADIUS_KM, math.pi) / 2.0)
+
+
+def km_for_chord(chord):
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2.0, 0.0, 1.0))
+
+
+class RiskIndex:
+    """
+    In-memory spatial index of the latest risk score per scored location.
+
+    Locations live in growable arrays addressed by a slot number. A cKDTree
+    covers the slots that existed at its last build; locations added since
+    sit in a small delta range that queries scan by brute force. Rescoring a
+    known location only overwrites its score, since the tree depends on
+    positions alone. Once the delta reaches `rebuild_threshold` locations
+    (or 2% of the tree, whichever is larger) the tree is rebuilt on a
+    background thread and swapped in.
+    At most `max_locations` are kept; new locations beyond that are dropped.
+    """
+
+    def __init__(self, max_locations=2_000_000, rebuild_threshold=4096):
+        self.max_locations = max_locations
+        self.rebuild_threshold = rebuild_threshold
+        self._slots = {}
+        self._size = 0
+        self._xyz = np.empty((0, 3))
+        self._lat = np.empty(0)
+        self._lon = np.empty(0)
+        self._score = np.empty(0, dtype=np.float32)
+        self._level = np.empty(0, dtype=np.uint8)
+        self._updated = np.empty(0)
+        self._tree = None
+        self._tree_size = 0
+        self._rebuilding = False
+        # Bumped by clear() so a rebuild that started before it is discarded
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.dropped = 0
+        self.rebuilds = 0
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build an index from the RISK_INDEX_* environment variables
+        """
+        return cls(
+            max_locations=int(os.getenv("RISK_INDEX_MAX_LOCATIONS") or 2_000_000),
+            rebuild_threshold=int(os.getenv("RISK_INDEX_REBUILD_THRESHOLD") or 4096)
+        )
+
+    def __len__(self):
+        return self._size
+
+    def _grow(self, needed):
+        # Double the capacity so appends are amortized O(1)
+        capacity = max(needed, 2 * len(self._lat), 1024)
+        for name in ("_xyz", "_lat", "_lon", "_score", "_level", "_updated"):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    def update(self, latitudes, longitudes, risk_scores, risk_levels):
+        """
+        Record the latest scores of a batch of locations, adding new ones
+
+        Args:
+            risk_levels: Level names as in a prediction's `risk_level`
+        """
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        scores = np.asarray(risk_scores, dtype=np.float32)
+        levels = np.array([_LEVEL_INDEX.get(level, 0) for level in risk_levels], dtype=np.uint8)
+        keys = zip(np.round(latitudes, KEY_DECIMALS).tolist(), np.round(longitudes, KEY_DECIMALS).tolist())
+        now = time.time()
+
+        with self._lock:
+            slots = []
+            new_rows = []
+            for row, key in enumerate(keys):
+                slot = self._slots.get(key)
+                if slot is None:
+                    if self._size + len(new_rows) >= self.max_locations:
+                        self.dropped += 1
+                        continue
+                    slot = self._slots[key] = self._size + len(new_rows)
+                    new_rows.append(row)
+                slots.append((slot, row))
+
+            if new_rows:
+                end = self._size + len(new_rows)
+                if end > len(self._lat):
+                    self._grow(end)
+                new_rows = np.asarray(new_rows)
+                self._lat[self._size:end] = latitudes[new_rows]
+                self._lon[self._size:end] = longitudes[new_rows]
+                self._xyz[self._size:end] = to_unit_vectors(latitudes[new_rows], longitudes[new_rows])
+                self._size = end
+
+            if slots:
+                slot_index, rows = (np.asarray(column) for column in zip(*slots))
+                self._score[slot_index] = scores[rows]
+                self._level[slot_index] = levels[rows]
+                self._updated[slot_index] = now
+
+            rebuild = self._needs_rebuild()
+            if rebuild:
+                self._rebuilding = True
+
+        if rebuild:
+            threading.Thread(target=self.rebuild, name="risk-index-rebuild", daemon=True).start()
+
+    def _needs_rebuild(self):
+        delta = self._size - self._tree_size
+        return not self._rebuilding and delta >= max(self.rebuild_threshold, self._tree_size // 50)
+
+    def rebuild(self):
+        """
+        Build a tree over every location and swap it in
+        """
+        with self._lock:
+            size, generation = self._size, self._generation
+            points = self._xyz[:size].copy()
+            self._rebuilding = True
+        # Imported here so the API starts without loading SciPy
+        from scipy.spatial import cKDTree
+
+        started = time.perf_counter()
+        try:
+            tree = cKDTree(points, balanced_tree=False, compact_nodes=False) if size else None
+        finally:
+            with self._lock:
+                if generation == self._generation and size >= self._tree_size:
+                    self._tree, self._tree_size = tree, size
+                self._rebuilding = False
+        self.rebuilds += 1
+        logger.info(f"Rebuilt risk index tree over {size} locations in {time.perf_counter() - started:.3f}s")
+
+    def _candidates(self, center, chord):
+        # Slots within `chord` of center: a tree query over the indexed slots
+        # plus a scan of the delta
+        with self._lock:
+            tree, tree_size, size = self._tree, self._tree_size, self._size
+            delta = self._xyz[tree_size:size].copy()
+        found = np.asarray(tree.query_ball_point(center, chord), dtype=np.int64) if tree is not None \
+            else np.empty(0, dtype=np.int64)
+        if len(delta):
+            near = np.flatnonzero(np.einsum("ij,ij->i", delta - center, delta - center) <= chord * chord)
+            found = np.concatenate([found, near + tree_size])
+        return found
+
+    def _top(self, slots, k, min_score, max_age_seconds, center=None):
+        with self._lock:
+            scores = self._score[slots]
+            keep = np.ones(len(slots), dtype=bool)
+            if min_score is not None:
+                keep &= scores >= min_score
+            if max_age_seconds is not None:
+                keep &= self._updated[slots] >= time.time() - max_age_seconds
+            slots, scores = slots[keep], scores[keep]
+            if len(slots) > k:
+                best = np.argpartition(-scores, k - 1)[:k]
+                slots, scores = slots[best], scores[best]
+            order = np.argsort(-scores, kind="stable")
+            slots = slots[order]
+            rows = {
+                "latitude": self._lat[slots].tolist(),
+                "longitude": self._lon[slots].tolist(),
+                "risk_score": np.round(self._score[slots].astype(np.float64), 6).tolist(),
+                "risk_level": [RISK_LEVELS[level] for level in self._level[slots].tolist()],
+                "updated_at": self._updated[slots].tolist()
+            }
+            if center is not None:
+                chords = np.linalg.norm(self._xyz[slots] - center, axis=1)
+                rows["distance_km"] = np.round(km_for_chord(chords), 3).tolist()
+        return [dict(zip(rows, values)) for values in zip(*rows.values())]
+
+    def top_within_radius(self, latitude, longitude, radius_km, k=20, min_score=None, max_age_seconds=None):
+        """
+        The k highest-risk locations within radius_km of a point, highest first
+        """
+        center = to_unit_vectors([latitude], [longitude])[0]
+        slots = self._candidates(center, chord_for_km(radius_km))
+        return self._top(slots, k, min_score, max_age_seconds, center)
+
+    def top_within_bbox(self, bbox, k=20, min_score=None, max_age_seconds=None):
+        """
+        The k highest-risk locations inside a [west, south, east, north] box
+        """
+        west, south, east, north = bbox
+        # Query a ball around points along the box edges, then keep the
+        # locations inside the box
+        steps = np.linspace(0.0, 1.0, 9)
+        edge_lat = np.concatenate([south + (north - south) * steps] * 2 + [np.full(9, south), np.full(9, north)])
+        edge_lon = np.concatenate([np.full(9, west), np.full(9, east)] + [west + (east - west) * steps] * 2)
+        edges = to_unit_vectors(edge_lat, edge_lon)
+        center = to_unit_vectors([(south + north) / 2], [(west + east) / 2])[0]
+        chord = float(np.linalg.norm(edges - center, axis=1).max()) if east - west <= 90 else 2.0
+        slots = self._candidates(center, chord * 1.01)
+        with self._lock:
+            lat, lon = self._lat[slots], self._lon[slots]
+        inside = (lat >= south) & (lat <= north) & (lon >= west) & (lon <= east)
+        return self._top(slots[inside], k, min_score, max_age_seconds)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._slots.clear()
+            self._size = self._tree_size = 0
+            self._tree = None
+
+    def stats(self):
+        return {
+            "locations": self._size,
+            "max_locations": self.max_locations,
+            "tree_locations": self._tree_size,
+            "delta_locations": self._size - self._tree_size,
+            "rebuilds": self.rebuilds,
+            "dropped": self.dropped
+        }
+
+
+# Latest score of every location served by this process
+risk_index = RiskIndex.from_env()
+metrics_registry.gauge("risk_index_locations", "Scored locations held in the spatial risk index",
+                       callback=lambda: len(risk_index))
+metrics_registry.counter("risk_index_dropped_total", "New locations not indexed because the index was full",
+                         callback=lambda: risk_index.dropped)
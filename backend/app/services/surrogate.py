@@ -0,0 +1,117 @@
+import itertools
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Heatmap parameters the surrogate grid is defined over, in array order
+PARAM_NAMES = ("red", "green", "blue", "wind")
+
+
+def decode_heatmaps(inputs):
+    """
+    Recover the (N, 4) heatmap parameters from rendered (N, H, W, 3) heatmaps.
+
+    Inverts render_heatmaps: the first column holds the clamped base channels
+    and the wind ramp is read back from every column where the red or blue
+    channel is not saturated. When both channels saturate immediately the
+    image looks the same for any strong wind and 1.0 is returned.
+    """
+    inputs = np.asarray(inputs, dtype=np.float64)
+    width = inputs.shape[2]
+    row = inputs[:, 0, :, :]
+    red, green, blue = row[:, :, 0], row[:, :, 1], row[:, :, 2]
+    ramp = np.arange(width) / width
+
+    # Per-column wind estimates from the unsaturated part of each channel
+    red_valid = (red < 1.0) & (ramp > 0)
+    blue_valid = (blue > 0.0) & (ramp > 0)
+    safe_ramp = np.where(ramp > 0, ramp, 1.0)
+    red_estimate = (red - red[:, :1]) / (0.2 * safe_ramp)
+    blue_estimate = (blue[:, :1] - blue) / (0.1 * safe_ramp)
+
+    # Weight by the ramp so wide columns (least rounding error) dominate
+    weights = red_valid * ramp + blue_valid * ramp
+    weighted = np.where(red_valid, red_estimate * ramp, 0.0) + np.where(blue_valid, blue_estimate * ramp, 0.0)
+    total = weights.sum(axis=1)
+    wind = np.where(total > 0, weighted.sum(axis=1) / np.where(total > 0, total, 1.0), 1.0)
+
+    return np.column_stack([red[:, 0], green[:, 0], blue[:, 0], np.clip(wind, 0.0, 1.0)])
+
+
+class SurrogateModel:
+    """
+    Lookup-table stand-in for the CNN.
+
+    The CNN only ever sees synthetic heatmaps that are fully determined by four
+    clamped scalars (see heatmap_params), so its output is sampled once on a
+    regular grid over that space and served by multilinear interpolation.
+    `max_error` is the largest absolute difference from the real model
+    measured when the table was built.
+    """
+
+    def __init__(self, axes, values, max_error=None, metadata=None):
+        self.axes = [np.asarray(axis, dtype=np.float64) for axis in axes]
+        self.values = np.asarray(values, dtype=np.float32)
+        self.max_error = max_error
+        self.metadata = metadata or {}
+        if self.values.shape != tuple(len(axis) for axis in self.axes):
+            raise ValueError(f"Surrogate values of shape {self.values.shape} do not match the grid axes")
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a surrogate table written by build_surrogate.py
+        """
+        with np.load(path) as data:
+            axes = [data[f"axis_{name}"] for name in PARAM_NAMES]
+            max_error = float(data["max_error"]) if "max_error" in data else None
+            metadata = {key: data[key].item() for key in data.files if key.startswith("meta_")}
+            return cls(axes, data["values"], max_error=max_error, metadata=metadata)
+
+    def save(self, path, **metadata):
+        """
+        Write the table as a compressed .npz file
+        """
+        arrays = {f"axis_{name}": axis for name, axis in zip(PARAM_NAMES, self.axes)}
+        if self.max_error is not None:
+            arrays["max_error"] = np.float64(self.max_error)
+        arrays.update({f"meta_{key}": np.asarray(value) for key, value in metadata.items()})
+        np.savez_compressed(path, values=self.values, **arrays)
+
+    def predict_params(self, params):
+        """
+        Interpolate CNN scores for (N, 4) heatmap parameters
+
+        Returns:
+            (N,) array of scores
+        """
+        params = np.asarray(params, dtype=np.float64).reshape(-1, len(self.axes))
+        lower = []
+        fractions = []
+        for dim, axis in enumerate(self.axes):
+            x = np.clip(params[:, dim], axis[0], axis[-1])
+            index = np.clip(np.searchsorted(axis, x, side="right") - 1, 0, len(axis) - 2)
+            lower.append(index)
+            fractions.append((x - axis[index]) / (axis[index + 1] - axis[index]))
+
+        # Sum the contributions of the 2^D corners of each enclosing grid cell
+        scores = np.zeros(len(params), dtype=np.float64)
+        for corner in itertools.product((0, 1), repeat=len(self.axes)):
+            weight = np.ones(len(params), dtype=np.float64)
+            index = []
+            for dim, offset in enumerate(corner):
+                weight *= fractions[dim] if offset else 1.0 - fractions[dim]
+                index.append(lower[dim] + offset)
+            scores += weight * self.values[tuple(index)]
+        return scores
+
+    def predict(self, inputs, verbose=0):
+        """
+        Model-compatible entry point taking rendered heatmaps
+
+        Returns:
+            (N, 1) array of scores like keras Model.predict
+        """
+        return self.predict_params(decode_heatmaps(inputs))[:, np.newaxis]
@@ -0,0 +1,358 @@
+import asyncio
+import datetime
+import logging
+import os
+import random
+
+import httpx
+import numpy as np
+from dotenv import load_dotenv
+
+from app.services.metrics import metrics_registry
+from app.services.model_service import predict_risk_batch
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# You would typically store this in .env file
+WEATHER_API_KEY = os.getenv("WEATHER_API_KEY", "")
+# "openweathermap" calls WEATHER_API_URL, "stub" serves generated weather
+# in-process and "mock" returns fixed data (the default without an API key)
+WEATHER_PROVIDER = (os.getenv("WEATHER_PROVIDER") or ("openweathermap" if WEATHER_API_KEY else "mock")).lower()
+WEATHER_PROVIDERS = ("openweathermap", "stub", "mock")
+
+# OpenWeatherMap reports wind in m/s; the risk model expects km/h
+_MS_TO_KMH = 3.6
+
+# Rain in mm that fully suppresses the precipitation factor of the risk
+# score; a day's expected rain is its precipitation chance times this
+WET_DAY_PRECIPITATION_MM = 10.0
+
+
+def mock_weather(latitude, longitude):
+    """
+    Fixed weather used while no weather API is configured
+    """
+    return {
+        "location": f"Location at {latitude}, {longitude}",
+        "current_conditions": {
+            "temperature": 25.5,
+            "humidity": 45,
+            "wind_speed": 15,
+            "precipitation": 0,
+            "weather": "Clear"
+        },
+        "forecast": [
+            {
+                "date": "2025-05-19",
+                "temperature_high": 27.8,
+                "temperature_low": 15.2,
+                "humidity": 40,
+                "precipitation_chance": 10,
+                "wind_speed": 12,
+                "weather": "Sunny"
+            },
+            {
+                "date": "2025-05-20",
+                "temperature_high": 29.1,
+                "temperature_low": 16.3,
+                "humidity": 38,
+                "precipitation_chance": 5,
+                "wind_speed": 14,
+                "weather": "Sunny"
+            }
+        ]
+    }
+
+
+class WeatherProviderError(Exception):
+    """
+    Raised when the weather provider fails or keeps failing after retries
+    """
+
+
+def parse_onecall(data, latitude, longitude):
+    """
+    Convert an OpenWeatherMap One Call response (metric units) into the
+    /weather response shape
+    """
+    offset = data.get("timezone_offset", 0)
+    current = data.get("current", {})
+
+    def summary(entry):
+        return (entry.get("weather") or [{}])[0].get("main", "Unknown")
+
+    def amount(value):
+        # Current rain is reported per hour as {"1h": mm}, daily rain as mm
+        return float(value.get("1h", 0.0) if isinstance(value, dict) else value or 0.0)
+
+    return {
+        "location": f"Location at {latitude}, {longitude}",
+        "current_conditions": {
+            "temperature": current.get("temp"),
+            "humidity": current.get("humidity"),
+            "wind_speed": round(current.get("wind_speed", 0.0) * _MS_TO_KMH, 1),
+            "precipitation": amount(current.get("rain")),
+            "weather": summary(current)
+        },
+        "forecast": [
+            {
+                "date": datetime.datetime.fromtimestamp(day["dt"] + offset, datetime.timezone.utc).date().isoformat(),
+                "temperature_high": day["temp"]["max"],
+                "temperature_low": day["temp"]["min"],
+                "humidity": day["humidity"],
+                "precipitation_chance": round(day.get("pop", 0.0) * 100),
+                "precipitation": amount(day.get("rain")),
+                "wind_speed": round(day.get("wind_speed", 0.0) * _MS_TO_KMH, 1),
+                "weather": summary(day)
+            }
+            for day in data.get("daily", [])
+        ]
+    }
+
+
+class WeatherClient:
+    """
+    Async OpenWeatherMap One Call client.
+
+    Calls share one keep-alive connection pool (`max_connections`), at most
+    `max_concurrency` run at once, and transport errors, timeouts, 429s and
+    5xx responses are retried up to `retries` times with exponential backoff
+    and full jitter. Pass an httpx `transport` (e.g. an ASGITransport around
+    the stub app) to serve it without the network.
+    """
+
+    def __init__(self, base_url="https://api.openweathermap.org", api_key="", timeout_seconds=5.0,
+                 max_connections=20, max_concurrency=10, retries=2, backoff_seconds=0.2,
+                 max_backoff_seconds=2.0, transport=None):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.timeout = httpx.Timeout(timeout_seconds, connect=min(timeout_seconds, 2.0))
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.transport = transport
+        self._client = None
+        self._semaphore = None
+        self._loop = None
+        # Clients of previous event loops that are still being closed
+        self._closing = set()
+        self.requests = 0
+        self.retried = 0
+        self.failures = 0
+
+    @classmethod
+    def from_env(cls, provider=None):
+        """
+        Build a client from the WEATHER_* environment variables
+        """
+        transport = base_url = None
+        if (provider or WEATHER_PROVIDER) == "stub":
+            from app.services.weather_stub import create_stub_app
+            transport, base_url = httpx.ASGITransport(app=create_stub_app()), "http://weather-stub"
+        return cls(
+            base_url=base_url or os.getenv("WEATHER_API_URL") or "https://api.openweathermap.org",
+            api_key=WEATHER_API_KEY,
+            timeout_seconds=float(os.getenv("WEATHER_TIMEOUT_SECONDS") or 5),
+            max_connections=int(os.getenv("WEATHER_MAX_CONNECTIONS") or 20),
+            max_concurrency=int(os.getenv("WEATHER_MAX_CONCURRENCY") or 10),
+            retries=int(os.getenv("WEATHER_RETRIES") or 2),
+            backoff_seconds=float(os.getenv("WEATHER_RETRY_BACKOFF_SECONDS") or 0.2),
+            transport=transport
+        )
+
+    def _session(self):
+        # The pool and semaphore belong to the event loop that created them
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            if self._client is not None:
+                self._close_stale(self._client, self._loop, loop)
+            self._client = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, limits=self.limits,
+                                             transport=self.transport)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._client, self._semaphore
+
+    def _close_stale(self, client, old_loop, loop):
+        # Close a client left over from another event loop: on that loop while
+        # it is alive, otherwise on this one. A loop that already closed took
+        # its transports with it, so only the client's own state is released
+        async def close():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.debug(f"Closing the weather client of a finished event loop failed: {str(e)}")
+
+        if not old_loop.is_closed():
+            asyncio.run_coroutine_threadsafe(close(), old_loop)
+            return
+        task = loop.create_task(close())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    def _backoff(self, attempt, retry_after=None):
+        delay = random.uniform(0, min(self.max_backoff_seconds, self.backoff_seconds * 2 ** attempt))
+        if retry_after is not None and retry_after.isdigit():
+            delay = max(delay, min(float(retry_after), self.max_backoff_seconds))
+        return delay
+
+    async def get_json(self, path, params):
+        """
+        GET path and return the decoded JSON body, retrying transient failures
+
+        Raises:
+            WeatherProviderError: on a non-retryable error response, a body
+                that is not JSON, or when every attempt failed
+        """
+        client, semaphore = self._session()
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            try:
+                async with semaphore:
+                    self.requests += 1
+                    response = await client.get(path, params=params)
+                if response.status_code < 400:
+                    try:
+                        return response.json()
+                    except ValueError as e:
+                        error = f"invalid JSON body: {str(e)}"
+                        break
+                error = f"{response.status_code} {response.text[:200]}"
+                if response.status_code != 429 and response.status_code < 500:
+                    break
+                retry_after = response.headers.get("retry-after")
+            except httpx.HTTPError as e:
+                error = f"{type(e).__name__}: {str(e)}"
+            if attempt < self.retries:
+                self.retried += 1
+                delay = self._backoff(attempt, retry_after)
+                logger.warning(f"Weather provider call failed ({error}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+        self.failures += 1
+        raise WeatherProviderError(f"Weather provider request failed: {error}")
+
+    async def onecall(self, latitude, longitude):
+        """
+        Current conditions and daily forecast in the /weather response shape
+
+        Raises:
+            WeatherProviderError: if the call fails or the response is not a
+                One Call response
+        """
+        data = await self.get_json("/data/3.0/onecall", {
+            "lat": latitude,
+            "lon": longitude,
+            "appid": self.api_key,
+            "units": "metric",
+            "exclude": "minutely,hourly,alerts"
+        })
+        try:
+            return parse_onecall(data, latitude, longitude)
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            self.failures += 1
+            raise WeatherProviderError(f"Unexpected weather provider response: {type(e).__name__}: {str(e)}")
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self):
+        return {
+            "base_url": self.base_url,
+            "requests": self.requests,
+            "retried": self.retried,
+            "failures": self.failures,
+            "max_concurrency": self.max_concurrency
+        }
+
+
+async def fetch_weather(latitude, longitude):
+    """
+    Current conditions and daily forecast for a location from the configured
+    provider
+
+    Returns:
+        Dict with `location`, `current_conditions` and a `forecast` list of days
+
+    Raises:
+        WeatherProviderError: if the provider could not be reached
+    """
+    if WEATHER_PROVIDER == "mock":
+        # Return mock data for demonstration
+        return mock_weather(latitude, longitude)
+    return await weather_client.onecall(latitude, longitude)
+
+
+def forecast_inputs(latitude, longitude, forecast, vegetation_density=None):
+    """
+    Columnar predict_risk_batch inputs with one row per forecast day.
+
+    A day is scored at its high temperature, the hottest and usually driest
+    part of the day. Its precipitation is the reported amount when present,
+    otherwise the expected rain from its precipitation chance.
+    """
+    def precipitation(day):
+        if day.get("precipitation") is not None:
+            return float(day["precipitation"])
+        return float(day.get("precipitation_chance") or 0) / 100 * WET_DAY_PRECIPITATION_MM
+
+    n_days = len(forecast)
+    return {
+        "latitude": [latitude] * n_days,
+        "longitude": [longitude] * n_days,
+        "temperature": [float(day["temperature_high"]) for day in forecast],
+        "humidity": [float(day["humidity"]) for day in forecast],
+        "wind_speed": [float(day["wind_speed"]) for day in forecast],
+        "precipitation": [precipitation(day) for day in forecast],
+        "vegetation_density": [vegetation_density] * n_days
+    }
+
+
+def forecast_risk(latitude, longitude, weather, model_mode=None, vegetation_density=None):
+    """
+    Risk time series of a fetched forecast, with every day scored in one
+    predict_risk_batch call
+    """
+    forecast = weather.get("forecast") or []
+    columns = forecast_inputs(latitude, longitude, forecast, vegetation_density)
+    predictions = predict_risk_batch(**columns, model_mode=model_mode)
+
+    days = []
+    for row, (day, prediction) in enumerate(zip(forecast, predictions)):
+        days.append({
+            "date": day.get("date"),
+            "weather": day,
+            "inputs": {name: columns[name][row] for name in ("temperature", "humidity", "wind_speed", "precipitation")},
+            "risk_score": prediction["risk_score"],
+            "risk_level": prediction["risk_level"],
+            "confidence": prediction["confidence"],
+            "factors": prediction["factors"],
+            "model_details": prediction["model_details"]
+        })
+    peak = int(np.argmax([day["risk_score"] for day in days])) if days else None
+    return {
+        "location": weather.get("location"),
+        "latitude": latitude,
+        "longitude": longitude,
+        "days": days,
+        "peak_date": days[peak]["date"] if peak is not None else None,
+        "peak_risk_score": days[peak]["risk_score"] if peak is not None else None
+    }
+
+
+if WEATHER_PROVIDER not in WEATHER_PROVIDERS:
+    raise ValueError(f"Unknown WEATHER_PROVIDER '{WEATHER_PROVIDER}', expected one of {WEATHER_PROVIDERS}")
+if WEATHER_PROVIDER == "mock":
+    logger.warning("Weather API key not found in environment variables, serving mock weather")
+
+# Shared weather provider client with its connection pool
+weather_client = WeatherClient.from_env()
+metrics_registry.counter("weather_requests_total", "Calls made to the weather provider, including retries",
+                         callback=lambda: weather_client.requests)
+metrics_registry.counter("weather_failures_total", "Weather lookups that failed after every retry",
+                         callback=lambda: weather_client.failures)
@@ -0,0 +1,93 @@
+import argparse
+import asyncio
+import hashlib
+import logging
+import time
+
+import numpy as np
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+# Path of the OpenWeatherMap One Call API the stub imitates
+ONECALL_PATH = "/data/3.0/onecall"
+FORECAST_DAYS = 8
+
+
+def stub_onecall(latitude, longitude, seed=0, now=None):
+    """
+    Deterministic One Call response for a location: the same coordinates and
+    seed always give the same weather, in metric units
+    """
+    digest = hashlib.sha1(f"{latitude:.4f},{longitude:.4f},{seed}".encode()).digest()
+    rng = np.random.default_rng(int.from_bytes(digest[:8], "little"))
+    now = int(now if now is not None else time.time())
+    today = now - now % 86400 + 43200
+    # Warmer toward the equator, with a random day-to-day walk
+    base = 32.0 - abs(latitude) * 0.35 + rng.normal(0, 3)
+    highs = base + np.cumsum(rng.normal(0, 2, FORECAST_DAYS))
+    daily = []
+    for day in range(FORECAST_DAYS):
+        pop = float(np.clip(rng.beta(0.6, 2.5), 0, 1))
+        entry = {
+            "dt": today + day * 86400,
+            "temp": {"min": round(float(highs[day] - rng.uniform(8, 15)), 2), "max": round(float(highs[day]), 2)},
+            "humidity": int(rng.integers(10, 95)),
+            "wind_speed": round(float(rng.gamma(2.0, 2.0)), 2),
+            "pop": round(pop, 2),
+            "weather": [{"main": "Rain" if pop > 0.5 else "Clear"}]
+        }
+        if pop > 0.5:
+            entry["rain"] = round(float(rng.exponential(4.0)), 2)
+        daily.append(entry)
+    return {
+        "lat": latitude,
+        "lon": longitude,
+        "timezone_offset": 0,
+        "current": {
+            "dt": now,
+            "temp": round(float(highs[0] - 3), 2),
+            "humidity": daily[0]["humidity"],
+            "wind_speed": daily[0]["wind_speed"],
+            "weather": daily[0]["weather"]
+        },
+        "daily": daily
+    }
+
+
+def create_stub_app(latency_seconds=0.0, failure_rate=0.0, seed=0):
+    """
+    ASGI app serving stub_onecall on ONECALL_PATH, for tests and benchmarks.
+
+    Mount it in-process with httpx.ASGITransport or run it on localhost with
+    `python -m app.services.weather_stub`. Each response is delayed by
+    `latency_seconds`, and a `failure_rate` share of requests get a 503.
+    `app.state.requests` counts the calls.
+    """
+    app = FastAPI(title="Weather provider stub")
+    app.state.requests = 0
+    failures = np.random.default_rng(seed)
+
+    @app.get(ONECALL_PATH)
+    async def onecall(lat: float = Query(...), lon: float = Query(...)):
+        app.state.requests += 1
+        if latency_seconds:
+            await asyncio.sleep(latency_seconds)
+        if failure_rate and failures.random() < failure_rate:
+            return JSONResponse({"cod": 503, "message": "stub failure"}, status_code=503)
+        return stub_onecall(lat, lon, seed)
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the stub weather provider on localhost")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    uvicorn.run(create_stub_app(args.latency, args.failure_rate, args.seed), host="127.0.0.1", port=args.port)
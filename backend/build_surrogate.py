@@ -0,0 +1,115 @@
+"""
+Script to build the surrogate lookup table for the CNN model.
+The CNN only sees synthetic heatmaps determined by four clamped parameters
+(red, green, blue base values and wind), so its output is sampled on a
+regular grid over that space and stored for multilinear interpolation.
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from app.services.model_service import (
+    SURROGATE_MODEL_PATH,
+    _load_model_variant,
+    heatmap_params,
+    render_heatmaps
+)
+from app.services.surrogate import SurrogateModel, PARAM_NAMES
+
+
+def score_params(model, params, batch_size=64):
+    """
+    Run the real CNN over heatmaps rendered from (N, 4) parameters
+    """
+    scores = np.empty(len(params), dtype=np.float64)
+    for start in range(0, len(params), batch_size):
+        chunk = render_heatmaps(params[start:start + batch_size])
+        scores[start:start + len(chunk)] = model.predict(chunk, verbose=0)[:, 0]
+    return scores
+
+
+def build_table(model, points_per_axis, batch_size=64):
+    """
+    Sample the CNN on a regular grid over [0, 1] for every heatmap parameter
+    """
+    axes = [np.linspace(0.0, 1.0, points_per_axis) for _ in PARAM_NAMES]
+    grid = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, len(PARAM_NAMES))
+    print(f"Scoring {len(grid)} grid points with the CNN...")
+    values = score_params(model, grid, batch_size).reshape([points_per_axis] * len(PARAM_NAMES))
+    return SurrogateModel(axes, values)
+
+
+def validation_params(n_samples, seed=0):
+    """
+    Heatmap parameters for validation: half uniform over the parameter space,
+    half derived from realistic weather inputs
+    """
+    rng = np.random.default_rng(seed)
+    uniform = rng.uniform(0.0, 1.0, size=(n_samples // 2, len(PARAM_NAMES)))
+    n_weather = n_samples - len(uniform)
+    weather = np.column_stack([
+        rng.uniform(0, 50, n_weather),     # temperature
+        rng.uniform(0, 100, n_weather),    # humidity
+        rng.uniform(0, 60, n_weather),     # wind speed
+        rng.exponential(3, n_weather),     # precipitation
+        rng.uniform(0, 1, n_weather),      # vegetation density
+        rng.uniform(0, 3000, n_weather),   # elevation
+        rng.uniform(0, 1, n_weather)       # drought index
+    ])
+    return np.vstack([uniform, heatmap_params(weather)])
+
+
+def measure_error(model, surrogate, params, batch_size=64):
+    """
+    Compare surrogate and CNN scores, returning (max error, mean error)
+    """
+    expected = score_params(model, params, batch_size)
+    errors = np.abs(surrogate.predict_params(params) - expected)
+    return float(errors.max()), float(errors.mean())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the CNN surrogate lookup table")
+    parser.add_argument("--points-per-axis", type=int, default=9,
+                        help="Grid points per heatmap parameter (table has points^4 entries)")
+    parser.add_argument("--validation-samples", type=int, default=1000,
+                        help="Random inputs used to measure the interpolation error")
+    parser.add_argument("--batch-size", type=int, default=64, help="Heatmaps per CNN call")
+    parser.add_argument("--output", default=SURROGATE_MODEL_PATH, help="Where to write the .npz table")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("BUILDING WILDFIRE CNN SURROGATE TABLE")
+    print("=" * 50)
+
+    model, variant, path = _load_model_variant()
+    if model is None:
+        raise SystemExit("No CNN model available to sample. Copy the trained .h5 into models/ first.")
+    print(f"Sampling {variant} model from {path}")
+
+    start = time.perf_counter()
+    surrogate = build_table(model, args.points_per_axis, args.batch_size)
+    print(f"Grid scored in {time.perf_counter() - start:.1f}s")
+
+    max_error, mean_error = measure_error(model, surrogate, validation_params(args.validation_samples),
+                                          args.batch_size)
+    surrogate.max_error = max_error
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    surrogate.save(args.output, source_variant=variant, source_file=os.path.basename(path),
+                   points_per_axis=args.points_per_axis)
+
+    start = time.perf_counter()
+    surrogate.predict_params(validation_params(10000, seed=1))
+    per_sample_us = (time.perf_counter() - start) / 10000 * 1e6
+
+    print("\n" + "=" * 50)
+    print(f"Surrogate table saved to {args.output} ({os.path.getsize(args.output) / 1024:.1f} KB)")
+    print(f"Max absolute error vs CNN: {max_error:.6f} (mean {mean_error:.6f}) "
+          f"over {args.validation_samples} samples")
+    print(f"Interpolation cost: {per_sample_us:.2f} us per sample (batched)")
+    print("Serve it with INFERENCE_BACKEND=surrogate")
+    print("=" * 50)
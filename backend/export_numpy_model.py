@@ -0,0 +1,102 @@
+"""
+Script to export the CNN weights to a flat .npz file for the NumPy runtime.
+The exported file lets the API serve the model with INFERENCE_BACKEND=numpy,
+without TensorFlow installed.
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from app.services.cnn_fastpath import extract_layers
+from app.services.model_service import NUMPY_MODEL_PATH, _load_model_variant, preprocess_features_batch
+from app.services.numpy_cnn import NumpyCNN, save_layers
+
+
+def export_model(model, output):
+    """
+    Extract the layer weights of a Keras model and save them for NumpyCNN
+
+    Args:
+        output: Path or binary file object for the .npz weights
+    """
+    specs = extract_layers(model)
+    save_layers(output, specs, model.input_shape[1:])
+    print(f"Exported {len(specs)} layers")
+
+
+def verify_export(model, output_path, n_samples=64, seed=0):
+    """
+    Compare NumpyCNN against model.predict on weather heatmaps and random images
+
+    Returns:
+        Max absolute difference over both input sets
+    """
+    rng = np.random.default_rng(seed)
+    features = np.column_stack([
+        rng.uniform(0, 50, n_samples),
+        rng.uniform(0, 100, n_samples),
+        rng.uniform(0, 60, n_samples),
+        rng.exponential(3, n_samples),
+        rng.uniform(0, 1, n_samples),
+        rng.uniform(0, 3000, n_samples),
+        rng.uniform(0, 1, n_samples)
+    ])
+    numpy_model = NumpyCNN.load(output_path)
+    max_error = 0.0
+    for name, inputs in (("heatmaps", preprocess_features_batch(features)),
+                         ("random images", rng.uniform(0, 1, (8,) + model.input_shape[1:]).astype(np.float32))):
+        start = time.perf_counter()
+        expected = model.predict(inputs, verbose=0)
+        keras_time = time.perf_counter() - start
+        start = time.perf_counter()
+        actual = numpy_model.predict(inputs)
+        numpy_time = time.perf_counter() - start
+        error = float(np.abs(actual - expected).max())
+        max_error = max(max_error, error)
+        print(f"  {name}: max error {error:.2e}, keras {keras_time * 1000:.1f} ms, "
+              f"numpy {numpy_time * 1000:.1f} ms for {len(inputs)} samples")
+    return max_error
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export CNN weights for the NumPy inference backend")
+    parser.add_argument("--output", default=NUMPY_MODEL_PATH, help="Where to write the .npz weights")
+    parser.add_argument("--tolerance", type=float, default=1e-4, help="Max allowed difference from Keras")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("EXPORTING WILDFIRE CNN FOR NUMPY INFERENCE")
+    print("=" * 50)
+
+    model, variant, path = _load_model_variant()
+    if model is None:
+        raise SystemExit("No CNN model available to export. Copy the trained .h5 into models/ first.")
+    print(f"Exporting {variant} model from {path}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    # Export next to the live file and swap it in only once verified, so a
+    # failed export never replaces the weights a running server reloads
+    temporary = f"{args.output}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            export_model(model, f)
+        print("Verifying against model.predict...")
+        max_error = verify_export(model, temporary)
+        if max_error <= args.tolerance:
+            os.replace(temporary, args.output)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+    print("\n" + "=" * 50)
+    if max_error <= args.tolerance:
+        print(f"Export verified (max error {max_error:.2e}) and written to {args.output}. "
+              f"Serve it with INFERENCE_BACKEND=numpy")
+    else:
+        print(f"ERROR: max error {max_error:.2e} exceeds tolerance {args.tolerance:.0e}, "
+              f"{args.output} was left unchanged")
+    print("=" * 50)
+    raise SystemExit(0 if max_error <= args.tolerance else 1)
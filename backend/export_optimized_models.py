@@ -0,0 +1,240 @@
+"""
+Script to export the CNN to TFLite (float32, float16 and int8) and ONNX.
+Each export is checked against the Keras model on weather heatmaps and the
+accuracy delta, file size and per-sample latency are reported, so the
+cheapest variant that meets accuracy can be served with INFERENCE_BACKEND.
+Only exports within --max-error of Keras replace the files in models/.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from app.services.exported_models import OnnxModel, TFLiteModel
+from app.services.model_service import (
+    ONNX_MODEL_PATH,
+    TFLITE_MODEL_PATHS,
+    TFLITE_VARIANTS,
+    _load_model_variant,
+    preprocess_features_batch
+)
+
+# Scores are bucketed into risk levels by int(score * 5)
+N_RISK_LEVELS = 5
+
+
+def weather_heatmaps(n_samples, seed=0):
+    """
+    Heatmaps from preprocess_features for random but realistic weather inputs
+    """
+    rng = np.random.default_rng(seed)
+    features = np.column_stack([
+        rng.uniform(0, 50, n_samples),     # temperature
+        rng.uniform(0, 100, n_samples),    # humidity
+        rng.uniform(0, 60, n_samples),     # wind speed
+        rng.exponential(3, n_samples),     # precipitation
+        rng.uniform(0, 1, n_samples),      # vegetation density
+        rng.uniform(0, 3000, n_samples),   # elevation
+        rng.uniform(0, 1, n_samples)       # drought index
+    ])
+    return preprocess_features_batch(features)
+
+
+def convert_tflite(saved_model_dir, variant, calibration=None):
+    """
+    Convert a SavedModel to TFLite
+
+    Args:
+        saved_model_dir: Directory written by model.export()
+        variant: "float32", "float16" (half-precision weights) or "int8"
+            (weights and activations quantized, float input and output)
+        calibration: Heatmaps used as the int8 representative dataset
+
+    Returns:
+        The serialized .tflite model
+    """
+    converter = tf.lite.TFLiteConverter.from_saved_model(saved_model_dir)
+    if variant == "float16":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif variant == "int8":
+        if calibration is None:
+            raise ValueError("int8 conversion needs calibration heatmaps")
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = lambda: ([sample[np.newaxis]] for sample in calibration)
+    elif variant != "float32":
+        raise ValueError(f"Unknown TFLite variant '{variant}', expected one of {list(TFLITE_VARIANTS)}")
+    return converter.convert()
+
+
+def convert_onnx(model, output_path):
+    """
+    Convert the Keras model to ONNX if tf2onnx is installed
+
+    Returns:
+        True if the file was written
+    """
+    try:
+        import tf2onnx
+    except ImportError:
+        print("  tf2onnx is not installed, skipping ONNX export (pip install tf2onnx onnxruntime)")
+        return False
+    signature = [tf.TensorSpec((None,) + tuple(model.input_shape[1:]), tf.float32, name="heatmaps")]
+    tf2onnx.convert.from_keras(model, input_signature=signature, output_path=output_path)
+    return True
+
+
+def per_sample_latency_ms(model, inputs, repeats=3):
+    """
+    Best-of-N latency per sample, for single heatmaps and for the whole batch
+    """
+    model.predict(inputs[:1], verbose=0)
+    single = min(_timed(model, inputs[:1]) for _ in range(repeats))
+    model.predict(inputs, verbose=0)
+    batched = min(_timed(model, inputs) for _ in range(repeats)) / len(inputs)
+    return single * 1000, batched * 1000
+
+
+def _timed(model, inputs):
+    start = time.perf_counter()
+    model.predict(inputs, verbose=0)
+    return time.perf_counter() - start
+
+
+def evaluate(name, model, path, inputs, expected):
+    """
+    Accuracy delta, size and latency of one export against the Keras scores
+    """
+    scores = model.predict(inputs, verbose=0)[:, 0]
+    errors = np.abs(scores - expected)
+    levels = np.minimum((scores * N_RISK_LEVELS).astype(int), N_RISK_LEVELS - 1)
+    expected_levels = np.minimum((expected * N_RISK_LEVELS).astype(int), N_RISK_LEVELS - 1)
+    single_ms, batched_ms = per_sample_latency_ms(model, inputs)
+    return {
+        "variant": name,
+        "path": path,
+        "size_kb": round(os.path.getsize(path) / 1024, 1) if path else None,
+        "max_error": float(errors.max()),
+        "mean_error": float(errors.mean()),
+        "level_agreement": float((levels == expected_levels).mean()),
+        "latency_single_ms": round(single_ms, 3),
+        "latency_batched_ms": round(batched_ms, 3)
+    }
+
+
+def install_export(result, temporary, output_path, max_error):
+    """
+    Move a checked export from its temporary file into place if it is within
+    max_error of the Keras scores; otherwise the existing file is left as is
+
+    Returns:
+        The result, with "installed" set and "path" pointing at the served file
+    """
+    result["installed"] = result["max_error"] <= max_error
+    if result["installed"]:
+        os.replace(temporary, output_path)
+        result["path"] = output_path
+    else:
+        result["path"] = None
+        print(f"  max error {result['max_error']:.2e} exceeds {max_error}, {output_path} left unchanged")
+    return result
+
+
+def print_report(results):
+    print(f"\n{'variant':<16} {'size KB':>10} {'max err':>10} {'mean err':>10} {'levels':>8} "
+          f"{'1 x ms':>9} {'batch ms':>9} {'installed':>10}")
+    for r in results:
+        size = f"{r['size_kb']:.1f}" if r["size_kb"] is not None else "-"
+        installed = {True: "yes", False: "no"}.get(r.get("installed"), "-")
+        print(f"{r['variant']:<16} {size:>10} {r['max_error']:>10.2e} {r['mean_error']:>10.2e} "
+              f"{r['level_agreement']:>8.1%} {r['latency_single_ms']:>9.2f} {r['latency_batched_ms']:>9.2f} "
+              f"{installed:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the CNN to TFLite and ONNX and compare the variants")
+    parser.add_argument("--variants", default=",".join(TFLITE_VARIANTS),
+                        help="Comma-separated TFLite variants to export")
+    parser.add_argument("--skip-onnx", action="store_true", help="Do not attempt the ONNX export")
+    parser.add_argument("--calibration-samples", type=int, default=200,
+                        help="Heatmaps used to calibrate int8 quantization")
+    parser.add_argument("--validation-samples", type=int, default=256,
+                        help="Heatmaps used to measure the accuracy delta")
+    parser.add_argument("--max-error", type=float, default=0.01,
+                        help="Largest score difference from Keras for an export to be installed")
+    parser.add_argument("--report", default=None, help="Optional path for a JSON copy of the report")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("EXPORTING WILDFIRE CNN TO TFLITE / ONNX")
+    print("=" * 50)
+
+    model, variant, path = _load_model_variant()
+    if model is None:
+        raise SystemExit("No CNN model available to export. Copy the trained .h5 into models/ first.")
+    print(f"Exporting {variant} model from {path}")
+
+    calibration = weather_heatmaps(args.calibration_samples, seed=1)
+    validation = weather_heatmaps(args.validation_samples, seed=2)
+    expected = model.predict(validation, verbose=0)[:, 0]
+    results = [evaluate("keras", model, path, validation, expected)]
+
+    with tempfile.TemporaryDirectory() as saved_model_dir:
+        # Keras 3 models convert reliably only through a SavedModel export
+        model.export(saved_model_dir)
+        for name in filter(None, (v.strip() for v in args.variants.split(","))):
+            print(f"Converting TFLite {name}...")
+            output_path = TFLITE_MODEL_PATHS[name]
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            # Check each export before it replaces the file a running server reloads
+            temporary = f"{output_path}.{os.getpid()}.tmp"
+            try:
+                with open(temporary, "wb") as f:
+                    f.write(convert_tflite(saved_model_dir, name, calibration if name == "int8" else None))
+                result = evaluate(f"tflite-{name}", TFLiteModel(temporary), temporary, validation, expected)
+                results.append(install_export(result, temporary, output_path, args.max_error))
+            finally:
+                if os.path.exists(temporary):
+                    os.remove(temporary)
+
+    if not args.skip_onnx:
+        print("Converting ONNX...")
+        os.makedirs(os.path.dirname(ONNX_MODEL_PATH), exist_ok=True)
+        temporary = f"{ONNX_MODEL_PATH}.{os.getpid()}.tmp"
+        try:
+            if convert_onnx(model, temporary):
+                try:
+                    result = evaluate("onnx", OnnxModel(temporary), temporary, validation, expected)
+                    results.append(install_export(result, temporary, ONNX_MODEL_PATH, args.max_error))
+                except ImportError:
+                    print("  onnxruntime is not installed, so the ONNX model could not be checked or installed")
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+
+    print_report(results)
+
+    candidates = [r for r in results[1:] if r["installed"]]
+    print("\n" + "=" * 50)
+    if candidates:
+        best = min(candidates, key=lambda r: (r["latency_batched_ms"], r["size_kb"]))
+        backend, _, tflite_variant = best["variant"].partition("-")
+        setting = f"INFERENCE_BACKEND={backend}" + (f" TFLITE_VARIANT={tflite_variant}" if tflite_variant else "")
+        print(f"Fastest variant within max error {args.max_error}: {best['variant']} ({setting})")
+    else:
+        print(f"No exported variant is within max error {args.max_error}; keep INFERENCE_BACKEND=keras")
+    print("=" * 50)
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Report written to {args.report}")
+
+    rejected = [r["variant"] for r in results[1:] if not r["installed"]]
+    if rejected:
+        raise SystemExit(f"Not installed, max error above {args.max_error}: {', '.join(rejected)}")
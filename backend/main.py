@@ -1,21 +1,63 @@
+import time
+_import_started = time.perf_counter()
+
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 import uvicorn
 import os
 import sys
 import logging
+from contextlib import asynccontextmanager
 from typing import Dict, Any, List, Optional
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+from app.services.metrics import metrics_registry
+from app.services.model_service import model_registry
+from app.services.inference_executor import inference_executor
+from app.services.drift_monitor import drift_monitor
+from app.services.model_watcher import model_watcher
+from app.services.prediction_log import prediction_log
+from app.services.profiling import ProfilingMiddleware
+from app.services.weather_service import weather_client
+
+# How the model is loaded at startup: "background" serves liveness and
+# non-model routes immediately while the model loads in a thread, "blocking"
+# finishes loading before accepting requests, "lazy" waits for the first prediction
+MODEL_STARTUP = (os.getenv("MODEL_STARTUP") or "background").lower()
+# Without any model file the API still serves adjusted scores and mock CNN
+# scores, so by default "unavailable" counts as ready; set to false to keep
+# such instances out of rotation until a model is deployed
+READY_WITHOUT_MODEL = (os.getenv("READY_WITHOUT_MODEL") or "true").lower() == "true"
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load and warm up the CNN once so every request shares the same instance
+    if MODEL_STARTUP == "blocking":
+        model_registry.load()
+    elif MODEL_STARTUP == "background":
+        model_registry.load_in_background()
+    logger.info(f"App imported in {app_import_seconds:.3f}s, model startup mode: {MODEL_STARTUP}")
+    # Hot-swap the model when its files change on disk
+    model_watcher.start()
+    prediction_log.start()
+    yield
+    model_watcher.stop()
+    drift_monitor.shutdown()
+    inference_executor.shutdown()
+    prediction_log.stop()
+    await weather_client.aclose()
+
 # Create FastAPI app
 app = FastAPI(
     title="Wildfire Risk Prediction API",
     description="API for predicting wildfire risk based on weather data and other factors",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -35,7 +77,10 @@ app.add_middleware(
 )
 
 # Import routers
-from app.routers import prediction, weather
+from app.routers import admin, locations, prediction, tiles, weather
+
+# Profile individual requests that send X-Profile: 1 with the admin token
+app.add_middleware(ProfilingMiddleware, authorize=admin.is_admin_token)
 
 # Health check endpoint
 @app.get("/health", tags=["Health"])
@@ -44,13 +89,35 @@ def health_check():
     return {
         "status": "healthy",
         "version": app.version,
+        "model": model_registry.info(),
         "environment": "production" if not os.getenv("DEBUG", "False").lower() == "true" else "development"
     }
 
+# Readiness probe, separate from the /health liveness check
+@app.get("/ready", tags=["Health"])
+def readiness_check():
+    """Report whether the API can serve predictions, with the model state and startup-time breakdown"""
+    state = model_registry.state
+    ready = state == "ready" or (state == "unavailable" and READY_WITHOUT_MODEL)
+    body = {
+        "ready": ready,
+        "state": state,
+        "startup": {"app_import_seconds": round(app_import_seconds, 3), **model_registry.startup}
+    }
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint with per-stage latencies, prediction counts and queue gauges"""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # API version prefix
 api_prefix = "/api/v1"
 app.include_router(prediction.router, prefix=api_prefix, tags=["Prediction"])
 app.include_router(weather.router, prefix=api_prefix, tags=["Weather"])
+app.include_router(tiles.router, prefix=api_prefix, tags=["Tiles"])
+app.include_router(locations.router, prefix=api_prefix, tags=["Locations"])
+app.include_router(admin.router, prefix=api_prefix, tags=["Admin"])
 
 # Include routers
 app.include_router(prediction.router, prefix="/api", tags=["prediction"])
@@ -64,5 +131,8 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+# Time from the top of this module until every route is registered
+app_import_seconds = time.perf_counter() - _import_started
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
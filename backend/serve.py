@@ -0,0 +1,290 @@
+"""
+Production entry point: a pre-fork master serving main:app from several workers.
+
+The master binds the listening socket, optionally loads the model, and forks
+the workers, which then share the read-only weight pages copy-on-write
+instead of each holding a private copy. Only backends that start no
+threads while loading (numpy, surrogate) are preloaded. TensorFlow runtimes
+do not survive fork(), so keras and tflite models are loaded by each worker
+after the fork.
+
+Signals sent to the master:
+    SIGTERM / SIGINT  graceful shutdown (workers finish in-flight requests)
+    SIGHUP            graceful restart: new workers are started, then the old
+                      ones are told to drain and exit
+Workers that die unexpectedly are respawned, with exponential backoff for a
+worker slot whose workers keep dying soon after starting. The master exits
+with status 1 once a slot has had `max_quick_deaths` such deaths in a row.
+"""
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+
+# Backends whose loaded model is plain NumPy arrays and can be shared across fork()
+FORK_SAFE_BACKENDS = ("numpy", "surrogate")
+# Default worker count for the other backends, where each worker holds its own
+# runtime and model (about 670 MB RSS per keras worker)
+MAX_DEFAULT_UNSHARED_WORKERS = 2
+# A worker that exits sooner than this after being started counts as a quick death
+QUICK_DEATH_SECONDS = 10.0
+
+logger = logging.getLogger("serve")
+
+
+def pin_threads(threads):
+    """
+    Limit each worker's math-library thread pools so N workers do not
+    oversubscribe the CPUs. Values already set in the environment win.
+    Must run before NumPy or TensorFlow are imported.
+    """
+    for name in ("TF_NUM_INTRAOP_THREADS", "OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS",
+                 "MKL_NUM_THREADS", "INFERENCE_NUM_THREADS"):
+        os.environ.setdefault(name, str(threads))
+    os.environ.setdefault("TF_NUM_INTEROP_THREADS", "1")
+
+
+def default_workers(backend=None):
+    """
+    WEB_CONCURRENCY if set, otherwise one worker per CPU for the fork-safe
+    backends and at most MAX_DEFAULT_UNSHARED_WORKERS for the others
+    """
+    configured = int(os.getenv("WEB_CONCURRENCY") or 0)
+    if configured:
+        return configured
+    cpus = os.cpu_count() or 1
+    backend = (backend or os.getenv("INFERENCE_BACKEND") or "keras").lower()
+    if backend in FORK_SAFE_BACKENDS:
+        return cpus
+    return min(cpus, MAX_DEFAULT_UNSHARED_WORKERS)
+
+
+def bind_socket(host, port, backlog=2048):
+    """
+    Create the listening socket shared by every worker
+    """
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class Master:
+    """
+    Forks and supervises uvicorn workers accepting on one shared socket
+    """
+
+    def __init__(self, app, sock, workers, graceful_timeout=30.0, log_level="info", max_quick_deaths=5,
+                 respawn_backoff=0.5, max_respawn_backoff=30.0):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.graceful_timeout = graceful_timeout
+        self.log_level = log_level
+        self.max_quick_deaths = max_quick_deaths
+        self.respawn_backoff = respawn_backoff
+        self.max_respawn_backoff = max_respawn_backoff
+        # Live workers as pid -> (slot, start time)
+        self.pids = {}
+        self.retiring = set()
+        # Per slot: quick deaths in a row, and when it may be respawned
+        self.quick_deaths = [0] * workers
+        self.respawn_at = [0.0] * workers
+        self.exit_code = 0
+        self._stopping = False
+        self._restart_requested = False
+
+    def spawn(self, slot):
+        pid = os.fork()
+        if pid == 0:
+            self._run_worker()
+        self.pids[pid] = (slot, time.monotonic())
+        logger.info(f"Started worker {pid}")
+        return pid
+
+    def _run_worker(self):
+        # Child process: drop the master's handlers and let uvicorn install its own
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+            signal.signal(sig, signal.SIG_DFL)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        exit_code = 0
+        try:
+            import uvicorn
+
+            config = uvicorn.Config(self.app, log_level=self.log_level, lifespan="on")
+            uvicorn.Server(config).run(sockets=[self.sock])
+        except Exception:
+            logger.exception(f"Worker {os.getpid()} crashed")
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    def _on_stop(self, signum, frame):
+        self._stopping = True
+
+    def _on_restart(self, signum, frame):
+        self._restart_requested = True
+
+    def _reap(self):
+        # Collect exited workers without blocking
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            if pid in self.retiring:
+                self.retiring.discard(pid)
+                logger.info(f"Worker {pid} drained and exited")
+            elif pid in self.pids:
+                slot, started = self.pids.pop(pid)
+                if not self._stopping:
+                    uptime = time.monotonic() - started
+                    delay = self._schedule_respawn(slot, uptime)
+                    logger.warning(f"Worker {pid} exited unexpectedly with status {status} after "
+                                   f"{uptime:.1f}s, respawning in {delay:.1f}s")
+
+    def _schedule_respawn(self, slot, uptime):
+        # A worker that ran for a while is replaced at once; one that died
+        # while starting waits twice as long as the previous attempt
+        if uptime >= QUICK_DEATH_SECONDS:
+            self.quick_deaths[slot] = 0
+            delay = 0.0
+        else:
+            self.quick_deaths[slot] += 1
+            delay = min(self.max_respawn_backoff, self.respawn_backoff * 2 ** (self.quick_deaths[slot] - 1))
+        self.respawn_at[slot] = time.monotonic() + delay
+        if self.max_quick_deaths and self.quick_deaths[slot] >= self.max_quick_deaths:
+            logger.error(f"Workers died within {QUICK_DEATH_SECONDS:.0f}s of starting "
+                         f"{self.quick_deaths[slot]} times in a row, shutting down")
+            self.exit_code = 1
+            self._stopping = True
+        return delay
+
+    def _respawn(self):
+        # Replace workers that crashed or were killed once their slot's backoff has passed
+        occupied = {slot for slot, _ in self.pids.values()}
+        now = time.monotonic()
+        for slot in range(self.workers):
+            if slot not in occupied and now >= self.respawn_at[slot] and not self._stopping:
+                self.spawn(slot)
+
+    def _terminate(self, pids):
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def restart(self):
+        """
+        Replace every worker: start the new ones first so the socket keeps
+        being served, then drain the old ones
+        """
+        old = set(self.pids)
+        logger.info(f"Restarting {len(old)} workers")
+        self.pids.clear()
+        self.retiring |= old
+        for slot in range(self.workers):
+            self.spawn(slot)
+        self._terminate(old)
+
+    def stop(self):
+        """
+        Ask workers to finish in-flight requests, killing any that outlive the timeout
+        """
+        self.retiring.update(self.pids)
+        self.pids.clear()
+        self._terminate(self.retiring)
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.retiring and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.05)
+        for pid in self.retiring:
+            logger.warning(f"Worker {pid} did not stop in {self.graceful_timeout}s, killing it")
+            os.kill(pid, signal.SIGKILL)
+        while self.retiring:
+            pid, _ = os.waitpid(-1, 0)
+            self.retiring.discard(pid)
+
+    def run(self):
+        """
+        Serve until SIGTERM / SIGINT or a crash loop, returning the exit status
+        """
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_restart)
+        for slot in range(self.workers):
+            self.spawn(slot)
+
+        while not self._stopping:
+            if self._restart_requested:
+                self._restart_requested = False
+                self.restart()
+            self._reap()
+            self._respawn()
+            time.sleep(0.2)
+
+        logger.info("Shutting down workers")
+        self.stop()
+        self.sock.close()
+        return self.exit_code
+
+
+def preload_model():
+    """
+    Load the model in the master when the backend is safe to share across fork()
+    """
+    from app.services.model_service import model_registry
+
+    if model_registry.backend not in FORK_SAFE_BACKENDS:
+        logger.info(f"Backend '{model_registry.backend}' is not fork-safe, workers load their own model")
+        return False
+    model_registry.load()
+    # Move everything allocated so far out of the collector's reach so
+    # collections in the workers do not write to (and copy) the shared pages
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Preloaded {model_registry.backend} model in the master: {model_registry.info()['startup']}")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the API from a pre-fork pool of uvicorn workers")
+    parser.add_argument("--host", default=os.getenv("API_HOST") or "0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT") or os.getenv("API_PORT") or 8000))
+    parser.add_argument("--workers", type=int, default=default_workers(),
+                        help="Worker processes (default: WEB_CONCURRENCY, else one per CPU for numpy and "
+                             f"surrogate and at most {MAX_DEFAULT_UNSHARED_WORKERS} for other backends)")
+    parser.add_argument("--threads-per-worker", type=int, default=0,
+                        help="Math-library threads per worker (default: CPUs / workers)")
+    parser.add_argument("--no-preload", action="store_true", help="Load the model in each worker instead")
+    parser.add_argument("--graceful-timeout", type=float, default=30.0,
+                        help="Seconds workers get to finish in-flight requests on shutdown or restart")
+    parser.add_argument("--max-quick-deaths", type=int, default=5,
+                        help=f"Exit after a worker slot dies this many times in a row within "
+                             f"{QUICK_DEATH_SECONDS:.0f}s of starting (0 never exits)")
+    parser.add_argument("--log-level", default=(os.getenv("LOG_LEVEL") or "info").lower())
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s [%(process)d] %(levelname)s %(message)s")
+    threads = args.threads_per_worker or max(1, (os.cpu_count() or 1) // args.workers)
+    pin_threads(threads)
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from main import app
+
+    if not args.no_preload:
+        preload_model()
+
+    sock = bind_socket(args.host, args.port)
+    logger.info(f"Listening on {args.host}:{args.port} with {args.workers} workers, {threads} threads each")
+    sys.exit(Master(app, sock, args.workers, args.graceful_timeout, args.log_level, args.max_quick_deaths).run())
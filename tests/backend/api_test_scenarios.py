@@ -57,40 +57,47 @@ test_cases = [
     }
 ]
 
-# Run the test cases
-print("Running API Test Cases...\n")
-print("=" * 60)
+def run_scenarios():
+    """
+    Send each scenario once and print the response
+    """
+    print("Running API Test Cases...\n")
+    print("=" * 60)
 
-for i, test_case in enumerate(test_cases):
-    print(f"\nTest Case {i+1}: {test_case['name']}")
-    print("-" * 60)
+    for i, test_case in enumerate(test_cases):
+        print(f"\nTest Case {i+1}: {test_case['name']}")
+        print("-" * 60)
     
-    try:
-        # Make the API request
-        start_time = time.time()
-        response = requests.post(API_URL, json=test_case['data'])
-        end_time = time.time()
+        try:
+            # Make the API request
+            start_time = time.time()
+            response = requests.post(API_URL, json=test_case['data'])
+            end_time = time.time()
         
-        # Print the results
-        print(f"Status Code: {response.status_code}")
-        print(f"Response Time: {(end_time - start_time)*1000:.2f} ms")
+            # Print the results
+            print(f"Status Code: {response.status_code}")
+            print(f"Response Time: {(end_time - start_time)*1000:.2f} ms")
         
-        if response.status_code == 200:
-            result = response.json()
-            print(f"Risk Level: {result['risk_level']}")
-            print(f"Risk Score: {result['risk_score']:.4f}")
-            print(f"Confidence: {result['confidence']}")
-            print("\nRecommendations:")
-            for rec in result['recommendations']:
-                print(f"- {rec}")
-        else:
-            print(f"Error: {response.text}")
+            if response.status_code == 200:
+                result = response.json()
+                print(f"Risk Level: {result['risk_level']}")
+                print(f"Risk Score: {result['risk_score']:.4f}")
+                print(f"Confidence: {result['confidence']}")
+                print("\nRecommendations:")
+                for rec in result['recommendations']:
+                    print(f"- {rec}")
+            else:
+                print(f"Error: {response.text}")
             
-    except Exception as e:
-        print(f"Exception: {str(e)}")
+        except Exception as e:
+            print(f"Exception: {str(e)}")
     
-    print("-" * 60)
-    print("")
+        print("-" * 60)
+        print("")
 
-print("=" * 60)
-print("\nTest completed.")
+    print("=" * 60)
+    print("\nTest completed.")
+
+
+if __name__ == "__main__":
+    run_scenarios()
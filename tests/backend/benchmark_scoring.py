@@ -0,0 +1,253 @@
+"""
+Microbenchmarks for the scoring pipeline.
+
+Times preprocess_features (single and batched), mock_prediction, the adjusted
+scoring path and, for every inference backend whose model files are present,
+model load time, single-sample and batched inference and the full
+predict_risk call.
+
+Record a baseline, then compare later runs against it:
+
+    python tests/backend/benchmark_scoring.py --output baseline.json
+    python tests/backend/benchmark_scoring.py --compare baseline.json --threshold 15
+
+The comparison exits with status 1 when any benchmark got slower than the
+baseline by more than the threshold percentage. It compares the best of the
+timing repeats by default, which is less sensitive to noise from other
+processes than the median (--metric median).
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+import timeit
+
+import numpy as np
+
+# Add the backend directory to the path so we can import from app
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "backend"))
+
+from app.services import model_service
+from app.services.model_service import (
+    BACKEND_LOADERS,
+    ModelRegistry,
+    build_features,
+    load_inference_model,
+    mock_prediction,
+    predict_risk,
+    preprocess_features,
+    preprocess_features_batch
+)
+
+# A warm, dry and windy afternoon; the coordinates do not affect the score
+SAMPLE = dict(latitude=37.7749, longitude=-122.4194, temperature=32.5, humidity=45.0, wind_speed=15.0,
+              precipitation=0.0, vegetation_density=0.7, elevation=350.0, drought_index=0.8)
+BATCH_SIZE = 64
+
+
+def weather_features(n_samples, seed=0):
+    """
+    (N, 7) feature matrix of random but realistic inputs
+    """
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.uniform(0, 50, n_samples),     # temperature
+        rng.uniform(0, 100, n_samples),    # humidity
+        rng.uniform(0, 60, n_samples),     # wind speed
+        rng.exponential(3, n_samples),     # precipitation
+        rng.uniform(0, 1, n_samples),      # vegetation density
+        rng.uniform(0, 3000, n_samples),   # elevation
+        rng.uniform(0, 1, n_samples)       # drought index
+    ])
+
+
+def measure(fn, repeats=5, min_seconds=0.2):
+    """
+    Time fn() with timeit, looping enough that each repeat takes at least
+    min_seconds, and return per-call statistics in microseconds
+    """
+    timer = timeit.Timer(fn)
+    loops = 1
+    while True:
+        if timer.timeit(loops) >= min_seconds or loops >= 1_000_000:
+            break
+        loops *= 10
+    samples = [seconds / loops * 1e6 for seconds in timer.repeat(repeat=repeats, number=loops)]
+    return {
+        "median_us": statistics.median(samples),
+        "best_us": min(samples),
+        "loops": loops,
+        "repeats": repeats
+    }
+
+
+def measure_once(fn, repeats=3):
+    """
+    Time a slow one-shot operation such as loading a model
+    """
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    return {"median_us": statistics.median(samples), "best_us": min(samples), "loops": 1, "repeats": repeats}
+
+
+def pipeline_benchmarks():
+    """
+    Benchmarks that do not depend on the inference backend
+    """
+    features = build_features(*(SAMPLE[name] for name in (
+        "temperature", "humidity", "wind_speed", "precipitation", "vegetation_density", "elevation", "drought_index")))
+    batch = weather_features(BATCH_SIZE)
+    return {
+        "preprocess_features": lambda: preprocess_features(features, (SAMPLE["latitude"], SAMPLE["longitude"])),
+        f"preprocess_features_batch[{BATCH_SIZE}]": lambda: preprocess_features_batch(batch),
+        "mock_prediction": lambda: mock_prediction(features),
+        "predict_risk[adjusted]": lambda: predict_risk(**SAMPLE, model_mode="adjusted")
+    }
+
+
+def backend_benchmarks(backend, load_repeats):
+    """
+    Benchmarks for one inference backend, or None if its model is not available
+    """
+    model, _, _ = load_inference_model(backend)
+    if model is None:
+        return None
+    results = {f"{backend}/model_load": measure_once(lambda: load_inference_model(backend), load_repeats)}
+
+    # Serve through a registry so wrappers such as the row-invariant fast path apply
+    registry = ModelRegistry(backend=backend)
+    registry.load()
+    single = preprocess_features_batch(weather_features(1, seed=1))
+    batch = preprocess_features_batch(weather_features(BATCH_SIZE, seed=2))
+    return results, {
+        f"{backend}/inference[1]": lambda: registry.model.predict(single, verbose=0),
+        f"{backend}/inference[{BATCH_SIZE}]": lambda: registry.model.predict(batch, verbose=0),
+        f"{backend}/predict_risk[full]": lambda: _predict_with(registry)
+    }
+
+
+def _predict_with(registry):
+    # predict_risk reads the module-level registry
+    previous, model_service.model_registry = model_service.model_registry, registry
+    try:
+        return predict_risk(**SAMPLE, model_mode="full")
+    finally:
+        model_service.model_registry = previous
+
+
+def run(backends, name_filter=None, repeats=5, min_seconds=0.2, load_repeats=3):
+    """
+    Run every selected benchmark and return {name: statistics}
+    """
+    results = {}
+
+    def run_one(name, fn):
+        if name_filter and name_filter not in name:
+            return
+        results[name] = measure(fn, repeats, min_seconds)
+        print(f"  {name:<40} {results[name]['median_us']:>12.2f} us")
+
+    for name, fn in pipeline_benchmarks().items():
+        run_one(name, fn)
+
+    for backend in backends:
+        benchmarks = backend_benchmarks(backend, load_repeats)
+        if benchmarks is None:
+            print(f"  {backend}: model not available, skipped")
+            continue
+        load_results, timed = benchmarks
+        for name, stats in load_results.items():
+            if not name_filter or name_filter in name:
+                results[name] = stats
+                print(f"  {name:<40} {stats['median_us']:>12.2f} us")
+        for name, fn in timed.items():
+            run_one(name, fn)
+    return results
+
+
+def compare(results, baseline, threshold, metric="best_us"):
+    """
+    Compare per-call times against a baseline
+
+    Returns:
+        List of benchmark names that are slower than the baseline by more than
+        threshold percent
+    """
+    regressions = []
+    print(f"\n{'benchmark':<40} {'baseline us':>12} {'current us':>12} {'change':>9}")
+    for name, stats in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            print(f"{name:<40} {'-':>12} {stats[metric]:>12.2f} {'new':>9}")
+            continue
+        change = (stats[metric] / reference[metric] - 1.0) * 100
+        regressed = change > threshold
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<40} {reference[metric]:>12.2f} {stats[metric]:>12.2f} "
+              f"{change:>+8.1f}%{'  REGRESSION' if regressed else ''}")
+    for name in baseline:
+        if name not in results:
+            print(f"{name:<40} {baseline[name][metric]:>12.2f} {'-':>12} {'missing':>9}")
+    return regressions
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scoring pipeline and compare against a baseline")
+    parser.add_argument("--backends", default=",".join(BACKEND_LOADERS),
+                        help="Comma-separated inference backends to benchmark when their models are present")
+    parser.add_argument("--filter", default=None, help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--repeats", type=int, default=5, help="Timing repeats per benchmark")
+    parser.add_argument("--min-seconds", type=float, default=0.2, help="Minimum duration of each repeat")
+    parser.add_argument("--output", default=None, help="Write the results as a JSON baseline")
+    parser.add_argument("--compare", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Allowed slowdown of a benchmark, in percent")
+    parser.add_argument("--metric", choices=("best", "median"), default="best",
+                        help="Per-call time compared against the baseline")
+    args = parser.parse_args()
+
+    # Keep model-loading chatter and prediction records out of the timings
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger("app.predictions").disabled = True
+
+    print("=" * 60)
+    print("SCORING PIPELINE BENCHMARKS")
+    print("=" * 60)
+    results = run([b.strip() for b in args.backends.split(",") if b.strip()], args.filter,
+                  args.repeats, args.min_seconds)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("environment", {}).get("platform") != platform.platform():
+            print(f"\nNote: baseline was recorded on {baseline.get('environment', {}).get('platform')}")
+        regressions = compare(results, baseline["results"], args.threshold, f"{args.metric}_us")
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold}%: "
+                  f"{', '.join(regressions)}")
+            sys.exit(1)
+        print(f"\nNo benchmark regressed by more than {args.threshold}%")
@@ -0,0 +1,246 @@
+"""
+Load generator for the prediction API.
+
+Replays the scenarios from api_test_scenarios.py mixed with randomized
+realistic inputs, either in-process against main.app (no server needed) or
+against a running server with --url. Two modes:
+
+    closed loop: a fixed number of virtual users send requests back to back
+        python tests/backend/load_test.py --concurrency 32 --duration 30
+
+    open loop: requests are scheduled at a target rate, whatever the latency
+        python tests/backend/load_test.py --rps 200 --duration 30 --url http://localhost:8000
+
+In open-loop mode each request's latency is measured from the time it was
+scheduled to start, not from when it was actually sent. Time a request spent
+waiting for a free connection slot therefore counts against the server. This
+is the coordinated-omission correction. The report shows both that corrected
+latency and the raw service time.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import sys
+import time
+from collections import Counter
+
+import httpx
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from api_test_scenarios import test_cases
+
+PERCENTILES = (50, 90, 95, 99, 99.9)
+# Upper bounds in milliseconds of the latency histogram buckets
+HISTOGRAM_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+# Returned by LoadTest._next_request once the duration or request budget is used up
+_DONE = object()
+
+
+def random_inputs(rng):
+    """
+    A plausible prediction request somewhere in the western US
+    """
+    return {
+        "latitude": round(float(rng.uniform(32.0, 49.0)), 4),
+        "longitude": round(float(rng.uniform(-124.0, -104.0)), 4),
+        "temperature": round(float(rng.uniform(-5.0, 45.0)), 1),
+        "humidity": round(float(rng.uniform(5.0, 100.0)), 1),
+        "wind_speed": round(float(rng.gamma(2.0, 6.0)), 1),
+        "precipitation": round(float(rng.exponential(2.0)) if rng.random() < 0.3 else 0.0, 1),
+        "vegetation_density": round(float(rng.uniform(0.0, 1.0)), 2)
+    }
+
+
+def payloads(random_fraction=0.5, seed=0):
+    """
+    Endless stream of request bodies: the fixed scenarios interleaved with
+    random inputs (which, unlike the scenarios, miss the prediction cache)
+    """
+    rng = np.random.default_rng(seed)
+    scenarios = itertools.cycle([case["data"] for case in test_cases])
+    while True:
+        yield random_inputs(rng) if rng.random() < random_fraction else next(scenarios)
+
+
+def latency_summary(latencies_ms):
+    """
+    Percentiles, max and bucket counts of a list of latencies in milliseconds
+    """
+    if not latencies_ms:
+        return {"count": 0}
+    values = np.asarray(latencies_ms)
+    edges = list(HISTOGRAM_BUCKETS_MS) + [math.inf]
+    counts = np.histogram(values, bins=[0.0] + edges)[0]
+    return {
+        "count": len(values),
+        "mean_ms": float(values.mean()),
+        **{f"p{p:g}_ms": float(np.percentile(values, p)) for p in PERCENTILES},
+        "max_ms": float(values.max()),
+        "histogram": {("+Inf" if bound == math.inf else f"{bound:g}"): int(count)
+                      for bound, count in zip(edges, counts)}
+    }
+
+
+class LoadTest:
+    """
+    Drives requests at a client from a pool of virtual users.
+
+    With rps set, request i is scheduled for start + i / rps and the first
+    free user sends it (open loop, with concurrency capping the requests in
+    flight). Without it, every user sends its next request as soon as the
+    previous one finished (closed loop).
+    """
+
+    def __init__(self, client, path="/api/v1/predict", concurrency=16, rps=None, duration=10.0,
+                 max_requests=None, params=None, random_fraction=0.5, seed=0):
+        self.client = client
+        self.path = path
+        self.concurrency = concurrency
+        self.rps = rps
+        self.duration = duration
+        self.max_requests = max_requests
+        self.params = params or {}
+        self.payloads = payloads(random_fraction, seed)
+        self.statuses = Counter()
+        self.service_ms = []
+        self.corrected_ms = []
+        self._slots = itertools.count()
+
+    def _next_request(self, started):
+        # Scheduled start of the next request (None in closed loop). Slots are
+        # handed out in order, so scheduled times never go backwards.
+        index = next(self._slots)
+        if self.max_requests is not None and index >= self.max_requests:
+            return _DONE
+        if self.rps:
+            scheduled = started + index / self.rps
+            return _DONE if scheduled - started >= self.duration else scheduled
+        return _DONE if time.perf_counter() - started >= self.duration else None
+
+    async def _user(self, started):
+        while True:
+            scheduled = self._next_request(started)
+            if scheduled is _DONE:
+                return
+            if scheduled is not None:
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            sent = time.perf_counter()
+            try:
+                response = await self.client.post(self.path, json=next(self.payloads), params=self.params)
+                status = response.status_code
+            except Exception as e:
+                status = type(e).__name__
+            finished = time.perf_counter()
+            self.statuses[status] += 1
+            self.service_ms.append((finished - sent) * 1000)
+            self.corrected_ms.append((finished - (scheduled if scheduled is not None else sent)) * 1000)
+
+    async def run(self):
+        """
+        Run the test and return the report
+        """
+        started = time.perf_counter()
+        await asyncio.gather(*(self._user(started) for _ in range(self.concurrency)))
+        return self.report(time.perf_counter() - started)
+
+    def report(self, elapsed):
+        total = sum(self.statuses.values())
+        ok = sum(count for status, count in self.statuses.items() if isinstance(status, int) and status < 400)
+        return {
+            "mode": "open" if self.rps else "closed",
+            "target_rps": self.rps,
+            "concurrency": self.concurrency,
+            "elapsed_seconds": elapsed,
+            "requests": total,
+            "throughput_rps": total / elapsed if elapsed else 0.0,
+            "success_rps": ok / elapsed if elapsed else 0.0,
+            "error_rate": (total - ok) / total if total else 0.0,
+            "rate_limited_rate": self.statuses.get(429, 0) / total if total else 0.0,
+            "overloaded_rate": self.statuses.get(503, 0) / total if total else 0.0,
+            "status_counts": {str(status): count for status, count in sorted(self.statuses.items(), key=str)},
+            "latency": latency_summary(self.corrected_ms),
+            "service_time": latency_summary(self.service_ms)
+        }
+
+
+def print_report(report):
+    print(f"\nMode: {report['mode']} loop, concurrency {report['concurrency']}"
+          + (f", target {report['target_rps']:g} req/s" if report["target_rps"] else ""))
+    print(f"Requests: {report['requests']} in {report['elapsed_seconds']:.2f}s "
+          f"({report['throughput_rps']:.1f} req/s, {report['success_rps']:.1f} successful)")
+    print(f"Errors: {report['error_rate']:.2%}  429: {report['rate_limited_rate']:.2%}  "
+          f"503: {report['overloaded_rate']:.2%}  statuses: {report['status_counts']}")
+    columns = ["mean"] + [f"p{p:g}" for p in PERCENTILES] + ["max"]
+    print(f"\n{'latency ms':<24}" + "".join(f"{name:>10}" for name in columns))
+    for label, key in (("corrected", "latency"), ("service time", "service_time")):
+        summary = report[key]
+        if not summary["count"]:
+            continue
+        print(f"{label:<24}" + "".join(f"{summary[f'{name}_ms']:>10.2f}" for name in columns))
+    print("\nCorrected latency histogram (ms):")
+    histogram = report["latency"].get("histogram", {})
+    peak = max(histogram.values(), default=0) or 1
+    for bound, count in histogram.items():
+        print(f"  <= {bound:>6} {count:>8} {'#' * round(40 * count / peak)}")
+
+
+async def run_load_test(args):
+    params = {"model_mode": args.model_mode} if args.model_mode else None
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+            test = LoadTest(client, args.path, args.concurrency, args.rps, args.duration, args.requests,
+                            params, args.random_fraction, args.seed)
+            return await test.run()
+
+    # In-process: the app shares this event loop and CPU with the load generator
+    backend_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                               "backend")
+    sys.path.insert(0, backend_dir)
+    import main as api
+
+    async with api.app.router.lifespan_context(api.app):
+        if args.wait_ready:
+            api.model_registry.load()
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout) as client:
+            test = LoadTest(client, args.path, args.concurrency, args.rps, args.duration, args.requests,
+                            params, args.random_fraction, args.seed)
+            return await test.run()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the prediction API")
+    parser.add_argument("--url", default=None, help="Base URL of a running server (default: in-process app)")
+    parser.add_argument("--path", default="/api/v1/predict")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Virtual users (closed loop) or maximum requests in flight (open loop)")
+    parser.add_argument("--rps", type=float, default=None, help="Target request rate; switches to open loop")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to generate load for")
+    parser.add_argument("--requests", type=int, default=None, help="Stop after this many requests")
+    parser.add_argument("--model-mode", default=None, choices=("full", "adjusted", "deferred"))
+    parser.add_argument("--random-fraction", type=float, default=0.5,
+                        help="Share of requests with random inputs instead of the fixed scenarios")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--no-wait-ready", dest="wait_ready", action="store_false",
+                        help="In-process only: start sending before the model has loaded")
+    parser.add_argument("--output", default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+    if args.concurrency is None:
+        args.concurrency = 256 if args.rps else 16
+
+    report = asyncio.run(run_load_test(args))
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
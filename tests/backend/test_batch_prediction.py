@@ -0,0 +1,99 @@
+"""
+Tests for the columnar batch prediction path.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add the backend directory to the path so we can import from app
+backend_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "backend")
+sys.path.insert(0, backend_dir)
+
+from app.services import model_service
+from app.services.model_service import predict_risk, predict_risk_batch
+
+
+def random_rows(n_rows, seed=7):
+    """Realistic inputs, including edge values and missing optional fields"""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(n_rows):
+        rows.append({
+            "latitude": float(rng.uniform(32, 42)),
+            "longitude": float(rng.uniform(-124, -114)),
+            "temperature": float(rng.choice([rng.uniform(-5, 50), 15.0, 45.0])),
+            "humidity": float(rng.uniform(0, 110)),
+            "wind_speed": float(rng.uniform(0, 60)),
+            "precipitation": float(rng.choice([0.0, rng.uniform(0, 15)])),
+            "vegetation_density": None if i % 3 == 0 else float(rng.uniform(0, 1)),
+            "elevation": None if i % 4 == 0 else float(rng.uniform(0, 2500)),
+            "drought_index": None if i % 5 == 0 else float(rng.uniform(0, 1)),
+        })
+    return rows
+
+
+def to_columns(rows):
+    return {name: [row[name] for row in rows] for name in rows[0]}
+
+
+@pytest.fixture
+def no_model(monkeypatch):
+    """Swap in a registry whose backend finds no model"""
+    monkeypatch.setitem(model_service.BACKEND_LOADERS, "missing", lambda: (None, None, None))
+    monkeypatch.setattr(model_service, "model_registry", model_service.ModelRegistry(backend="missing"))
+
+
+def test_batch_matches_single_predictions_without_model(no_model):
+    """Batch results match predict_risk row for row on the mock path"""
+    rows = random_rows(200)
+
+    batch = predict_risk_batch(**to_columns(rows))
+
+    assert len(batch) == len(rows)
+    for row, result in zip(rows, batch):
+        assert result == predict_risk(**row)
+
+
+def test_batch_matches_single_predictions_with_model():
+    """With a CNN loaded only the model score may differ by float noise"""
+    if model_service.model_registry.get() is None:
+        pytest.skip("No CNN model available")
+    rows = random_rows(20, seed=11)
+
+    batch = predict_risk_batch(**to_columns(rows))
+
+    for row, result in zip(rows, batch):
+        expected = predict_risk(**row)
+        expected_details = expected.pop("model_details")
+        details = result.pop("model_details")
+        assert result == expected
+        assert details["source"] == expected_details["source"] == "cnn_model"
+        assert details["original_score"] == pytest.approx(expected_details["original_score"], abs=1e-5)
+
+
+def test_batch_rejects_ragged_columns():
+    columns = to_columns(random_rows(3))
+    columns["humidity"] = columns["humidity"][:2]
+
+    with pytest.raises(ValueError):
+        predict_risk_batch(**columns)
+
+
+@pytest.mark.parametrize("model_mode", ["adjusted", "deferred"])
+def test_modes_without_cnn_skip_the_model(monkeypatch, model_mode):
+    """Adjusted-only modes never touch the model and match predict_risk"""
+    def fail():
+        raise AssertionError("CNN model should not be used")
+
+    monkeypatch.setattr(model_service.model_registry, "get", fail)
+    monkeypatch.setattr(model_service.model_registry, "acquire", fail)
+    rows = random_rows(10, seed=3)
+
+    batch = predict_risk_batch(**to_columns(rows), model_mode=model_mode)
+
+    for row, result in zip(rows, batch):
+        assert result == predict_risk(**row, model_mode=model_mode)
+        assert result["model_details"]["original_score"] is None
@@ -0,0 +1,169 @@
+"""
+Tests for the CNN micro-batcher and the batched prediction path.
+"""
+
+import asyncio
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add the backend directory to the path so we can import from app
+backend_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "backend")
+sys.path.insert(0, backend_dir)
+
+from app.services import batcher, model_service
+from app.services.batcher import MicroBatcher, predict_risk_batched
+from app.services.model_service import ModelRegistry
+
+
+class FirstPixelModel:
+    """Scores each row with its first pixel, so every row's output is identifiable"""
+
+    def predict(self, inputs, verbose=0):
+        return np.asarray(inputs)[:, 0, 0, :1]
+
+
+class InlineExecutor:
+    """Runs work on the event loop thread and records each batch size"""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.batches = []
+
+    async def run(self, fn, *args, **kwargs):
+        self.batches.append(len(args[0]))
+        if self.error is not None:
+            raise self.error
+        return fn(*args, **kwargs)
+
+
+def make_registry(monkeypatch, model):
+    monkeypatch.setitem(model_service.BACKEND_LOADERS, "fake",
+                        lambda: (model, "fake", None) if model is not None else (None, None, None))
+    monkeypatch.setattr(model_service, "backend_files", lambda backend=None: [])
+    registry = ModelRegistry(img_size=4, backend="fake")
+    registry.load()
+    monkeypatch.setattr(batcher, "model_registry", registry)
+    return registry
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    return make_registry(monkeypatch, FirstPixelModel())
+
+
+def tensor(value):
+    return np.full((1, 4, 4, 3), value, dtype=np.float32)
+
+
+def test_batch_is_flushed_when_the_window_expires(registry):
+    executor = InlineExecutor()
+    micro_batcher = MicroBatcher(window_ms=20, max_batch_size=8, executor=executor)
+
+    async def main():
+        return await asyncio.gather(*[micro_batcher.predict(tensor(v)) for v in (0.1, 0.2, 0.3)])
+
+    results = asyncio.run(main())
+
+    assert executor.batches == [3]
+    assert [score for score, _ in results] == pytest.approx([0.1, 0.2, 0.3])
+    assert {version for _, version in results} == {registry.version}
+
+
+def test_full_batch_is_flushed_without_waiting_for_the_window(registry):
+    executor = InlineExecutor()
+    micro_batcher = MicroBatcher(window_ms=60_000, max_batch_size=2, executor=executor)
+
+    async def main():
+        calls = [micro_batcher.predict(tensor(v)) for v in (0.1, 0.2, 0.3, 0.4)]
+        return await asyncio.wait_for(asyncio.gather(*calls), timeout=5)
+
+    results = asyncio.run(main())
+
+    assert executor.batches == [2, 2]
+    assert micro_batcher._flush_handle is None
+    assert [score for score, _ in results] == pytest.approx([0.1, 0.2, 0.3, 0.4])
+
+
+def test_each_caller_gets_its_own_row(registry):
+    micro_batcher = MicroBatcher(window_ms=20, max_batch_size=64, executor=InlineExecutor())
+    values = np.linspace(0.0, 1.0, 17)
+
+    async def main():
+        async def call(value):
+            # Stagger arrival so callers do not enqueue in task creation order
+            await asyncio.sleep(0.001 * (int(value * 16) % 3))
+            score, _ = await micro_batcher.predict(tensor(value))
+            return value, score
+
+        return await asyncio.gather(*[call(v) for v in values])
+
+    for value, score in asyncio.run(main()):
+        assert score == pytest.approx(value)
+
+
+def test_batch_errors_reach_every_waiter(registry):
+    error = RuntimeError("executor failed")
+    micro_batcher = MicroBatcher(window_ms=5, max_batch_size=8, executor=InlineExecutor(error=error))
+
+    async def main():
+        calls = [micro_batcher.predict(tensor(v)) for v in (0.1, 0.2, 0.3)]
+        return await asyncio.gather(*calls, return_exceptions=True)
+
+    assert asyncio.run(main()) == [error, error, error]
+    assert micro_batcher._pending == []
+
+
+def test_batched_prediction_falls_back_to_mock_without_a_model(monkeypatch):
+    make_registry(monkeypatch, None)
+    micro_batcher = MicroBatcher(window_ms=5, max_batch_size=8, executor=InlineExecutor())
+    monkeypatch.setattr(batcher, "micro_batcher", micro_batcher)
+
+    result = asyncio.run(predict_risk_batched(latitude=37.0, longitude=-120.0, temperature=35.0,
+                                              humidity=15.0, wind_speed=25.0, precipitation=0.0))
+
+    assert result["model_details"]["source"] == "mock_no_model"
+    assert result["model_details"]["model_version"] is None
+    assert 0.0 <= result["risk_score"] <= 1.0
+
+
+def test_batched_prediction_uses_the_cnn_score(registry, monkeypatch):
+    executor = InlineExecutor()
+    monkeypatch.setattr(batcher, "micro_batcher", MicroBatcher(window_ms=5, max_batch_size=8, executor=executor))
+
+    result = asyncio.run(predict_risk_batched(latitude=37.0, longitude=-120.0, temperature=35.0,
+                                              humidity=15.0, wind_speed=25.0, precipitation=0.0))
+
+    assert executor.batches == [1]
+    assert result["model_details"]["source"] == "cnn_model"
+    assert result["model_details"]["model_version"] == registry.version
+
+
+def test_stats_report_batch_size_and_queue_wait(registry):
+    micro_batcher = MicroBatcher(window_ms=10, max_batch_size=3, executor=InlineExecutor())
+
+    async def main():
+        # One full batch of three, then a batch of two flushed by the window
+        await asyncio.gather(*[micro_batcher.predict(tensor(v)) for v in (0.1, 0.2, 0.3, 0.4, 0.5)])
+
+    asyncio.run(main())
+    stats = micro_batcher.stats()
+
+    assert stats["enabled"] is True
+    assert stats["window_ms"] == 10
+    assert stats["max_batch_size"] == 3
+    assert stats["batch_size"]["count"] == 2
+    assert stats["batch_size"]["sum"] == 5
+    assert dict(stats["batch_size"]["buckets"])[2] == 1
+    assert dict(stats["batch_size"]["buckets"])[4] == 2
+    assert stats["queue_wait_seconds"]["count"] == 5
+    # The last two requests waited for the window before their batch ran
+    assert stats["queue_wait_seconds"]["sum"] >= 2 * 0.005
+
+
+def test_batcher_is_disabled_without_a_window():
+    assert not MicroBatcher(window_ms=0, max_batch_size=32).enabled
+    assert not MicroBatcher(window_ms=5, max_batch_size=1).enabled
+    assert MicroBatcher(window_ms=5, max_batch_size=2).enabled
@@ -0,0 +1,41 @@
+"""
+Tests for the scoring benchmark harness.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import benchmark_scoring
+
+
+def test_measure_reports_per_call_microseconds():
+    stats = benchmark_scoring.measure(lambda: sum(range(100)), repeats=3, min_seconds=0.001)
+
+    assert stats["repeats"] == 3
+    assert stats["loops"] >= 1
+    assert 0 < stats["best_us"] <= stats["median_us"]
+
+
+def test_compare_flags_only_slowdowns_beyond_threshold():
+    baseline = {
+        "steady": {"best_us": 100.0, "median_us": 110.0},
+        "slower": {"best_us": 100.0, "median_us": 110.0},
+        "faster": {"best_us": 100.0, "median_us": 110.0},
+        "removed": {"best_us": 100.0, "median_us": 110.0}
+    }
+    results = {
+        "steady": {"best_us": 108.0, "median_us": 150.0},
+        "slower": {"best_us": 125.0, "median_us": 130.0},
+        "faster": {"best_us": 50.0, "median_us": 55.0},
+        "added": {"best_us": 10.0, "median_us": 12.0}
+    }
+
+    assert benchmark_scoring.compare(results, baseline, threshold=10) == ["slower"]
+    assert benchmark_scoring.compare(results, baseline, threshold=10, metric="median_us") == ["steady", "slower"]
+
+
+def test_pipeline_benchmarks_run():
+    for name, fn in benchmark_scoring.pipeline_benchmarks().items():
+        assert fn() is not None, name
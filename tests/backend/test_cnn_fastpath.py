@@ -0,0 +1,85 @@
+"""
+Tests for the row-invariant CNN fast path against full Keras inference.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+tf = pytest.importorskip("tensorflow")
+
+# Add the backend directory to the path so we can import from app
+backend_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "backend")
+sys.path.insert(0, backend_dir)
+
+from recreate_model import create_new_model
+from app.services.cnn_fastpath import RowInvariantModel, UnsupportedLayerError, is_row_invariant
+from app.services.model_service import preprocess_features_batch
+
+
+@pytest.fixture(scope="module")
+def model():
+    tf.keras.utils.set_random_seed(1234)
+    return create_new_model()
+
+
+def weather_heatmaps(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    features = np.column_stack([
+        rng.uniform(0, 50, n_rows),
+        rng.uniform(0, 100, n_rows),
+        rng.uniform(0, 60, n_rows),
+        rng.uniform(0, 20, n_rows),
+        rng.uniform(0, 1, n_rows),
+        rng.uniform(0, 3000, n_rows),
+        rng.uniform(0, 1, n_rows),
+    ])
+    return preprocess_features_batch(features)
+
+
+def test_fast_path_matches_full_predict(model):
+    heatmaps = weather_heatmaps(32)
+    fast_model = RowInvariantModel(model)
+
+    expected = model.predict(heatmaps, verbose=0)
+    actual = fast_model.predict(heatmaps)
+
+    assert is_row_invariant(heatmaps)
+    assert fast_model.fast_calls == 1
+    assert actual.shape == expected.shape
+    np.testing.assert_allclose(actual, expected, atol=1e-5)
+
+
+def test_nested_converted_model_is_supported(model):
+    """setup_model.convert_model wraps the Sequential model in a Functional one"""
+    inputs = tf.keras.Input(shape=(128, 128, 3))
+    converted = tf.keras.Model(inputs=inputs, outputs=model(inputs))
+    heatmaps = weather_heatmaps(4, seed=1)
+
+    np.testing.assert_allclose(
+        RowInvariantModel(converted).predict(heatmaps),
+        converted.predict(heatmaps, verbose=0),
+        atol=1e-5
+    )
+
+
+def test_other_inputs_fall_back_to_the_model(model):
+    heatmaps = np.random.default_rng(2).uniform(0, 1, size=(2, 128, 128, 3)).astype(np.float32)
+    fast_model = RowInvariantModel(model)
+
+    np.testing.assert_allclose(fast_model.predict(heatmaps), model.predict(heatmaps, verbose=0), atol=1e-6)
+    assert fast_model.fallback_calls == 1
+
+
+def test_same_padding_is_rejected():
+    model = tf.keras.Sequential([
+        tf.keras.Input(shape=(16, 16, 3)),
+        tf.keras.layers.Conv2D(4, (3, 3), padding="same"),
+        tf.keras.layers.Flatten(),
+        tf.keras.layers.Dense(1),
+    ])
+
+    with pytest.raises(UnsupportedLayerError):
+        RowInvariantModel(model)
@@ -0,0 +1,85 @@
+"""
+Tests for lazy heavy imports and the readiness endpoint.
+"""
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+# Add the backend directory to the path so we can import from app
+backend_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "backend")
+sys.path.insert(0, backend_dir)
+
+import main
+from app.services import model_service
+from app.services.model_service import ModelRegistry
+
+
+class ConstantModel:
+    def predict(self, inputs, verbose=0):
+        return np.full((len(inputs), 1), 0.5, dtype=np.float32)
+
+
+@pytest.fixture
+def fake_backend(monkeypatch):
+    monkeypatch.setitem(model_service.BACKEND_LOADERS, "fake", lambda: (ConstantModel(), "fake", None))
+    return "fake"
+
+
+def test_importing_app_does_not_import_heavy_modules():
+    code = "import sys, main; print(any(m in sys.modules for m in ('tensorflow', 'PIL', 'joblib', 'scipy')))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=backend_dir, capture_output=True, text=True, timeout=120)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "False"
+
+
+def test_background_load_reports_startup_breakdown(fake_backend):
+    registry = ModelRegistry(backend=fake_backend)
+    assert registry.state == "idle"
+
+    registry.load_in_background().join(timeout=10)
+
+    assert registry.ready
+    assert registry.warmed_up
+    assert set(registry.startup) == {"import_seconds", "load_seconds", "first_inference_seconds", "total_seconds"}
+
+
+def test_ready_endpoint_tracks_model_state(fake_backend, monkeypatch):
+    registry = ModelRegistry(backend=fake_backend)
+    monkeypatch.setattr(main, "model_registry", registry)
+    client = TestClient(main.app)
+
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["state"] == "idle"
+    # Liveness does not depend on the model
+    assert client.get("/health").status_code == 200
+
+    registry.load()
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert "app_import_seconds" in response.json()["startup"]
+
+
+def test_ready_endpoint_reports_unavailable_model(monkeypatch):
+    monkeypatch.setitem(model_service.BACKEND_LOADERS, "missing", lambda: (None, None, None))
+    registry = ModelRegistry(backend="missing")
+    registry.load()
+    monkeypatch.setattr(main, "model_registry", registry)
+
+    client = TestClient(main.app)
+
+    # The fallback still serves predictions, so it counts as ready by default
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["state"] == "unavailable"
+
+    monkeypatch.setattr(main, "READY_WITHOUT_MODEL", False)
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["state"] == "unavailable"
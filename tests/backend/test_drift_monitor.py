@@ -0,0 +1,198 @@
+"""
+Tests for the background CNN comparison of deferred-mode predictions.
+"""
+
+import os
+import sys
+import threading
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+# Add the backend directory to the path so we can import from app
+backend_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "backend")
+sys.path.insert(0, backend_dir)
+
+import main
+from app.routers import prediction
+from app.services import drift_monitor as drift_monitor_module
+from app.services.drift_monitor import DriftMonitor
+from app.services.prediction_cache import PredictionCache
+
+
+def columns(n=1):
+    return {
+        "latitude": [37.0] * n, "longitude": [-120.0] * n, "temperature": [30.0] * n,
+        "humidity": [20.0] * n, "wind_speed": [10.0] * n, "precipitation": [0.0] * n,
+        "vegetation_density": None, "elevation": None, "drought_index": None
+    }
+
+
+def fake_cnn(scores, source="cnn_model", release=None):
+    """A cnn_scores stand-in returning fixed scores, optionally blocking until released"""
+    calls = []
+
+    def cnn_scores(features):
+        calls.append(len(features))
+        if release is not None:
+            release.wait(5)
+        result = np.asarray(scores[:len(features)], dtype=np.float64)
+        return result, np.clip((result * 5).astype(np.int64), 0, 4), source, "v1"
+
+    cnn_scores.calls = calls
+    return cnn_scores
+
+
+class RecordingMonitor:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, columns, adjusted_scores):
+        self.submitted.append((columns, adjusted_scores))
+        return True
+
+
+@pytest.fixture
+def monitor():
+    monitor = DriftMonitor(max_pending=2)
+    yield monitor
+    monitor.shutdown()
+
+
+def test_deferred_comparison_records_score_differences(monitor, monkeypatch):
+    cnn_scores = fake_cnn([0.54, 0.5, 0.1])
+    monkeypatch.setattr(drift_monitor_module, "cnn_scores", cnn_scores)
+
+    assert monitor.submit(columns(3), [0.5, 0.2, 0.1]) is True
+    monitor.shutdown()
+
+    stats = monitor.stats()
+    assert cnn_scores.calls == [3]
+    assert stats["pending"] == 0
+    assert stats["compared"] == 3
+    assert stats["dropped"] == 0
+    assert stats["difference"]["count"] == 3
+    assert stats["difference"]["sum"] == pytest.approx(0.34)
+    assert dict(stats["difference"]["buckets"])[0.01] == 1
+    assert dict(stats["difference"]["buckets"])[0.05] == 2
+    assert dict(stats["difference"]["buckets"])[0.3] == 3
+
+
+@pytest.mark.parametrize("source", ["mock_no_model", "mock_due_to_error"])
+def test_comparison_without_the_cnn_is_not_counted(monitor, monkeypatch, source):
+    monkeypatch.setattr(drift_monitor_module, "cnn_scores", fake_cnn([0.9], source=source))
+
+    monitor.submit(columns(), [0.1])
+    monitor.shutdown()
+
+    assert monitor.stats()["compared"] == 0
+    assert monitor.stats()["difference"]["count"] == 0
+    assert monitor.stats()["pending"] == 0
+
+
+def test_failed_comparison_releases_its_slot(monitor, monkeypatch):
+    def broken(features):
+        raise RuntimeError("model exploded")
+
+    monkeypatch.setattr(drift_monitor_module, "cnn_scores", broken)
+
+    monitor.submit(columns(), [0.1])
+    monitor.shutdown()
+
+    assert monitor.stats()["pending"] == 0
+    assert monitor.stats()["compared"] == 0
+
+
+def test_comparisons_beyond_max_pending_are_dropped(monitor, monkeypatch):
+    release = threading.Event()
+    cnn_scores = fake_cnn([0.5], release=release)
+    monkeypatch.setattr(drift_monitor_module, "cnn_scores", cnn_scores)
+
+    # One comparison runs and blocks, one waits, the rest are over the limit
+    results = [monitor.submit(columns(), [0.5]) for _ in range(4)]
+    assert results == [True, True, False, False]
+    assert monitor.stats()["pending"] == 2
+    assert monitor.stats()["dropped"] == 2
+
+    release.set()
+    monitor.shutdown()
+
+    assert len(cnn_scores.calls) == 2
+    assert monitor.stats()["pending"] == 0
+    assert monitor.stats()["compared"] == 2
+    # Slots freed by finished comparisons accept new work
+    assert monitor.submit(columns(), [0.5]) is True
+
+
+def test_shutdown_waits_for_queued_comparisons_and_restarts_lazily(monitor, monkeypatch):
+    monkeypatch.setattr(drift_monitor_module, "cnn_scores", fake_cnn([0.5]))
+    monitor.shutdown()  # Nothing started yet
+
+    monitor.submit(columns(), [0.5])
+    monitor.submit(columns(), [0.5])
+    monitor.shutdown()
+
+    assert monitor._executor is None
+    assert monitor.stats()["compared"] == 2
+
+    monitor.submit(columns(), [0.5])
+    monitor.shutdown()
+    assert monitor.stats()["compared"] == 3
+
+
+def test_app_shutdown_stops_the_shared_monitor(monkeypatch):
+    monitor = DriftMonitor()
+    monkeypatch.setattr(drift_monitor_module, "cnn_scores", fake_cnn([0.5]))
+    monkeypatch.setattr(main, "drift_monitor", monitor)
+    monitor.submit(columns(), [0.5])
+
+    with TestClient(main.app):
+        pass
+
+    assert monitor._executor is None
+    assert monitor.stats()["compared"] == 1
+
+
+def test_deferred_predict_submits_the_request_for_comparison(monkeypatch):
+    monitor = RecordingMonitor()
+    monkeypatch.setattr(prediction, "drift_monitor", monitor)
+    monkeypatch.setattr(prediction, "prediction_cache", PredictionCache())
+    client = TestClient(main.app)
+    payload = {"latitude": 37.0, "longitude": -120.0, "temperature": 30.0, "humidity": 20.0,
+               "wind_speed": 10.0, "precipitation": 0.0}
+
+    body = client.post("/api/v1/predict", params={"model_mode": "deferred"}, json=payload).json()
+
+    [(submitted, scores)] = monitor.submitted
+    assert submitted["temperature"] == [30.0]
+    assert submitted["vegetation_density"] == [None]
+    assert scores == [body["risk_score"]]
+
+    client.post("/api/v1/predict", params={"model_mode": "full"}, json=dict(payload, temperature=31.0))
+    client.post("/api/v1/predict", params={"model_mode": "adjusted"}, json=dict(payload, temperature=32.0))
+    assert len(monitor.submitted) == 1
+
+
+def test_deferred_forecast_submits_every_day_for_comparison(monkeypatch):
+    week = {
+        "location": "Test ridge",
+        "current_conditions": {"temperature": 30, "humidity": 20, "wind_speed": 10, "precipitation": 0},
+        "forecast": [{"date": f"2025-07-0{day + 1}", "temperature_high": 25 + day, "temperature_low": 12,
+                      "humidity": 40, "precipitation_chance": 10, "wind_speed": 8} for day in range(3)]
+    }
+
+    async def fake_fetch(latitude, longitude):
+        return week
+
+    monitor = RecordingMonitor()
+    monkeypatch.setattr(prediction, "fetch_weather", fake_fetch)
+    monkeypatch.setattr(prediction, "drift_monitor", monitor)
+    client = TestClient(main.app)
+
+    body = client.get("/api/v1/predict/forecast",
+                      params={"latitude": 37, "longitude": -120, "model_mode": "deferred"}).json()
+
+    [(submitted, scores)] = monitor.submitted
+    assert submitted["temperature"] == [25, 26, 27]
+    assert scores == [day["risk_score"] for day in body["days"]]
@@ -0,0 +1,84 @@
+"""
+Tests for the TFLite export pipeline and the TFLite serving backend.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+tf = pytest.importorskip("tensorflow")
+
+# Add the backend directory to the path so we can import from app
+backend_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "backend")
+sys.path.insert(0, backend_dir)
+
+from recreate_model import create_new_model
+from export_optimized_models import convert_tflite, install_export, weather_heatmaps
+from app.services.exported_models import TFLiteModel
+
+
+@pytest.fixture(scope="module")
+def model():
+    tf.keras.utils.set_random_seed(1234)
+    return create_new_model()
+
+
+@pytest.fixture(scope="module")
+def saved_model_dir(model, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("saved_model"))
+    model.export(path)
+    return path
+
+
+def export(saved_model_dir, tmp_path, variant, calibration=None):
+    path = str(tmp_path / f"model_{variant}.tflite")
+    with open(path, "wb") as f:
+        f.write(convert_tflite(saved_model_dir, variant, calibration))
+    return TFLiteModel(path)
+
+
+def test_float32_export_matches_keras(model, saved_model_dir, tmp_path):
+    tflite_model = export(saved_model_dir, tmp_path, "float32")
+    heatmaps = weather_heatmaps(8)
+
+    expected = model.predict(heatmaps, verbose=0)
+    np.testing.assert_allclose(tflite_model.predict(heatmaps), expected, atol=1e-5)
+    # The interpreter is resized when the batch size changes
+    np.testing.assert_allclose(tflite_model.predict(heatmaps[:1]), expected[:1], atol=1e-5)
+
+
+def test_int8_export_stays_close_to_keras(model, saved_model_dir, tmp_path):
+    tflite_model = export(saved_model_dir, tmp_path, "int8", calibration=weather_heatmaps(32, seed=1))
+    heatmaps = weather_heatmaps(16, seed=2)
+
+    actual = tflite_model.predict(heatmaps)
+
+    assert actual.shape == (16, 1)
+    np.testing.assert_allclose(actual, model.predict(heatmaps, verbose=0), atol=0.02)
+
+
+def test_unknown_variant_is_rejected(saved_model_dir):
+    with pytest.raises(ValueError):
+        convert_tflite(saved_model_dir, "int4")
+
+
+def test_export_replaces_the_served_file_only_within_max_error(tmp_path):
+    served = tmp_path / "model.tflite"
+    served.write_bytes(b"current")
+
+    drifted = tmp_path / "drifted.tmp"
+    drifted.write_bytes(b"drifted")
+    result = install_export({"max_error": 0.05}, str(drifted), str(served), max_error=0.01)
+    assert result["installed"] is False
+    assert result["path"] is None
+    assert served.read_bytes() == b"current"
+
+    close = tmp_path / "close.tmp"
+    close.write_bytes(b"close")
+    result = install_export({"max_error": 0.001}, str(close), str(served), max_error=0.01)
+    assert result["installed"] is True
+    assert result["path"] == str(served)
+    assert served.read_bytes() == b"close"
+    assert not close.exists()
@@ -0,0 +1,117 @@
+"""
+Tests for the forecast risk endpoint and the weather service it uses.
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Add the backend directory to the path so we can import from app
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "backend"))
+
+import main
+from app.routers import prediction
+from app.services import weather_service
+from app.services.model_service import predict_risk
+from app.services.weather_service import WET_DAY_PRECIPITATION_MM, fetch_weather, forecast_inputs, forecast_risk
+
+WEEK = {
+    "location": "Test ridge",
+    "current_conditions": {"temperature": 30, "humidity": 20, "wind_speed": 10, "precipitation": 0},
+    "forecast": [
+        {"date": f"2025-07-0{day + 1}", "temperature_high": 25 + 2 * day, "temperature_low": 12 + day,
+         "humidity": 50 - 5 * day, "precipitation_chance": 60 - 10 * day, "wind_speed": 8 + day}
+        for day in range(6)
+    ] + [{"date": "2025-07-07", "temperature_high": 20, "temperature_low": 10, "humidity": 80,
+          "precipitation_chance": 90, "precipitation": 12.5, "wind_speed": 5}]
+}
+
+
+def test_forecast_inputs_mapping():
+    columns = forecast_inputs(37.0, -120.0, WEEK["forecast"])
+    assert columns["temperature"][0] == 25
+    assert columns["precipitation"][0] == pytest.approx(0.6 * WET_DAY_PRECIPITATION_MM)
+    # A reported amount wins over the chance
+    assert columns["precipitation"][-1] == 12.5
+    assert len(set(map(len, columns.values()))) == 1
+
+
+def test_forecast_days_match_point_predictions_in_one_batch(monkeypatch):
+    calls = []
+    predict_risk_batch = weather_service.predict_risk_batch
+
+    def counting_batch(**columns):
+        calls.append(len(columns["temperature"]))
+        return predict_risk_batch(**columns)
+
+    monkeypatch.setattr(weather_service, "predict_risk_batch", counting_batch)
+    result = forecast_risk(37.0, -120.0, WEEK, "adjusted", vegetation_density=0.8)
+
+    assert calls == [7]
+    columns = forecast_inputs(37.0, -120.0, WEEK["forecast"], 0.8)
+    for row, day in enumerate(result["days"]):
+        expected = predict_risk(**{name: values[row] for name, values in columns.items()}, model_mode="adjusted")
+        assert day["risk_score"] == expected["risk_score"]
+        assert day["risk_level"] == expected["risk_level"]
+        assert day["factors"] == expected["factors"]
+    scores = [day["risk_score"] for day in result["days"]]
+    assert result["peak_risk_score"] == max(scores)
+    assert result["peak_date"] == result["days"][scores.index(max(scores))]["date"]
+
+
+def test_mock_weather_provider(monkeypatch):
+    monkeypatch.setattr(weather_service, "WEATHER_PROVIDER", "mock")
+    weather = asyncio.run(fetch_weather(37.0, -120.0))
+    assert weather["location"] == "Location at 37.0, -120.0"
+    assert len(weather["forecast"]) == 2
+
+
+def test_forecast_endpoint(monkeypatch):
+    async def fake_fetch(latitude, longitude):
+        return WEEK
+
+    monkeypatch.setattr(prediction, "fetch_weather", fake_fetch)
+    client = TestClient(main.app)
+
+    response = client.get("/api/v1/predict/forecast", params={"latitude": 37, "longitude": -120, "detail": False})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["location"] == "Test ridge"
+    assert [day["date"] for day in body["days"]] == [day["date"] for day in WEEK["forecast"]]
+    assert set(body["days"][0]["factors"]) == {"temperature", "humidity", "wind_speed", "precipitation",
+                                               "vegetation_density"}
+
+    assert client.get("/api/v1/predict/forecast", params={"latitude": 137, "longitude": -120}).status_code == 422
+
+
+def test_forecast_endpoint_reports_model_details_and_defers_drift(monkeypatch):
+    async def fake_fetch(latitude, longitude):
+        return WEEK
+
+    class RecordingMonitor:
+        def __init__(self):
+            self.submitted = []
+
+        def submit(self, columns, adjusted_scores):
+            self.submitted.append((columns, adjusted_scores))
+            return True
+
+    monitor = RecordingMonitor()
+    monkeypatch.setattr(prediction, "fetch_weather", fake_fetch)
+    monkeypatch.setattr(prediction, "drift_monitor", monitor)
+    client = TestClient(main.app)
+
+    body = client.get("/api/v1/predict/forecast",
+                      params={"latitude": 37, "longitude": -120, "model_mode": "deferred"}).json()
+    assert {day["model_details"]["source"] for day in body["days"]} == {"deferred"}
+    [(columns, scores)] = monitor.submitted
+    assert columns["temperature"] == [day["temperature_high"] for day in WEEK["forecast"]]
+    assert scores == [day["risk_score"] for day in body["days"]]
+
+    body = client.get("/api/v1/predict/forecast",
+                      params={"latitude": 37, "longitude": -120, "model_mode": "full"}).json()
+    assert all(day["model_details"]["original_score"] is not None for day in body["days"])
+    assert len(monitor.submitted) == 1
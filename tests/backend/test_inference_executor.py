@@ -0,0 +1,51 @@
+"""
+Tests for the bounded inference executor.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+# Add the backend directory to the path so we can import from app
+backend_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "backend")
+sys.path.insert(0, backend_dir)
+
+from app.services.inference_executor import InferenceExecutor, ExecutorSaturatedError
+
+
+def test_run_returns_result_off_the_event_loop():
+    """Work runs on a pool thread and its result is awaited"""
+    executor = InferenceExecutor(max_workers=1, queue_depth=1)
+
+    async def main():
+        return await executor.run(lambda x: (x * 2, threading.current_thread().name), 21)
+
+    value, thread_name = asyncio.run(main())
+    executor.shutdown()
+
+    assert value == 42
+    assert thread_name.startswith("inference")
+    assert executor.in_flight == 0
+
+
+def test_saturated_executor_rejects_requests():
+    """Submissions beyond the queue depth fail fast"""
+    executor = InferenceExecutor(max_workers=1, queue_depth=2)
+    release = threading.Event()
+
+    async def main():
+        running = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(ExecutorSaturatedError):
+            await executor.run(release.wait)
+        release.set()
+        await asyncio.gather(*running)
+
+    asyncio.run(main())
+    executor.shutdown()
+
+    assert executor.stats()["rejected"] == 1
+    assert executor.in_flight == 0
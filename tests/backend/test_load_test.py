@@ -0,0 +1,68 @@
+"""
+Tests for the asyncio load generator.
+"""
+
+import asyncio
+import os
+import sys
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "backend"))
+
+import main
+from load_test import LoadTest, latency_summary
+
+
+class SlowClient:
+    """
+    Stands in for httpx.AsyncClient; every request takes `delay` seconds and
+    only one runs at a time, like a single-threaded server
+    """
+
+    def __init__(self, delay):
+        self.delay = delay
+        self._lock = asyncio.Lock()
+
+    async def post(self, path, json=None, params=None):
+        async with self._lock:
+            await asyncio.sleep(self.delay)
+        return httpx.Response(200)
+
+
+def test_latency_summary_percentiles_and_histogram():
+    summary = latency_summary([float(ms) for ms in range(1, 101)])
+
+    assert summary["count"] == 100
+    assert summary["p50_ms"] == 50.5
+    assert summary["max_ms"] == 100.0
+    assert sum(summary["histogram"].values()) == 100
+
+
+def test_closed_loop_against_in_process_app():
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            test = LoadTest(client, concurrency=4, duration=5.0, max_requests=40, params={"model_mode": "adjusted"})
+            return await test.run()
+
+    report = asyncio.run(run())
+
+    assert report["mode"] == "closed"
+    assert report["requests"] == 40
+    assert report["status_counts"] == {"200": 40}
+    assert report["error_rate"] == 0.0
+    assert report["latency"]["count"] == 40
+
+
+def test_open_loop_counts_queueing_behind_a_slow_server():
+    # 100 req/s offered to a server that handles 50 req/s: requests fall
+    # further behind their schedule, which only the corrected latency shows
+    test = LoadTest(SlowClient(0.02), concurrency=1, rps=100, duration=0.3)
+    report = asyncio.run(test.run())
+
+    assert report["mode"] == "open"
+    assert report["requests"] == 30
+    assert report["service_time"]["max_ms"] < 100
+    assert report["latency"]["max_ms"] > 250
@@ -0,0 +1,61 @@
+"""
+Tests for the Prometheus metrics registry and the /metrics endpoint.
+"""
+
+import os
+import sys
+
+from fastapi.testclient import TestClient
+
+# Add the backend directory to the path so we can import from app
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "backend"))
+
+import main
+from app.services.metrics import MetricsRegistry
+from app.services.model_service import PREDICTIONS_TOTAL, STAGE_SECONDS, predict_risk
+
+INPUTS = dict(latitude=34.05, longitude=-118.24, temperature=30.0, humidity=20.0, wind_speed=10.0, precipitation=0.0)
+
+
+def test_render_groups_families_and_escapes_labels():
+    registry = MetricsRegistry()
+    fast = registry.histogram("op_seconds", "Operation time", buckets=[0.1, 1.0], labels={"op": "fast"})
+    registry.histogram("op_seconds", "Operation time", buckets=[0.1, 1.0], labels={"op": 'say "hi"'})
+    registry.counter("ops_total", "Operations", {"op": "fast"}).inc(3)
+    registry.gauge("queue", "Queue length", callback=lambda: 7)
+    fast.observe(0.5)
+
+    lines = registry.render().splitlines()
+
+    assert lines.count("# TYPE op_seconds histogram") == 1
+    assert 'op_seconds_bucket{op="fast",le="0.1"} 0' in lines
+    assert 'op_seconds_bucket{op="fast",le="1.0"} 1' in lines
+    assert 'op_seconds_bucket{op="fast",le="+Inf"} 1' in lines
+    assert 'op_seconds_count{op="fast"} 1' in lines
+    assert 'op_seconds_count{op="say \\"hi\\""} 0' in lines
+    assert 'ops_total{op="fast"} 3' in lines
+    assert "queue 7" in lines
+
+
+def test_predictions_are_counted_and_timed_by_stage():
+    before = PREDICTIONS_TOTAL["skipped"].value
+    scored_before = STAGE_SECONDS["adjusted_scoring"].snapshot()["count"]
+
+    predict_risk(**INPUTS, model_mode="adjusted")
+
+    assert PREDICTIONS_TOTAL["skipped"].value == before + 1
+    assert STAGE_SECONDS["adjusted_scoring"].snapshot()["count"] == scored_before + 1
+
+
+def test_metrics_endpoint_exposes_prediction_series():
+    client = TestClient(main.app)
+    assert client.post("/api/v1/predict", json=INPUTS, params={"model_mode": "adjusted"}).status_code == 200
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert '# TYPE predict_stage_seconds histogram' in response.text
+    assert 'predict_stage_seconds_count{stage="serialization"}' in response.text
+    assert 'predictions_total{model_source="skipped"}' in response.text
+    assert "inference_executor_in_flight" in response.text
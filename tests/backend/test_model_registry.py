@@ -0,0 +1,174 @@
+"""
+Tests for the process-wide model registry: loading once, warmup and the
+model details reported by info() and /health.
+"""
+
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+# Add the backend directory to the path so we can import from app
+backend_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "backend")
+sys.path.insert(0, backend_dir)
+
+import main
+from app.services import model_service
+from app.services.model_service import ModelRegistry
+
+
+class RecordingModel:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = []
+
+    def predict(self, inputs, verbose=0):
+        self.calls.append(np.asarray(inputs).shape)
+        if self.fail:
+            raise RuntimeError("broken model")
+        return np.full((len(inputs), 1), 0.5, dtype=np.float32)
+
+
+@pytest.fixture
+def loads(tmp_path, monkeypatch):
+    """A fake backend that builds a new RecordingModel on every load and records it"""
+    path = tmp_path / "fake_model.bin"
+    path.write_bytes(b"weights")
+    models = []
+
+    def load():
+        time.sleep(0.01)
+        models.append(RecordingModel())
+        return models[-1], "fake", str(path)
+
+    monkeypatch.setitem(model_service.BACKEND_LOADERS, "fake", load)
+    return models
+
+
+def test_model_is_loaded_once_and_shared(loads):
+    registry = ModelRegistry(backend="fake")
+
+    model = registry.get()
+    assert registry.load() is model
+    assert registry.get() is model
+    with registry.acquire() as active:
+        assert active.model is model
+
+    assert len(loads) == 1
+
+
+def test_concurrent_first_use_loads_once(loads):
+    registry = ModelRegistry(backend="fake")
+    seen = []
+
+    def use():
+        with registry.acquire() as active:
+            seen.append(active.model)
+
+    threads = [threading.Thread(target=use) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert len(loads) == 1
+    assert len(seen) == 8
+    assert all(model is loads[0] for model in seen)
+
+
+def test_load_warms_up_with_one_dummy_image(loads):
+    registry = ModelRegistry(img_size=16, backend="fake")
+
+    registry.load()
+
+    assert loads[0].calls == [(1, 16, 16, 3)]
+    assert registry.warmed_up
+    assert registry.startup["first_inference_seconds"] is not None
+
+
+def test_load_without_warmup_runs_no_inference(loads):
+    registry = ModelRegistry(backend="fake")
+
+    registry.load(warmup=False)
+
+    assert loads[0].calls == []
+    assert registry.ready
+    assert not registry.warmed_up
+    assert registry.startup["first_inference_seconds"] is None
+
+
+def test_failed_warmup_still_serves_the_model(monkeypatch):
+    model = RecordingModel(fail=True)
+    monkeypatch.setitem(model_service.BACKEND_LOADERS, "fake", lambda: (model, "fake", None))
+    registry = ModelRegistry(backend="fake")
+
+    assert registry.load() is model
+    assert registry.ready
+    assert not registry.warmed_up
+
+
+def test_info_describes_the_loaded_model(loads):
+    registry = ModelRegistry(backend="fake")
+
+    info = registry.info()
+    assert info["loaded"] is False
+    assert info["state"] == "idle"
+    assert info["variant"] == "mock"
+    assert info["version"] is None
+    assert info["path"] is None
+    assert info["startup"] == {}
+
+    registry.load()
+    info = registry.info()
+    assert info["loaded"] is True
+    assert info["state"] == "ready"
+    assert info["backend"] == "fake"
+    assert info["variant"] == "fake"
+    assert info["version"] is not None
+    assert info["version"] == registry.version
+    assert info["path"] == "fake_model.bin"
+    assert info["loaded_at"] is not None
+    assert info["warmed_up"] is True
+    assert info["swaps"] == 0
+    assert info["draining"] == 0
+    assert set(info["startup"]) == {"import_seconds", "load_seconds", "first_inference_seconds", "total_seconds"}
+
+
+def test_info_reports_the_mock_fallback_without_a_model(monkeypatch):
+    monkeypatch.setitem(model_service.BACKEND_LOADERS, "missing", lambda: (None, None, None))
+    registry = ModelRegistry(backend="missing")
+
+    registry.load()
+    info = registry.info()
+
+    assert info["loaded"] is True
+    assert info["state"] == "unavailable"
+    assert info["variant"] == "mock"
+    assert info["warmed_up"] is False
+
+
+def test_health_reports_model_details(loads, monkeypatch):
+    registry = ModelRegistry(backend="fake")
+    monkeypatch.setattr(main, "model_registry", registry)
+    client = TestClient(main.app)
+
+    model = client.get("/health").json()["model"]
+    assert model["state"] == "idle"
+    assert model["variant"] == "mock"
+
+    registry.load()
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert response.json()["status"] == "healthy"
+    model = response.json()["model"]
+    assert model["state"] == "ready"
+    assert model["variant"] == "fake"
+    assert model["version"] == registry.version
+    assert model["path"] == "fake_model.bin"
+    assert model["warmed_up"] is True
+    # /health only reports the model, it never triggers a load
+    assert len(loads) == 1
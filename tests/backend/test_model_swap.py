@@ -0,0 +1,142 @@
+"""
+Tests for zero-downtime model hot-swap, file watching and the admin reload route.
+"""
+
+import os
+import sys
+import threading
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+# Add the backend directory to the path so we can import from app
+backend_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "backend")
+sys.path.insert(0, backend_dir)
+
+from app.services import model_service, model_watcher
+from app.services.model_service import ModelRegistry, predict_risk
+from app.services.model_watcher import ModelWatcher
+
+
+class ConstantModel:
+    def __init__(self, score, fail=False):
+        self.score = score
+        self.fail = fail
+
+    def predict(self, inputs, verbose=0):
+        if self.fail:
+            raise RuntimeError("broken model")
+        return np.full((len(inputs), 1), self.score, dtype=np.float32)
+
+
+@pytest.fixture
+def model_file(tmp_path, monkeypatch):
+    """A fake backend serving ConstantModel(score) where score is read from a file"""
+    path = tmp_path / "model.txt"
+    path.write_text("0.2")
+
+    def load():
+        text = path.read_text()
+        if text == "broken":
+            return ConstantModel(0.0, fail=True), "fake", str(path)
+        return ConstantModel(float(text)), "fake", str(path)
+
+    monkeypatch.setitem(model_service.BACKEND_LOADERS, "fake", load)
+    monkeypatch.setattr(model_service, "backend_files", lambda backend=None: [str(path)])
+    monkeypatch.setattr(model_watcher, "backend_files", lambda backend=None: [str(path)])
+    return path
+
+
+@pytest.fixture
+def registry(model_file, monkeypatch):
+    registry = ModelRegistry(backend="fake", drain_timeout=5)
+    registry.load()
+    monkeypatch.setattr(model_service, "model_registry", registry)
+    return registry
+
+
+def request():
+    return dict(latitude=37.0, longitude=-120.0, temperature=30.0, humidity=20.0,
+                wind_speed=10.0, precipitation=0.0, vegetation_density=0.5)
+
+
+def test_reload_swaps_model_and_reports_version(registry, model_file):
+    before = predict_risk(**request())["model_details"]
+    model_file.write_text("0.9")
+
+    assert registry.reload()
+    after = predict_risk(**request())["model_details"]
+
+    assert before["original_score"] == pytest.approx(0.2)
+    assert after["original_score"] == pytest.approx(0.9)
+    assert before["model_version"].startswith("fake@")
+    assert after["model_version"] != before["model_version"]
+    assert registry.swaps == 1
+
+
+def test_failed_warmup_keeps_serving_old_model(registry, model_file):
+    version = registry.version
+    model_file.write_text("broken")
+
+    assert not registry.reload()
+
+    assert registry.version == version
+    assert predict_risk(**request())["model_details"]["original_score"] == pytest.approx(0.2)
+
+
+def test_swapped_out_model_drains_in_flight_requests(registry, model_file):
+    entered = threading.Event()
+    release = threading.Event()
+
+    def hold_old_model():
+        with registry.acquire() as active:
+            entered.set()
+            release.wait(5)
+            assert active.model is not None
+
+    holder = threading.Thread(target=hold_old_model)
+    holder.start()
+    entered.wait(5)
+    old = registry.active
+
+    model_file.write_text("0.7")
+    assert registry.reload()
+    assert registry.info()["draining"] == 1
+    assert old.in_flight == 1
+
+    release.set()
+    holder.join(5)
+    assert old.wait_drained(5)
+
+
+def test_watcher_waits_for_file_to_settle(registry, model_file):
+    watcher = ModelWatcher(registry, interval_seconds=1)
+    assert not watcher.check()
+
+    model_file.write_text("0.6")
+    os.utime(model_file, ns=(1, 1))
+    assert not watcher.check()  # first sighting of the change
+    assert watcher.check()      # unchanged on the next poll: swap
+    assert registry.model.score == pytest.approx(0.6)
+    assert not watcher.check()
+
+
+def test_admin_reload_requires_token(registry, model_file, monkeypatch):
+    import main
+    from app.routers import admin
+
+    monkeypatch.setattr(admin, "model_registry", registry)
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "secret")
+    client = TestClient(main.app)
+
+    assert client.post("/api/v1/admin/model/reload").status_code == 403
+    assert client.post("/api/v1/admin/model/reload", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+    model_file.write_text("0.4")
+    response = client.post("/api/v1/admin/model/reload", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert response.json()["model"]["swaps"] == 1
+
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "")
+    assert client.post("/api/v1/admin/model/reload", headers={"X-Admin-Token": "secret"}).status_code == 404
@@ -0,0 +1,65 @@
+"""
+Tests for the TensorFlow-free NumPy CNN runtime against Keras inference.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+tf = pytest.importorskip("tensorflow")
+
+# Add the backend directory to the path so we can import from app
+backend_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "backend")
+sys.path.insert(0, backend_dir)
+
+from recreate_model import create_new_model
+from app.services.cnn_fastpath import extract_layers
+from app.services.model_service import preprocess_features_batch
+from app.services.numpy_cnn import NumpyCNN, save_layers
+
+
+@pytest.fixture(scope="module")
+def model():
+    tf.keras.utils.set_random_seed(1234)
+    return create_new_model()
+
+
+@pytest.fixture(scope="module")
+def numpy_model(model, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("numpy_cnn") / "model.npz")
+    save_layers(path, extract_layers(model), model.input_shape[1:])
+    return NumpyCNN.load(path)
+
+
+def test_heatmaps_match_keras(model, numpy_model):
+    rng = np.random.default_rng(0)
+    features = np.column_stack([
+        rng.uniform(0, 50, 16),
+        rng.uniform(0, 100, 16),
+        rng.uniform(0, 60, 16),
+        rng.uniform(0, 20, 16),
+        rng.uniform(0, 1, 16),
+        rng.uniform(0, 3000, 16),
+        rng.uniform(0, 1, 16),
+    ])
+    heatmaps = preprocess_features_batch(features)
+
+    expected = model.predict(heatmaps, verbose=0)
+    actual = numpy_model.predict(heatmaps)
+
+    assert actual.shape == expected.shape
+    np.testing.assert_allclose(actual, expected, atol=1e-5)
+
+
+def test_arbitrary_images_use_full_forward_pass(model, numpy_model):
+    """Inputs with varying rows cannot use the row plan and still match Keras"""
+    images = np.random.default_rng(1).uniform(0, 1, (3, 128, 128, 3)).astype(np.float32)
+
+    np.testing.assert_allclose(numpy_model.predict(images), model.predict(images, verbose=0), atol=1e-5)
+
+
+def test_rejects_wrong_input_shape(numpy_model):
+    with pytest.raises(ValueError):
+        numpy_model.predict(np.zeros((1, 64, 64, 3), dtype=np.float32))
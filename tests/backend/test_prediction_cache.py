@@ -0,0 +1,129 @@
+"""
+Tests for the quantized prediction result cache.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add the backend directory to the path so we can import from app
+backend_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "backend")
+sys.path.insert(0, backend_dir)
+
+from app.services import prediction_cache as cache_module
+from app.services.metrics import metrics_registry
+from app.services.prediction_cache import PredictionCache, echo_inputs, select_rows
+
+INPUTS = {
+    "latitude": 34.05,
+    "longitude": -118.24,
+    "temperature": 30.5,
+    "humidity": 40.0,
+    "wind_speed": 15.0,
+    "precipitation": 0.0,
+    "vegetation_density": 0.6,
+    "elevation": None,
+    "drought_index": None,
+}
+
+
+def cached_batch(cache, columns, score):
+    # What /predict/batch does: look up the batch, score the misses, store them
+    keys, results, missing = cache.lookup_batch(columns, "full")
+    scored = score(**select_rows(columns, missing)) if missing else []
+    return cache.store_batch(keys, results, missing, scored)
+
+
+def test_nearby_inputs_share_a_key():
+    cache = PredictionCache()
+
+    assert cache.key(INPUTS, "full") == cache.key(dict(INPUTS, temperature=30.52, humidity=40.3), "full")
+    assert cache.key(INPUTS, "full") != cache.key(dict(INPUTS, temperature=30.7), "full")
+    assert cache.key(INPUTS, "full") != cache.key(INPUTS, "adjusted")
+
+
+def test_batch_keys_match_single_keys():
+    cache = PredictionCache()
+    rows = [INPUTS, dict(INPUTS, vegetation_density=None, drought_index=0.4)]
+    columns = {name: [row[name] for row in rows] for name in INPUTS}
+
+    assert cache.keys(columns, "full") == [cache.key(row, "full") for row in rows]
+
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = PredictionCache(max_entries=2, ttl_seconds=10)
+
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.evictions == 1
+    now[0] += 11
+    assert cache.get("a") is None
+    assert cache.expirations == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_batch_only_scores_misses():
+    scored = []
+
+    def fake_batch(**columns):
+        scored.append(list(columns["temperature"]))
+        return [{"risk_score": t} for t in columns["temperature"]]
+
+    cache = PredictionCache()
+    first = {name: [INPUTS[name]] for name in INPUTS}
+    cached_batch(cache, first, fake_batch)
+
+    both = {name: [INPUTS[name], INPUTS[name]] for name in INPUTS}
+    both["temperature"] = [30.5, 35.0]
+    results = cached_batch(cache, both, fake_batch)
+
+    assert scored == [[30.5], [35.0]]
+    assert [result["risk_score"] for result in results] == [30.5, 35.0]
+
+
+def test_clear_by_mode_keeps_other_modes():
+    """Model swaps only invalidate full-mode entries"""
+    cache = PredictionCache()
+    cache.put(cache.key(INPUTS, "full"), "cnn")
+    cache.put(cache.key(INPUTS, "adjusted"), "adjusted")
+
+    cache.clear("full")
+
+    assert cache.get(cache.key(INPUTS, "full")) is None
+    assert cache.get(cache.key(INPUTS, "adjusted")) == "adjusted"
+
+
+def test_hits_report_the_current_request_inputs():
+    def fake_batch(**columns):
+        return [{"risk_score": 0.5, "factors": {"temperature": {"value": t, "impact": "High"},
+                                                 "vegetation_density": {"value": 0.6, "impact": "Medium"}}}
+                for t in columns["temperature"]]
+
+    cache = PredictionCache()
+    cached_batch(cache, {name: [INPUTS[name]] for name in INPUTS}, fake_batch)
+
+    nearby = {name: [INPUTS[name]] for name in INPUTS}
+    nearby["temperature"] = [30.52]
+    [result] = cached_batch(cache, nearby, fake_batch)
+
+    assert cache.hits == 1
+    assert result["factors"]["temperature"] == {"value": 30.52, "impact": "High"}
+    assert echo_inputs(result, dict(INPUTS, vegetation_density=None))["factors"]["vegetation_density"]["value"] == 0.5
+    # The stored entry keeps the inputs it was computed from
+    assert cache.get(cache.key(INPUTS, "full"))["factors"]["temperature"]["value"] == 30.5
+
+
+def test_evictions_are_exported_to_metrics(monkeypatch):
+    cache = PredictionCache(max_entries=1)
+    monkeypatch.setattr(cache_module, "prediction_cache", cache)
+    cache.put("a", 1)
+    cache.put("b", 2)
+
+    assert "prediction_cache_evictions_total 1" in metrics_registry.render()
@@ -0,0 +1,92 @@
+"""
+Tests for the sampled, queue-backed prediction log.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+
+import numpy as np
+
+# Add the backend directory to the path so we can import from app
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "backend"))
+
+from app.services.prediction_log import PredictionLog
+
+INPUTS = dict(latitude=34.05, longitude=-118.24, temperature=30.0)
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.threads = []
+
+    def emit(self, record):
+        self.records.append((record.levelno, json.loads(record.getMessage())))
+        self.threads.append(threading.current_thread())
+
+
+def result(source):
+    return {
+        "risk_level": "High",
+        "risk_score": 0.6,
+        "model_details": {"source": source, "model_version": None, "original_score": 0.5}
+    }
+
+
+def make_log(name, sample_rate, queue_size=100):
+    handler = RecordingHandler()
+    return PredictionLog(sample_rate=sample_rate, queue_size=queue_size, name=name, handler=handler), handler
+
+
+def test_records_are_structured_and_written_off_the_request_thread():
+    log, handler = make_log("test.predictions.structured", sample_rate=1.0)
+    log.start()
+    log.record(result("cnn_model"), **INPUTS)
+    log.stop()
+
+    assert handler.records == [(logging.INFO, {
+        "event": "prediction", **INPUTS, "risk_level": "High", "risk_score": 0.6,
+        "model_source": "cnn_model", "model_version": None, "original_score": 0.5
+    })]
+    assert handler.threads[0] is not threading.current_thread()
+
+
+def test_mock_fallbacks_bypass_sampling():
+    log, handler = make_log("test.predictions.sampling", sample_rate=0.0)
+    log.start()
+    for source in ("cnn_model", "skipped", "mock_no_model", "mock_due_to_error"):
+        log.record(result(source), **INPUTS)
+    log.stop()
+
+    assert [(level, fields["model_source"]) for level, fields in handler.records] == [
+        (logging.WARNING, "mock_no_model"),
+        (logging.WARNING, "mock_due_to_error")
+    ]
+
+
+def test_full_queue_drops_records_instead_of_blocking():
+    log, handler = make_log("test.predictions.full", sample_rate=1.0, queue_size=2)
+    for _ in range(5):
+        log.record(result("cnn_model"), **INPUTS)
+
+    assert log.dropped == 3
+    log.start()
+    log.stop()
+    assert len(handler.records) == 2
+
+
+def test_batch_rows_are_sampled_and_logged_with_their_own_inputs():
+    log, handler = make_log("test.predictions.batch", sample_rate=0.0)
+    log.start()
+    log.record_batch([result("skipped"), result("mock_no_model")], latitude=[1.0, 2.0],
+                     temperature=np.array([20.0, 31.5]), elevation=None)
+    log.stop()
+
+    assert handler.records == [(logging.WARNING, {
+        "event": "prediction", "latitude": 2.0, "temperature": 31.5, "elevation": None, "risk_level": "High",
+        "risk_score": 0.6, "model_source": "mock_no_model", "model_version": None, "original_score": 0.5
+    })]
@@ -0,0 +1,87 @@
+"""
+Tests for the vectorized heatmap preprocessing.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add the backend directory to the path so we can import from app
+backend_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "backend")
+sys.path.insert(0, backend_dir)
+
+from app.services.model_service import preprocess_features, preprocess_features_batch
+
+
+def reference_preprocess_features(features, img_size=128):
+    """Original per-pixel implementation of preprocess_features"""
+    temperature = features[0] if len(features) > 0 else 25.0
+    humidity = features[1] if len(features) > 1 else 50.0
+    wind_speed = features[2] if len(features) > 2 else 10.0
+    precipitation = features[3] if len(features) > 3 else 0.0
+    vegetation_density = features[4] if len(features) > 4 else 0.5
+    drought_index = features[6] if len(features) > 6 else 0.3
+
+    heatmap = np.zeros((img_size, img_size, 3), dtype=np.float32)
+
+    temp_norm = min(1.0, max(0.0, (temperature - 15) / 25))
+    humidity_norm = min(1.0, max(0.0, humidity / 100))
+    wind_norm = min(1.0, max(0.0, wind_speed / 50))
+    precip_norm = min(1.0, max(0.0, precipitation / 25))
+    veg_norm = min(1.0, max(0.0, vegetation_density))
+    drought_norm = min(1.0, max(0.0, drought_index))
+
+    heatmap[:, :, 0] = temp_norm * (1 + drought_norm * 0.5)
+    heatmap[:, :, 1] = (humidity_norm + veg_norm) / 2
+    heatmap[:, :, 2] = precip_norm
+
+    for i in range(img_size):
+        for j in range(img_size):
+            wind_effect = wind_norm * (j / img_size)
+            heatmap[i, j, 0] = min(1.0, heatmap[i, j, 0] + (wind_effect * 0.2))
+            heatmap[i, j, 2] = max(0.0, heatmap[i, j, 2] - (wind_effect * 0.1))
+
+    return np.expand_dims(heatmap, axis=0)
+
+
+SAMPLE_FEATURES = [
+    [32.5, 45.0, 15.0, 0.0, 0.7, 350.0, 0.8],
+    [20.0, 70.0, 5.0, 5.0, 0.3, 300.0, 0.3],
+    [45.0, 10.0, 40.0, 0.0, 0.9, 300.0, 0.3],
+    [50.0, 0.0, 80.0, 30.0, 1.5, 300.0, 1.0],
+    [-10.0, 120.0, 0.0, 2.0, -0.2, 300.0, -1.0],
+    [25.0, 50.0, 10.0, 0.0],
+]
+
+
+@pytest.mark.parametrize("features", SAMPLE_FEATURES)
+def test_preprocess_matches_reference(features):
+    """Vectorized preprocessing gives the same tensor as the pixel loop"""
+    expected = reference_preprocess_features(features)
+    actual = preprocess_features(features, (37.77, -122.42))
+
+    assert actual.shape == (1, 128, 128, 3)
+    assert actual.dtype == np.float32
+    np.testing.assert_allclose(actual, expected, atol=1e-6)
+
+
+def test_preprocess_batch_matches_single_rows():
+    """Batched preprocessing stacks the single-row tensors"""
+    rng = np.random.default_rng(42)
+    batch = np.column_stack([
+        rng.uniform(0, 50, 16),
+        rng.uniform(0, 100, 16),
+        rng.uniform(0, 60, 16),
+        rng.uniform(0, 30, 16),
+        rng.uniform(0, 1, 16),
+        rng.uniform(0, 2000, 16),
+        rng.uniform(0, 1, 16),
+    ])
+
+    tensors = preprocess_features_batch(batch)
+
+    assert tensors.shape == (16, 128, 128, 3)
+    for row, tensor in zip(batch, tensors):
+        np.testing.assert_allclose(tensor, reference_preprocess_features(list(row))[0], atol=1e-6)
@@ -0,0 +1,108 @@
+"""
+Tests for on-demand request profiling.
+"""
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Add the backend directory to the path so we can import from app
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "backend"))
+
+import main
+from app.routers import admin
+from app.services import profiling
+from app.services.profiling import profile_store
+
+INPUTS = dict(latitude=34.05, longitude=-118.24, temperature=30.0, humidity=20.0, wind_speed=10.0, precipitation=0.0)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "secret")
+    return TestClient(main.app)
+
+
+def profile_predict(client, token="secret", flag="1", **overrides):
+    return client.post("/api/v1/predict", json={**INPUTS, **overrides}, params={"model_mode": "full"},
+                       headers={"X-Profile": flag, "X-Admin-Token": token})
+
+
+def test_requests_are_only_profiled_with_the_admin_token(client):
+    assert "x-profile-id" not in client.post("/api/v1/predict", json=INPUTS).headers
+    assert "x-profile-id" not in profile_predict(client, token="wrong").headers
+    assert "x-profile-id" not in profile_predict(client, flag="0").headers
+
+    response = profile_predict(client)
+
+    assert response.status_code == 200
+    assert profile_store.get(response.headers["x-profile-id"]) is not None
+
+
+def test_profile_includes_executor_work_and_downloads_as_pstats(client, tmp_path):
+    # Inputs no other test uses, so the prediction is not a cache hit
+    profile_id = profile_predict(client, temperature=41.3).headers["x-profile-id"]
+    headers = {"X-Admin-Token": "secret"}
+
+    listed = client.get("/api/v1/admin/profiles", headers=headers).json()["profiles"]
+    assert listed[0]["id"] == profile_id
+    assert listed[0]["path"] == "/api/v1/predict"
+
+    summary = client.get(f"/api/v1/admin/profiles/{profile_id}", params={"limit": 500}, headers=headers)
+    assert summary.status_code == 200
+    # predict_risk runs on the inference executor, not the request thread
+    assert "(predict_risk)" in summary.text
+
+    download = client.get(f"/api/v1/admin/profiles/{profile_id}", params={"format": "pstats"}, headers=headers)
+    path = tmp_path / "profile.pstats"
+    path.write_bytes(download.content)
+    functions = {name for _, _, name in pstats.Stats(str(path)).stats}
+    assert "predict_risk" in functions
+
+
+def test_profile_routes_require_the_admin_token(client):
+    assert client.get("/api/v1/admin/profiles").status_code == 403
+    assert client.get("/api/v1/admin/profiles/missing", headers={"X-Admin-Token": "secret"}).status_code == 404
+
+
+class ExclusiveProfile(cProfile.Profile):
+    """cProfile as on Python 3.12+, where only one profiler may be active per process"""
+    active = 0
+    lock = threading.Lock()
+
+    def enable(self, *args, **kwargs):
+        with ExclusiveProfile.lock:
+            if ExclusiveProfile.active:
+                raise ValueError("Another profiling tool is already active")
+            ExclusiveProfile.active += 1
+        super().enable(*args, **kwargs)
+
+    def disable(self):
+        super().disable()
+        with ExclusiveProfile.lock:
+            ExclusiveProfile.active -= 1
+
+
+def test_nested_profiler_is_skipped_when_only_one_may_be_active(client, monkeypatch):
+    monkeypatch.setattr(profiling.cProfile, "Profile", ExclusiveProfile)
+
+    response = profile_predict(client, temperature=42.7)
+
+    assert response.status_code == 200
+    assert profile_store.get(response.headers["x-profile-id"]) is not None
+
+
+def test_request_is_served_unprofiled_when_another_profiler_is_active(client, monkeypatch):
+    monkeypatch.setattr(profiling.cProfile, "Profile", ExclusiveProfile)
+    monkeypatch.setattr(ExclusiveProfile, "active", 1)
+
+    response = profile_predict(client, temperature=43.1)
+
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+    assert response.headers["x-profile-status"] == "unavailable"
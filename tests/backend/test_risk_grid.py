@@ -0,0 +1,96 @@
+"""
+Tests for the vectorized bounding-box risk grid.
+"""
+
+import base64
+import os
+import sys
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+# Add the backend directory to the path so we can import from app
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "backend"))
+
+import main
+from app.services import risk_grid
+from app.services.model_service import predict_risk_batch
+from app.services.risk_grid import GridTooLargeError, grid_axes, grid_shape, predict_grid
+
+BBOX = [-120.0, 35.0, -119.0, 35.5]
+
+
+def test_grid_shape_and_cell_centers():
+    assert grid_shape(BBOX, 0.25) == (2, 4)
+    latitudes, longitudes = grid_axes(BBOX, 0.25)
+    np.testing.assert_allclose(latitudes, [35.375, 35.125])
+    np.testing.assert_allclose(longitudes, [-119.875, -119.625, -119.375, -119.125])
+
+
+def test_grid_matches_point_predictions():
+    rng = np.random.default_rng(0)
+    shape = grid_shape(BBOX, 0.1)
+    weather = {
+        "temperature": rng.uniform(0, 50, shape),
+        "humidity": rng.uniform(0, 100, shape),
+        "wind_speed": rng.uniform(0, 60, shape),
+        "precipitation": 0.5,
+        "vegetation_density": rng.uniform(0, 1, shape)
+    }
+
+    grid = predict_grid(BBOX, 0.1, {name: np.asarray(value).tolist() for name, value in weather.items()},
+                        include_contributions=True)
+
+    n_cells = shape[0] * shape[1]
+    points = predict_risk_batch(
+        latitude=[0.0] * n_cells,
+        longitude=[0.0] * n_cells,
+        temperature=weather["temperature"].ravel(),
+        humidity=weather["humidity"].ravel(),
+        wind_speed=weather["wind_speed"].ravel(),
+        precipitation=[0.5] * n_cells,
+        vegetation_density=weather["vegetation_density"].ravel(),
+        model_mode="adjusted"
+    )
+    assert np.ravel(grid["risk_score"]).tolist() == [p["risk_score"] for p in points]
+    assert [grid["risk_levels"][i] for i in np.ravel(grid["risk_level_idx"])] == [p["risk_level"] for p in points]
+    assert np.ravel(grid["contributions"]["wind"]).tolist() == [p["factors"]["wind_speed"]["contribution"]
+                                                                for p in points]
+
+
+def test_base64_encoding_round_trips():
+    weather = {"temperature": 30.0, "humidity": 20.0, "wind_speed": 10.0, "precipitation": 0.0}
+    as_json = predict_grid(BBOX, 0.25, weather)
+    packed = predict_grid(BBOX, 0.25, weather, encoding="base64")
+
+    scores = np.frombuffer(base64.b64decode(packed["risk_score"]), dtype="<f4").reshape(packed["shape"])
+    levels = np.frombuffer(base64.b64decode(packed["risk_level_idx"]), dtype=np.uint8).reshape(packed["shape"])
+    np.testing.assert_allclose(scores, as_json["risk_score"], atol=1e-6)
+    assert levels.tolist() == as_json["risk_level_idx"]
+
+
+def test_cell_and_memory_limits(monkeypatch):
+    weather = {"temperature": 30.0, "humidity": 20.0, "wind_speed": 10.0, "precipitation": 0.0}
+    monkeypatch.setattr(risk_grid, "MAX_GRID_CELLS", 7)
+    with pytest.raises(GridTooLargeError, match="cells exceeds"):
+        predict_grid(BBOX, 0.25, weather)
+
+    monkeypatch.setattr(risk_grid, "MAX_GRID_CELLS", 1000)
+    monkeypatch.setattr(risk_grid, "MAX_GRID_MEMORY_MB", 0.0001)
+    with pytest.raises(GridTooLargeError, match="MB"):
+        predict_grid(BBOX, 0.25, weather)
+
+
+def test_grid_endpoint_errors(monkeypatch):
+    client = TestClient(main.app)
+    body = {"bbox": BBOX, "resolution": 0.25, "temperature": 30, "humidity": 20, "wind_speed": 10, "precipitation": 0}
+
+    response = client.post("/api/v1/predict/grid", json=body)
+    assert response.status_code == 200
+    assert response.json()["shape"] == [2, 4]
+
+    assert client.post("/api/v1/predict/grid", json={**body, "temperature": [[1, 2, 3]]}).status_code == 422
+    assert client.post("/api/v1/predict/grid", json={**body, "bbox": [-119, 35, -120, 36]}).status_code == 422
+    monkeypatch.setattr(risk_grid, "MAX_GRID_CELLS", 4)
+    assert client.post("/api/v1/predict/grid", json=body).status_code == 413
@@ -0,0 +1,144 @@
+"""
+Tests for the slippy-map risk tiles, the weather layer and the tile cache.
+"""
+
+import io
+import os
+import sys
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+# Add the backend directory to the path so we can import from app
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "backend"))
+
+import main
+from app.routers import admin, tiles
+from app.services.model_service import predict_risk
+from app.services.risk_tiles import TileCache, WeatherGrid, WeatherLayer, render_tile, tile_axes, tile_key
+
+WEATHER = {"temperature": 33.0, "humidity": 25.0, "wind_speed": 18.0, "precipitation": 0.0}
+
+
+def f16(body):
+    return np.frombuffer(body, dtype="<f2").reshape(256, 256)
+
+
+def test_tile_axes_cover_the_mercator_world_at_zoom_zero():
+    latitudes, longitudes = tile_axes(0, 0, 0)
+    assert latitudes[0] == pytest.approx(-latitudes[-1]) and latitudes[0] > 84.9
+    assert np.all(np.diff(latitudes) < 0)
+    assert longitudes[0] == pytest.approx(-180 + 180 / 256)
+    assert longitudes[-1] == pytest.approx(180 - 180 / 256)
+
+
+def test_uniform_weather_matches_point_prediction():
+    scores = f16(render_tile(4, 2, 6, WeatherGrid(WEATHER), tile_format="f16"))
+    expected = predict_risk(latitude=37.0, longitude=-120.0, **WEATHER, model_mode="adjusted")["risk_score"]
+    np.testing.assert_allclose(scores, expected, atol=1e-3)
+
+
+def test_array_layer_is_sampled_per_cell_and_transparent_outside():
+    # Western half of California at 1 degree: hotter cells to the east
+    temperature = np.tile(np.linspace(10, 45, 6), (4, 1))
+    grid = WeatherGrid({**WEATHER, "temperature": temperature}, bbox=[-125, 36, -119, 40], resolution=1.0)
+    scores = f16(render_tile(5, 5, 12, grid, tile_format="f16"))
+
+    latitudes, longitudes = tile_axes(5, 5, 12)
+    inside_rows = (latitudes < 40) & (latitudes > 36)
+    inside_cols = (longitudes > -125) & (longitudes < -119)
+    assert np.isnan(scores[~inside_rows]).all() and np.isnan(scores[:, ~inside_cols]).all()
+    row = scores[np.argmax(inside_rows)][inside_cols]
+    assert np.all(np.diff(row) >= 0) and row[-1] > row[0]
+
+    from PIL import Image
+    image = np.asarray(Image.open(io.BytesIO(render_tile(5, 5, 12, grid))))
+    assert image.shape == (256, 256, 4)
+    assert (image[..., 3] == 0).tolist() == np.isnan(scores).tolist()
+
+
+def test_overrides_replace_layer_fields():
+    grid = WeatherGrid({**WEATHER, "temperature": 10.0})
+    hot = f16(render_tile(3, 1, 3, grid, {"temperature": 45.0}, "f16"))
+    cold = f16(render_tile(3, 1, 3, grid, tile_format="f16"))
+    assert np.all(hot > cold)
+    with pytest.raises(ValueError, match="Missing weather field 'humidity'"):
+        render_tile(3, 1, 3, WeatherGrid({"temperature": 30.0}))
+
+
+def test_weather_layer_file_is_shared_between_processes(tmp_path):
+    path = str(tmp_path / "layer.npz")
+    writer, reader = WeatherLayer(path), WeatherLayer(path)
+    grid = WeatherGrid({**WEATHER, "humidity": [[10.0, 20.0], [30.0, 40.0]]}, bbox=[-120, 35, -118, 37], resolution=1.0)
+    writer.set(grid)
+
+    loaded = reader.current()
+    assert loaded.fingerprint == grid.fingerprint
+    np.testing.assert_array_equal(loaded.fields["humidity"], grid.fields["humidity"])
+    assert loaded.fields["vegetation_density"] is None
+
+
+def test_tile_cache_tiers_and_expiry(tmp_path):
+    cache = TileCache(max_entries=2, ttl_seconds=60, directory=str(tmp_path))
+    for i in range(3):
+        cache.put(f"tile-{i}", bytes([i]))
+    assert len(cache) == 2
+    # Evicted from memory but still on disk
+    assert cache.get("tile-0") == b"\x00"
+    assert (cache.memory_hits, cache.disk_hits) == (0, 1)
+    assert TileCache(directory=str(tmp_path)).get("tile-2") == b"\x02"
+
+    expired = TileCache(ttl_seconds=-1, directory=str(tmp_path))
+    assert expired.get("tile-1") is None
+    assert expired.prune() == 2
+    assert os.listdir(tmp_path) == []
+
+
+def test_tile_cache_creates_its_directory_late_and_prunes_only_tiles(tmp_path):
+    directory = tmp_path / "tiles"
+    cache = TileCache(ttl_seconds=-1, directory=str(directory))
+    assert not directory.exists()
+    assert cache.prune() == 0
+
+    cache.put("tile", b"\x00")
+    (directory / "notes.txt").write_text("not a tile")
+    assert cache.prune() == 1
+    assert os.listdir(directory) == ["notes.txt"]
+
+
+def test_tile_key_keeps_override_precision():
+    grid = WeatherGrid(WEATHER)
+    assert tile_key(5, 1, 2, grid, {"temperature": 30.0000001}) != tile_key(5, 1, 2, grid, {"temperature": 30.0})
+    assert tile_key(5, 1, 2, grid, {"temperature": 30}) == tile_key(5, 1, 2, grid, {"temperature": 30.0})
+
+
+def test_tile_endpoint_caching_headers(monkeypatch, tmp_path):
+    layer = WeatherLayer(str(tmp_path / "layer.npz"))
+    monkeypatch.setattr(tiles, "weather_layer", layer)
+    monkeypatch.setattr(admin, "weather_layer", layer)
+    monkeypatch.setattr(tiles, "tile_cache", TileCache(directory=str(tmp_path / "tiles")))
+    monkeypatch.setattr(admin, "tile_cache", tiles.tile_cache)
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "secret")
+    client = TestClient(main.app)
+
+    assert client.get("/api/v1/tiles/6/10/24").status_code == 422
+    response = client.put("/api/v1/admin/weather-layer", json=WEATHER, headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+
+    response = client.get("/api/v1/tiles/6/10/24")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    # The URL does not carry the layer fingerprint, so clients must revalidate
+    assert response.headers["cache-control"] == "public, no-cache"
+    etag = response.headers["etag"]
+    assert client.get("/api/v1/tiles/6/10/24", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/api/v1/tiles/6/10/24?temperature=40", headers={"If-None-Match": etag}).status_code == 200
+
+    client.put("/api/v1/admin/weather-layer", json={**WEATHER, "humidity": 60}, headers={"X-Admin-Token": "secret"})
+    refreshed = client.get("/api/v1/tiles/6/10/24", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200 and refreshed.headers["etag"] != etag
+
+    raw = client.get("/api/v1/tiles/6/10/24?format=f16")
+    assert raw.headers["x-tile-dtype"] == "float16" and len(raw.content) == 256 * 256 * 2
+    assert client.get("/api/v1/tiles/2/4/0").status_code == 422
@@ -0,0 +1,127 @@
+"""
+Tests for the pre-fork server entry point (worker supervision and signals).
+"""
+
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import pytest
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="uses fork() and /proc")
+
+backend_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "backend")
+sys.path.insert(0, backend_dir)
+
+import serve
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def workers_of(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return set(map(int, f.read().split()))
+
+
+def wait_for(condition, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if condition():
+                return True
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    return False
+
+
+@pytest.fixture
+def server():
+    port = free_port()
+    env = dict(os.environ, INFERENCE_BACKEND="numpy", MODEL_STARTUP="lazy")
+    process = subprocess.Popen(
+        [sys.executable, "serve.py", "--workers", "2", "--host", "127.0.0.1", "--port", str(port),
+         "--graceful-timeout", "5", "--log-level", "warning"],
+        cwd=backend_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{port}"
+    assert wait_for(lambda: httpx.get(f"{url}/health").status_code == 200 and len(workers_of(process.pid)) == 2)
+    yield process, url
+    if process.poll() is None:
+        process.kill()
+        process.wait()
+
+
+def test_crashed_worker_is_respawned(server):
+    process, url = server
+    victim = min(workers_of(process.pid))
+
+    os.kill(victim, signal.SIGKILL)
+
+    assert wait_for(lambda: len(workers_of(process.pid) - {victim}) == 2)
+    assert httpx.get(f"{url}/health").status_code == 200
+
+
+def test_sighup_replaces_all_workers(server):
+    process, url = server
+    old = workers_of(process.pid)
+
+    process.send_signal(signal.SIGHUP)
+
+    assert wait_for(lambda: len(workers_of(process.pid)) == 2 and not workers_of(process.pid) & old)
+    assert httpx.get(f"{url}/health").status_code == 200
+
+
+def test_sigterm_stops_master_and_workers(server):
+    process, _ = server
+    workers = workers_of(process.pid)
+
+    process.send_signal(signal.SIGTERM)
+
+    assert process.wait(timeout=15) == 0
+    assert not any(os.path.exists(f"/proc/{pid}") for pid in workers)
+
+
+def test_crash_looping_workers_back_off_and_stop_master():
+    # Workers whose app fails its lifespan startup exit right after being forked
+    script = (
+        "import sys\n"
+        "from serve import Master, bind_socket\n"
+        "async def app(scope, receive, send):\n"
+        "    raise RuntimeError('startup failed')\n"
+        "sys.exit(Master(app, bind_socket('127.0.0.1', 0), 2, graceful_timeout=1, log_level='critical',\n"
+        "                max_quick_deaths=3, respawn_backoff=0.1).run())\n"
+    )
+    started = time.monotonic()
+    process = subprocess.run([sys.executable, "-c", script], cwd=backend_dir, capture_output=True, text=True,
+                             timeout=60)
+
+    assert process.returncode == 1
+    assert "respawning in 0.2s" in process.stderr
+    assert "3 times in a row" in process.stderr
+    # Two backoffs of 0.1s and 0.2s between the three starts of a slot
+    assert time.monotonic() - started >= 0.3
+
+
+def test_default_workers_caps_backends_that_load_per_worker(monkeypatch):
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    monkeypatch.setattr(os, "cpu_count", lambda: 16)
+
+    assert serve.default_workers("numpy") == 16
+    assert serve.default_workers("surrogate") == 16
+    assert serve.default_workers("keras") == serve.MAX_DEFAULT_UNSHARED_WORKERS
+    assert serve.default_workers("tflite") == serve.MAX_DEFAULT_UNSHARED_WORKERS
+
+    monkeypatch.setattr(os, "cpu_count", lambda: 1)
+    assert serve.default_workers("keras") == 1
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "6")
+    assert serve.default_workers("keras") == 6
@@ -0,0 +1,81 @@
+"""
+Tests for single-flight coalescing of identical concurrent requests.
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add the backend directory to the path so we can import from app
+backend_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "backend")
+sys.path.insert(0, backend_dir)
+
+from app.routers import prediction
+from app.schemas.prediction import PredictionRequest
+from app.services.prediction_cache import PredictionCache
+from app.services.single_flight import SingleFlight
+
+
+def test_identical_calls_share_one_computation():
+    flights = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main():
+        return await asyncio.gather(*[flights.do("same", work) for _ in range(10)])
+
+    results = asyncio.run(main())
+
+    assert results == ["result"] * 10
+    assert calls == [1]
+    assert flights.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 9}
+
+
+def test_errors_reach_every_caller_and_are_not_cached():
+    flights = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0)
+        raise RuntimeError("boom")
+
+    async def main():
+        results = await asyncio.gather(*[flights.do("key", failing) for _ in range(3)], return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        # A later call starts a fresh computation
+        with pytest.raises(RuntimeError):
+            await flights.do("key", failing)
+
+    asyncio.run(main())
+
+    assert flights.leaders == 2
+
+
+@pytest.mark.parametrize("max_entries, expected_calls", [(10000, 1), (0, 2)])
+def test_predict_coalesces_on_cache_key_or_exact_inputs(monkeypatch, max_entries, expected_calls):
+    """With the cache disabled, nearby but different inputs are computed separately"""
+    calls = []
+
+    async def compute(prediction_args, mode, cache_key):
+        calls.append(prediction_args["temperature"])
+        await asyncio.sleep(0.01)
+        return {"risk_level": "High", "risk_score": 0.6, "confidence": 0.8, "factors": {}, "recommendations": []}
+
+    monkeypatch.setattr(prediction, "prediction_cache", PredictionCache(max_entries=max_entries))
+    monkeypatch.setattr(prediction, "prediction_flights", SingleFlight())
+    monkeypatch.setattr(prediction, "_compute_prediction", compute)
+    requests = [PredictionRequest(latitude=34.05, longitude=-118.24, temperature=temperature, humidity=40.0,
+                                  wind_speed=15.0, precipitation=0.0) for temperature in (30.50, 30.52)]
+
+    async def main():
+        await asyncio.gather(*[prediction.predict_wildfire_risk(request, detail=True, model_mode="adjusted")
+                               for request in requests])
+
+    asyncio.run(main())
+
+    assert len(calls) == expected_calls
@@ -0,0 +1,153 @@
+"""
+Tests for the spatial index of scored locations and the top-risk routes.
+"""
+
+import math
+import os
+import sys
+import threading
+
+import numpy as np
+import pytest
+import scipy.spatial
+from fastapi.testclient import TestClient
+
+# Add the backend directory to the path so we can import from app
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "backend"))
+
+import main
+from app.routers import locations, prediction
+from app.services.prediction_cache import PredictionCache
+from app.services.spatial_index import EARTH_RADIUS_KM, RiskIndex
+
+LEVELS = ["Low", "Moderate", "High", "Very High", "Extreme"]
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+@pytest.fixture
+def populated():
+    rng = np.random.default_rng(0)
+    n = 20000
+    lat, lon, scores = rng.uniform(35, 40, n), rng.uniform(-123, -117, n), rng.uniform(0, 1, n).astype(np.float32)
+    levels = [LEVELS[min(int(score * 5), 4)] for score in scores]
+    index = RiskIndex(rebuild_threshold=10 ** 9)
+    # Half in the tree, half in the unindexed delta
+    index.update(lat[:n // 2], lon[:n // 2], scores[:n // 2], levels[:n // 2])
+    index.rebuild()
+    index.update(lat[n // 2:], lon[n // 2:], scores[n // 2:], levels[n // 2:])
+    assert index.stats()["delta_locations"] == n // 2
+    return index, lat, lon, scores
+
+
+def test_radius_query_matches_brute_force(populated):
+    index, lat, lon, scores = populated
+    result = index.top_within_radius(37.5, -120.0, 40.0, k=25)
+
+    distances = haversine_km(37.5, -120.0, lat, lon)
+    expected = np.sort(scores[distances <= 40.0])[::-1][:25]
+    np.testing.assert_allclose([row["risk_score"] for row in result], expected, atol=1e-6)
+    assert all(row["distance_km"] <= 40.0 for row in result)
+    assert result[0]["risk_level"] == LEVELS[min(int(result[0]["risk_score"] * 5), 4)]
+
+
+def test_bbox_query_matches_brute_force(populated):
+    index, lat, lon, scores = populated
+    bbox = [-121.5, 36.0, -119.0, 38.5]
+    result = index.top_within_bbox(bbox, k=50, min_score=0.2)
+
+    inside = (lon >= bbox[0]) & (lat >= bbox[1]) & (lon <= bbox[2]) & (lat <= bbox[3]) & (scores >= 0.2)
+    np.testing.assert_allclose([row["risk_score"] for row in result], np.sort(scores[inside])[::-1][:50], atol=1e-6)
+
+
+def test_rescoring_updates_in_place(populated):
+    index, lat, lon, scores = populated
+    top = index.top_within_radius(37.5, -120.0, 40.0, k=1)[0]
+    index.update([top["latitude"]], [top["longitude"]], [0.0], ["Low"])
+
+    assert len(index) == len(lat)
+    assert index.top_within_radius(top["latitude"], top["longitude"], 0.01, k=1)[0]["risk_score"] == 0.0
+    assert index.top_within_radius(37.5, -120.0, 40.0, k=1)[0]["risk_score"] < top["risk_score"]
+
+
+def test_full_index_drops_new_locations():
+    index = RiskIndex(max_locations=2, rebuild_threshold=10 ** 9)
+    index.update([1.0, 2.0, 3.0], [1.0, 2.0, 3.0], [0.1, 0.2, 0.3], ["Low"] * 3)
+    index.update([1.0], [1.0], [0.9], ["Extreme"])
+    assert len(index) == 2 and index.dropped == 1
+    assert index.top_within_radius(1.0, 1.0, 1000, k=5)[0]["risk_score"] == pytest.approx(0.9)
+    assert index.top_within_radius(1.0, 1.0, 1000, k=5, max_age_seconds=math.inf)[0]["risk_level"] == "Extreme"
+
+
+def test_predictions_populate_top_risk_route(monkeypatch):
+    index = RiskIndex(rebuild_threshold=10 ** 9)
+    monkeypatch.setattr(prediction, "risk_index", index)
+    monkeypatch.setattr(locations, "risk_index", index)
+    client = TestClient(main.app)
+
+    batch = {
+        "latitude": [37.0, 37.1, 37.2, 45.0],
+        "longitude": [-120.0, -120.1, -120.2, -110.0],
+        "temperature": [40.0, 20.0, 30.0, 45.0],
+        "humidity": [10.0, 60.0, 30.0, 5.0],
+        "wind_speed": [30.0, 5.0, 15.0, 40.0],
+        "precipitation": [0.0, 2.0, 0.0, 0.0]
+    }
+    assert client.post("/api/v1/predict/batch?model_mode=adjusted", json=batch).status_code == 200
+    assert len(index) == 4
+
+    body = client.get("/api/v1/locations/top-risk",
+                      params={"latitude": 37.1, "longitude": -120.1, "radius_km": 50, "k": 2}).json()
+    assert body["count"] == 2
+    assert [row["latitude"] for row in body["locations"]] == [37.0, 37.2]
+
+    body = client.get("/api/v1/locations/top-risk", params={"bbox": "-125,30,-100,50", "k": 1}).json()
+    assert body["locations"][0]["latitude"] == 45.0
+
+    assert client.get("/api/v1/locations/top-risk", params={"latitude": 37.0}).status_code == 422
+    assert client.get("/api/v1/locations/top-risk", params={"bbox": "1,2,3"}).status_code == 422
+
+
+def test_clear_discards_a_rebuild_in_progress(monkeypatch):
+    building, release = threading.Event(), threading.Event()
+    real_tree = scipy.spatial.cKDTree
+
+    def slow_tree(*args, **kwargs):
+        building.set()
+        release.wait(5)
+        return real_tree(*args, **kwargs)
+
+    monkeypatch.setattr(scipy.spatial, "cKDTree", slow_tree)
+    index = RiskIndex(rebuild_threshold=10 ** 9)
+    index.update([1.0, 2.0], [1.0, 2.0], [0.5, 0.6], ["High"] * 2)
+    rebuild = threading.Thread(target=index.rebuild)
+    rebuild.start()
+    assert building.wait(5)
+
+    index.clear()
+    release.set()
+    rebuild.join(5)
+
+    assert index.stats()["tree_locations"] == 0
+    assert index.top_within_radius(1.0, 1.0, 1000) == []
+
+
+def test_cache_hits_are_indexed_at_their_own_coordinates(monkeypatch):
+    index = RiskIndex(rebuild_threshold=10 ** 9)
+    monkeypatch.setattr(prediction, "risk_index", index)
+    monkeypatch.setattr(prediction, "prediction_cache", PredictionCache())
+    client = TestClient(main.app)
+
+    request = {"latitude": 37.001, "longitude": -120.001, "temperature": 35.0, "humidity": 20.0,
+               "wind_speed": 20.0, "precipitation": 0.0}
+    for latitude in (37.001, 37.004):
+        response = client.post("/api/v1/predict?model_mode=adjusted", json={**request, "latitude": latitude})
+        assert response.status_code == 200
+
+    assert prediction.prediction_cache.hits == 1
+    assert len(index) == 2
+    assert sorted(row["latitude"] for row in index.top_within_radius(37.0, -120.0, 10)) == [37.001, 37.004]
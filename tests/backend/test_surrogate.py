@@ -0,0 +1,58 @@
+"""
+Tests for the CNN surrogate lookup table.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+# Add the backend directory to the path so we can import from app
+backend_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "backend")
+sys.path.insert(0, backend_dir)
+
+from app.services.model_service import heatmap_params, render_heatmaps
+from app.services.surrogate import SurrogateModel, decode_heatmaps
+
+
+def test_decode_recovers_heatmap_parameters():
+    """Decoding rendered heatmaps gives back parameters rendering the same image"""
+    rng = np.random.default_rng(0)
+    params = rng.uniform(0, 1, size=(200, 4))
+    params[:10, 0] = 1.0  # red saturated from the first column
+    params[10:20, 2] = 0.0  # no blue left to dry out
+
+    heatmaps = render_heatmaps(params)
+    decoded = decode_heatmaps(heatmaps)
+
+    np.testing.assert_allclose(render_heatmaps(decoded), heatmaps, atol=1e-6)
+
+
+def test_interpolation_is_exact_for_multilinear_functions(tmp_path):
+    """Multilinear interpolation reproduces a multilinear function everywhere"""
+    axes = [np.linspace(0, 1, 5)] * 4
+
+    def target(p):
+        return 0.1 + 0.2 * p[..., 0] + 0.3 * p[..., 1] * p[..., 3] - 0.1 * p[..., 2]
+
+    grid = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1)
+    surrogate = SurrogateModel(axes, target(grid), max_error=0.0)
+    surrogate.save(tmp_path / "surrogate.npz", points_per_axis=5)
+    loaded = SurrogateModel.load(tmp_path / "surrogate.npz")
+
+    params = np.random.default_rng(1).uniform(0, 1, size=(100, 4))
+    np.testing.assert_allclose(loaded.predict_params(params), target(params), atol=1e-6)
+    assert loaded.metadata["meta_points_per_axis"] == 5
+
+
+def test_predict_accepts_rendered_heatmaps():
+    """The model-compatible predict matches scoring the parameters directly"""
+    axes = [np.linspace(0, 1, 3)] * 4
+    values = np.random.default_rng(2).uniform(0, 1, size=(3, 3, 3, 3))
+    surrogate = SurrogateModel(axes, values)
+    features = [[32.5, 45.0, 15.0, 0.0, 0.7, 350.0, 0.8], [20.0, 70.0, 5.0, 5.0, 0.3, 300.0, 0.3]]
+
+    from_heatmaps = surrogate.predict(render_heatmaps(heatmap_params(features)))
+
+    assert from_heatmaps.shape == (2, 1)
+    np.testing.assert_allclose(from_heatmaps[:, 0], surrogate.predict_params(heatmap_params(features)), atol=1e-5)
@@ -0,0 +1,159 @@
+"""
+Tests for the async weather provider client and the stub provider.
+"""
+
+import asyncio
+import os
+import sys
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+# Add the backend directory to the path so we can import from app
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "backend"))
+
+import main
+from app.services import weather_service
+from app.services.weather_service import WeatherClient, WeatherProviderError, parse_onecall
+from app.services.weather_stub import ONECALL_PATH, create_stub_app, stub_onecall
+
+
+def stub_client(**kwargs):
+    app = create_stub_app(**kwargs)
+    return WeatherClient(base_url="http://weather-stub", transport=httpx.ASGITransport(app=app)), app
+
+
+def scripted_client(responses, **kwargs):
+    # Answers each call with the next status code, or raises it if it is an exception
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        outcome = responses[min(len(calls) - 1, len(responses) - 1)]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return httpx.Response(outcome, json=stub_onecall(37.0, -120.0, now=0))
+
+    client = WeatherClient(base_url="http://provider", transport=httpx.MockTransport(handler),
+                           backoff_seconds=0.001, **kwargs)
+    return client, calls
+
+
+def test_parse_onecall_converts_units_and_dates():
+    data = stub_onecall(37.0, -120.0, now=1_750_000_000)
+    weather = parse_onecall(data, 37.0, -120.0)
+
+    assert len(weather["forecast"]) == len(data["daily"])
+    first = weather["forecast"][0]
+    assert first["date"] == "2025-06-15"
+    assert first["temperature_high"] == data["daily"][0]["temp"]["max"]
+    assert first["wind_speed"] == round(data["daily"][0]["wind_speed"] * 3.6, 1)
+    assert first["precipitation_chance"] == round(data["daily"][0]["pop"] * 100)
+    # The stub is deterministic per location
+    assert stub_onecall(37.0, -120.0, now=0)["daily"][3] == stub_onecall(37.0, -120.0, now=0)["daily"][3]
+
+
+def test_in_process_stub_round_trip():
+    client, app = stub_client()
+
+    async def lookup():
+        try:
+            return await asyncio.gather(*(client.onecall(37.0 + i, -120.0) for i in range(5)))
+        finally:
+            await client.aclose()
+
+    results = asyncio.run(lookup())
+    assert app.state.requests == 5
+    assert all(len(weather["forecast"]) == 8 for weather in results)
+    assert results[0] != results[1]
+
+
+def test_transient_failures_are_retried():
+    client, calls = scripted_client([503, httpx.ConnectError("refused"), 200], retries=2)
+    weather = asyncio.run(client.onecall(37.0, -120.0))
+
+    assert len(calls) == 3 and client.retried == 2
+    assert calls[0].url.path == ONECALL_PATH and calls[0].url.params["units"] == "metric"
+    assert weather["forecast"]
+
+
+def test_client_errors_and_exhausted_retries_raise():
+    client, calls = scripted_client([401])
+    with pytest.raises(WeatherProviderError, match="401"):
+        asyncio.run(client.onecall(37.0, -120.0))
+    assert len(calls) == 1
+
+    client, calls = scripted_client([httpx.ReadTimeout("slow")], retries=3)
+    with pytest.raises(WeatherProviderError, match="ReadTimeout"):
+        asyncio.run(client.onecall(37.0, -120.0))
+    assert len(calls) == 4 and client.failures == 1
+
+
+def test_concurrency_is_bounded():
+    in_flight = peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json=stub_onecall(37.0, -120.0, now=0))
+
+    client = WeatherClient(base_url="http://provider", transport=httpx.MockTransport(handler), max_concurrency=3)
+
+    async def lookups():
+        await asyncio.gather(*(client.onecall(37.0, -120.0) for _ in range(12)))
+
+    asyncio.run(lookups())
+    assert peak == 3
+
+
+def test_routes_use_the_stub_provider(monkeypatch):
+    monkeypatch.setattr(weather_service, "WEATHER_PROVIDER", "stub")
+    monkeypatch.setattr(weather_service, "weather_client", WeatherClient.from_env("stub"))
+    client = TestClient(main.app)
+
+    weather = client.get("/api/v1/weather", params={"latitude": 37.0, "longitude": -120.0}).json()
+    assert len(weather["forecast"]) == 8
+    forecast = client.get("/api/v1/predict/forecast", params={"latitude": 37.0, "longitude": -120.0, "detail": False})
+    assert forecast.status_code == 200
+    assert [day["date"] for day in forecast.json()["days"]] == [day["date"] for day in weather["forecast"]]
+
+
+def test_provider_failure_returns_bad_gateway(monkeypatch):
+    failing, _ = scripted_client([500], retries=0)
+    monkeypatch.setattr(weather_service, "WEATHER_PROVIDER", "openweathermap")
+    monkeypatch.setattr(weather_service, "weather_client", failing)
+    client = TestClient(main.app)
+    assert client.get("/api/v1/weather", params={"latitude": 37.0, "longitude": -120.0}).status_code == 502
+
+
+@pytest.mark.parametrize("body", [b"<html>gateway</html>", b'{"daily": [{"dt": 0}]}', b"[]"])
+def test_malformed_responses_raise_provider_errors(body):
+    client = WeatherClient(base_url="http://provider", retries=0,
+                           transport=httpx.MockTransport(lambda request: httpx.Response(200, content=body)))
+
+    with pytest.raises(WeatherProviderError):
+        asyncio.run(client.onecall(37.0, -120.0))
+    assert client.failures == 1
+
+
+def test_client_of_a_previous_event_loop_is_closed():
+    client, _ = stub_client()
+
+    async def lookup():
+        await client.onecall(37.0, -120.0)
+        return client._client
+
+    first = asyncio.run(lookup())
+
+    async def lookup_and_settle():
+        await lookup()
+        await asyncio.sleep(0)
+
+    asyncio.run(lookup_and_settle())
+    assert first.is_closed
+    assert not client._client.is_closed
+    asyncio.run(client.aclose())